@@ -0,0 +1,140 @@
+# Python/agents/context_builder.py
+
+import math
+
+# Conservative characters-per-token ratio. English averages ~4 chars per
+# token on llama/phi tokenizers; using less over-estimates, so the real
+# token count stays under the budget.
+DEFAULT_CHARS_PER_TOKEN = 3.0
+
+TRUNCATION_MARKER = "\n[... {omitted} chars omitted ...]\n"
+
+
+def estimate_tokens(text: str, chars_per_token: float = DEFAULT_CHARS_PER_TOKEN) -> int:
+    """Cheap upper-bound style token estimate, no tokenizer needed."""
+    return math.ceil(len(text) / chars_per_token)
+
+
+def truncate_middle(text: str, max_chars: int) -> str:
+    """
+    Shorten ``text`` to at most ``max_chars`` characters, keeping its start
+    and end (where work logs and emails carry most of their meaning).
+    """
+    if len(text) <= max_chars:
+        return text
+
+    marker = TRUNCATION_MARKER.format(omitted=len(text) - max_chars)
+    if len(marker) >= max_chars:
+        return text[:max_chars]
+    keep = max(0, max_chars - len(marker))
+    head = keep - keep // 2
+    tail = keep // 2
+    return text[:head] + marker + (text[-tail:] if tail else "")
+
+
+def _water_level(lengths: list, budget: int) -> int:
+    """
+    Largest per-field cap C such that sum(min(length, C)) <= budget, so only
+    the largest fields get cut and smaller ones stay whole.
+    """
+    remaining = budget
+    ordered = sorted(lengths)
+    for index, length in enumerate(ordered):
+        fields_left = len(ordered) - index
+        if length * fields_left > remaining:
+            return remaining // fields_left
+        remaining -= length
+    return ordered[-1] if ordered else 0
+
+
+class ReflectionContextBuilder:
+    """
+    Builds the ReflectionAgent prompt from node logs within a token budget.
+
+    The prompt must fit in ``num_ctx`` together with ``max_tokens`` of
+    output. When the logs are too long, the largest inputs/outputs are
+    truncated first (down to ``min_field_tokens`` each); if that is still
+    too much, the oldest entries are dropped and replaced by a single note.
+    Pieces are collected in a list and joined once, so building is linear
+    in the size of the logs.
+    """
+
+    HEADER = "You are a professional reflection agent. Review the following logs and suggest improvements:\n\n"
+    FOOTER = "Provide concise, actionable, professional suggestions for each step."
+    OMITTED_ENTRIES = "[{count} earlier log entries omitted to fit the context window]\n\n"
+
+    def __init__(
+        self,
+        num_ctx: int = 4096,
+        max_tokens: int = 512,
+        min_field_tokens: int = 32,
+        chars_per_token: float = DEFAULT_CHARS_PER_TOKEN,
+    ):
+        """
+        Args:
+            num_ctx (int): Context window the model is run with
+            max_tokens (int): Tokens reserved for the generated reflection
+            min_field_tokens (int): Smallest size a log input/output is cut to
+                before whole entries start being dropped
+            chars_per_token (float): Ratio used by the token estimate
+        """
+        self.num_ctx = num_ctx
+        self.max_tokens = max_tokens
+        self.min_field_tokens = min_field_tokens
+        self.chars_per_token = chars_per_token
+
+    def _prompt_char_budget(self) -> int:
+        tokens = self.num_ctx - self.max_tokens
+        return max(0, int(tokens * self.chars_per_token) - len(self.HEADER) - len(self.FOOTER))
+
+    @staticmethod
+    def _entry_overhead(agent: str) -> int:
+        return len(f"Agent: {agent}\nInput: \nOutput: \n\n")
+
+    def build(self, logs: list) -> str:
+        """
+        Args:
+            logs (list): Log entries with agent, input, output
+        Returns:
+            str: Prompt whose estimated size fits the budget
+        """
+        entries = [(str(log["agent"]), str(log["input"]), str(log["output"])) for log in logs]
+        budget = self._prompt_char_budget()
+        min_field_chars = int(self.min_field_tokens * self.chars_per_token)
+
+        # Keep the newest entries whose fields, cut to the minimum size, still
+        # fit; everything older collapses into one "omitted" line
+        omitted_line = self.OMITTED_ENTRIES.format(count=len(entries))
+        first_kept = len(entries)
+        floor_cost = 0
+        for index in range(len(entries) - 1, -1, -1):
+            agent, input_data, output_data = entries[index]
+            cost = (
+                self._entry_overhead(agent)
+                + min(len(input_data), min_field_chars)
+                + min(len(output_data), min_field_chars)
+            )
+            stub_cost = len(omitted_line) if index > 0 else 0
+            if floor_cost + cost + stub_cost > budget:
+                break
+            floor_cost += cost
+            first_kept = index
+
+        kept = entries[first_kept:]
+        parts = [self.HEADER]
+        if first_kept:
+            parts.append(self.OMITTED_ENTRIES.format(count=first_kept))
+
+        field_budget = budget - sum(len(part) for part in parts[1:])
+        field_budget -= sum(self._entry_overhead(agent) for agent, _, _ in kept)
+        lengths = [len(text) for _, inp, out in kept for text in (inp, out)]
+        cap = _water_level(lengths, max(0, field_budget))
+
+        for agent, input_data, output_data in kept:
+            parts.append(
+                f"Agent: {agent}\n"
+                f"Input: {truncate_middle(input_data, cap)}\n"
+                f"Output: {truncate_middle(output_data, cap)}\n\n"
+            )
+        parts.append(self.FOOTER)
+        return "".join(parts)
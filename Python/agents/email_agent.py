@@ -1,4 +1,6 @@
-from Python.llm_client import OllamaClient 
+from typing import Callable, Optional
+
+from Python.llm_client import AsyncOllamaClient, OllamaClient 
 
 
 
@@ -7,20 +9,16 @@ class EmailAgent:
     Agent responsible for converting a summary into a professional email.
     """
 
-    def __init__(self, model: str = "llama3.1"):
-        self.client = OllamaClient(model=model)
-
-    def run(self, summary_text: str, recipient_name: str = "Manager") -> str:
-        """
-        Generates a professional email based on the summary.
+    def __init__(
+        self,
+        model: str = "llama3.1",
+        client: Optional[OllamaClient] = None,
+        aclient: Optional[AsyncOllamaClient] = None,
+    ):
+        self.client = client or OllamaClient(model=model)
+        self.aclient = aclient or AsyncOllamaClient(model=model)
 
-        Args:
-            summary_text (str): Text from SummarizerAgent
-            recipient_name (str): Name/title of the recipient
-
-        Returns:
-            str: Fully written email text
-        """
+    def _build_prompts(self, summary_text: str, recipient_name: str) -> tuple:
         system_prompt = (
             """You are a corporate communication assistant.
 
@@ -55,8 +53,44 @@ Write a professional email to the recipient:
 - Sign off politely
 """
 
+        return system_prompt, user_prompt
+
+    def run(
+        self,
+        summary_text: str,
+        recipient_name: str = "Manager",
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """
+        Generates a professional email based on the summary.
+
+        Args:
+            summary_text (str): Text from SummarizerAgent
+            recipient_name (str): Name/title of the recipient
+            on_token (callable | None): Receives text chunks while the LLM streams
+
+        Returns:
+            str: Fully written email text
+        """
+        system_prompt, user_prompt = self._build_prompts(summary_text, recipient_name)
         return self.client.generate(
             prompt=user_prompt,
             system=system_prompt,
-            temperature=0.2
+            temperature=0.2,
+            on_token=on_token
+        )
+
+    async def arun(
+        self,
+        summary_text: str,
+        recipient_name: str = "Manager",
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Async version of run()."""
+        system_prompt, user_prompt = self._build_prompts(summary_text, recipient_name)
+        return await self.aclient.generate(
+            prompt=user_prompt,
+            system=system_prompt,
+            temperature=0.2,
+            on_token=on_token
         )
@@ -1,21 +1,56 @@
-from Python.llm_client import OllamaClient
+import re
+from typing import Callable, NamedTuple, Optional
 
-class EvaluatorAgent:
+from Python.llm_client import AsyncOllamaClient, OllamaClient
+
+# "(1-10)" echoed back from the prompt must not read as a score of 1
+_SCALE_HINT = re.compile(r"\(\s*1\s*[-\u2013]\s*10\s*\)")
+_OUT_OF_TEN = re.compile(r"(\d+(?:\.\d+)?)\s*(?:/|out of)\s*10\b", re.IGNORECASE)
+_SCORE_LABEL = re.compile(r"score\b[^\d\n]{0,40}?(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+
+def parse_score(evaluation_text: str) -> Optional[float]:
     """
-    Evaluates a generated email for professionalism and clarity using an LLM (e.g., Phi-3)
+    Pull the numeric score out of an evaluation, e.g. "Score: 8/10",
+    "8 out of 10" or "Overall professionalism score: 8".
+
+    Args:
+        evaluation_text (str): Text returned by EvaluatorAgent
+
+    Returns:
+        float | None: Score between 0 and 10, or None if there is none
     """
+    text = _SCALE_HINT.sub("", evaluation_text)
+    for pattern in (_OUT_OF_TEN, _SCORE_LABEL):
+        for match in pattern.finditer(text):
+            score = float(match.group(1))
+            if 0 <= score <= 10:
+                return score
+    return None
 
-    def __init__(self, model: str = "phi3"):
-        self.client = OllamaClient(model=model)
 
-    def run(self, email_text: str) -> str:
-        """
-        Args:
-            email_text (str): The email generated by EmailAgent
+class Evaluation(NamedTuple):
+    """Evaluator output: the LLM's text and the score parsed from it."""
+    text: str
+    score: Optional[float]  # out of 10; None if the text gave no score
 
-        Returns:
-            str: Evaluation text from the LLM
-        """
+
+class EvaluatorAgent:
+    """
+    Evaluates a generated email for professionalism and clarity using an LLM (e.g., Phi-3).
+    Can also check a summary against the work log it was written from.
+    """
+
+    def __init__(
+        self,
+        model: str = "phi3",
+        client: Optional[OllamaClient] = None,
+        aclient: Optional[AsyncOllamaClient] = None,
+    ):
+        self.client = client or OllamaClient(model=model)
+        self.aclient = aclient or AsyncOllamaClient(model=model)
+
+    def _build_prompts(self, email_text: str) -> tuple:
         system_prompt = (
             """You are a senior manager evaluating written communication.
 
@@ -43,8 +78,119 @@ Please provide:
 Format your response in bullet points.
 """
 
+        return system_prompt, user_prompt
+
+    def run(self, email_text: str, on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Args:
+            email_text (str): The email generated by EmailAgent
+            on_token (callable | None): Receives text chunks while the LLM streams
+
+        Returns:
+            str: Evaluation text from the LLM
+        """
+        system_prompt, user_prompt = self._build_prompts(email_text)
+        return self.client.generate(
+            prompt=user_prompt,
+            system=system_prompt,
+            temperature=0.2,
+            on_token=on_token
+        )
+
+    async def arun(self, email_text: str, on_token: Optional[Callable[[str], None]] = None) -> str:
+        """Async version of run()."""
+        system_prompt, user_prompt = self._build_prompts(email_text)
+        return await self.aclient.generate(
+            prompt=user_prompt,
+            system=system_prompt,
+            temperature=0.2,
+            on_token=on_token
+        )
+
+    def evaluate(self, email_text: str, on_token: Optional[Callable[[str], None]] = None) -> Evaluation:
+        """
+        Like run(), with the professionalism score parsed out of the text.
+
+        Returns:
+            Evaluation: (text, score)
+        """
+        text = self.run(email_text, on_token=on_token)
+        return Evaluation(text, parse_score(text))
+
+    async def aevaluate(self, email_text: str, on_token: Optional[Callable[[str], None]] = None) -> Evaluation:
+        """Async version of evaluate()."""
+        text = await self.arun(email_text, on_token=on_token)
+        return Evaluation(text, parse_score(text))
+
+    def _build_summary_prompts(self, summary_text: str, user_worklog: str) -> tuple:
+        system_prompt = (
+            """You are a senior manager reviewing a summary of an employee's daily work.
+
+Your task:
+- Check the summary is faithful to the work log and covers its main points
+- Assess clarity and professional tone
+
+Rules:
+- Provide a quality score out of 10
+- Flag any claim that is not in the work log
+- Be constructive and concise
+"""
+        )
+
+        user_prompt = f"""
+Daily work log:
+\"\"\"
+{user_worklog}
+\"\"\"
+
+Summary to evaluate:
+\"\"\"
+{summary_text}
+\"\"\"
+
+Please provide:
+1. Overall quality score (1-10)
+2. Missing or invented details
+3. Suggestions for improvement
+Format your response in bullet points.
+"""
+
+        return system_prompt, user_prompt
+
+    def evaluate_summary(
+        self,
+        summary_text: str,
+        user_worklog: str,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """
+        Args:
+            summary_text (str): The summary generated by SummarizerAgent
+            user_worklog (str): The raw work log it was generated from
+            on_token (callable | None): Receives text chunks while the LLM streams
+
+        Returns:
+            str: Summary evaluation text from the LLM
+        """
+        system_prompt, user_prompt = self._build_summary_prompts(summary_text, user_worklog)
         return self.client.generate(
             prompt=user_prompt,
             system=system_prompt,
-            temperature=0.2
+            temperature=0.2,
+            on_token=on_token
+        )
+
+    async def aevaluate_summary(
+        self,
+        summary_text: str,
+        user_worklog: str,
+        on_token: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """Async version of evaluate_summary()."""
+        system_prompt, user_prompt = self._build_summary_prompts(summary_text, user_worklog)
+        return await self.aclient.generate(
+            prompt=user_prompt,
+            system=system_prompt,
+            temperature=0.2,
+            on_token=on_token
         )
@@ -1,60 +1,344 @@
 # Python/agents/logger.py
 
+import queue
 import sqlite3
+import sys
+import threading
+import time
+import weakref
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
+
+# Queue markers understood by the writer thread
+_FLUSH = object()
+_STOP = object()
+
+
+def _migrate_to_v1(conn: sqlite3.Connection):
+    """
+    Run-scoped schema: metadata columns + indexes on agent_logs, payloads
+    moved to a side table. Pre-v1 databases have input_data/output_data
+    inline; their rows are copied over with the same ids.
+    """
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(agent_logs)")]
+    legacy = "input_data" in columns
+    if legacy:
+        conn.execute("ALTER TABLE agent_logs RENAME TO agent_logs_v0")
+
+    conn.execute(
+        """
+        CREATE TABLE agent_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            run_id TEXT,
+            agent_name TEXT,
+            model TEXT,
+            duration_ms REAL,
+            prompt_tokens INTEGER,
+            completion_tokens INTEGER
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE agent_log_payloads (
+            log_id INTEGER PRIMARY KEY REFERENCES agent_logs (id) ON DELETE CASCADE,
+            input_data TEXT,
+            output_data TEXT
+        )
+        """
+    )
+    conn.execute("CREATE INDEX idx_agent_logs_run_id ON agent_logs (run_id)")
+    conn.execute("CREATE INDEX idx_agent_logs_agent_time ON agent_logs (agent_name, timestamp)")
+
+    if legacy:
+        conn.execute(
+            "INSERT INTO agent_logs (id, timestamp, agent_name) SELECT id, timestamp, agent_name FROM agent_logs_v0"
+        )
+        conn.execute(
+            """
+            INSERT INTO agent_log_payloads (log_id, input_data, output_data)
+            SELECT id, input_data, output_data FROM agent_logs_v0
+            """
+        )
+        conn.execute("DROP TABLE agent_logs_v0")
+
+
+def _migrate_to_v2(conn: sqlite3.Connection):
+    """Per-LLM-call timing and token records (see Python.metrics.CallMetrics)."""
+    conn.execute(
+        """
+        CREATE TABLE llm_calls (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            run_id TEXT,
+            node TEXT,
+            model TEXT,
+            host TEXT,
+            streamed INTEGER,
+            wall_ms REAL,
+            ttft_ms REAL,
+            prompt_tokens INTEGER,
+            completion_tokens INTEGER,
+            load_ms REAL,
+            prompt_eval_ms REAL,
+            eval_ms REAL,
+            total_ms REAL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX idx_llm_calls_run_id ON llm_calls (run_id)")
+    conn.execute("CREATE INDEX idx_llm_calls_node_time ON llm_calls (node, timestamp)")
+
+
+# Schema migrations, applied in order; PRAGMA user_version records how many ran
+_MIGRATIONS = [_migrate_to_v1, _migrate_to_v2]
+
+_CALL_COLUMNS = (
+    "model", "host", "streamed", "wall_ms", "ttft_ms", "prompt_tokens", "completion_tokens",
+    "load_ms", "prompt_eval_ms", "eval_ms", "total_ms",
+)
+
+
+def _insert_records(conn: sqlite3.Connection, records: list):
+    """
+    Insert queued records. Steps go in as narrow metadata rows in agent_logs
+    plus their large input/output text in agent_log_payloads, keyed by the
+    new row id; LLM call records go to llm_calls.
+    """
+    cursor = conn.cursor()
+    payloads = []
+    calls = []
+    for kind, row in records:
+        if kind == "call":
+            calls.append(row)
+            continue
+
+        timestamp, run_id, agent_name, model, duration_ms, prompt_tokens, completion_tokens, input_data, output_data = row
+        cursor.execute(
+            """
+            INSERT INTO agent_logs
+                (timestamp, run_id, agent_name, model, duration_ms, prompt_tokens, completion_tokens)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (timestamp, run_id, agent_name, model, duration_ms, prompt_tokens, completion_tokens),
+        )
+        payloads.append((cursor.lastrowid, input_data, output_data))
+
+    if payloads:
+        cursor.executemany(
+            "INSERT INTO agent_log_payloads (log_id, input_data, output_data) VALUES (?, ?, ?)",
+            payloads,
+        )
+    if calls:
+        columns = ("timestamp", "run_id", "node") + _CALL_COLUMNS
+        cursor.executemany(
+            f"INSERT INTO llm_calls ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            calls,
+        )
+
+
+def _writer_loop(conn: sqlite3.Connection, rows: queue.Queue, batch_size: int, flush_interval: float):
+    """
+    Drain queued rows into SQLite, one transaction per batch.
+
+    A batch is written when it reaches ``batch_size`` rows, when
+    ``flush_interval`` seconds have passed since its first row, or as soon
+    as a flush/stop marker arrives.
+    """
+    while True:
+        batch = [rows.get()]
+        deadline = time.monotonic() + flush_interval
+
+        while len(batch) < batch_size and batch[-1] is not _FLUSH and batch[-1] is not _STOP:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(rows.get(timeout=timeout))
+            except queue.Empty:
+                break
+
+        records = [item for item in batch if item is not _FLUSH and item is not _STOP]
+        if records:
+            try:
+                _insert_records(conn, records)
+                conn.commit()
+            except sqlite3.Error as exc:
+                # Never let a bad batch kill the writer; later steps still get logged
+                conn.rollback()
+                print(f"[LoggingAgent] dropped {len(records)} log rows: {exc}", file=sys.stderr)
+
+        for _ in batch:
+            rows.task_done()
+
+        if batch[-1] is _STOP:
+            return
+
+
+def _shutdown(rows: queue.Queue, writer: threading.Thread, conn: sqlite3.Connection):
+    rows.put(_STOP)
+    writer.join()
+    conn.close()
 
 
 class LoggingAgent:
-    def __init__(self, db_path: str = "db/logs.db"):
+    def __init__(
+        self,
+        db_path: str = "db/logs.db",
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        synchronous: str = "NORMAL",
+    ):
         """
         SQLite-based logging agent for observability.
         Creates DB and tables automatically on first run.
+
+        Keeps one connection open in WAL mode. ``log_step`` only enqueues the
+        row; a background writer thread inserts rows in batches. Call
+        ``flush()`` to wait for queued rows, ``close()`` to stop the writer
+        (also done automatically at interpreter exit).
+
+        Args:
+            db_path (str): SQLite database file
+            batch_size (int): Max rows per INSERT transaction
+            flush_interval (float): Max seconds a row waits before being written
+            synchronous (str): SQLite ``synchronous`` pragma; NORMAL is safe in
+                WAL mode against application crashes and skips most fsyncs
         """
         self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._conn = self._connect(synchronous)
         self._ensure_db()
 
-    def _ensure_db(self):
-        """Create database and logs table if not exists."""
+        self._rows = queue.Queue()
+        self._writer = threading.Thread(
+            target=_writer_loop,
+            args=(self._conn, self._rows, batch_size, flush_interval),
+            name="LoggingAgentWriter",
+            daemon=True,
+        )
+        self._writer.start()
+
+        # Runs close() logic on garbage collection or interpreter exit, whichever comes first
+        self._finalizer = weakref.finalize(self, _shutdown, self._rows, self._writer, self._conn)
+
+    def _connect(self, synchronous: str) -> sqlite3.Connection:
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
 
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Used by the writer thread after setup
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={synchronous}")
+        return conn
 
-        cursor.execute(
-            """
-            CREATE TABLE IF NOT EXISTS agent_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT,
-                agent_name TEXT,
-                input_data TEXT,
-                output_data TEXT
-            )
-            """
-        )
+    def _ensure_db(self):
+        """Create the log tables, or migrate an existing database to the current schema."""
+        conn = self._conn
+        # IMMEDIATE takes the write lock, so two processes never migrate at once
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for target, migrate in enumerate(_MIGRATIONS[version:], start=version + 1):
+                migrate(conn)
+                conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
 
-        conn.commit()
-        conn.close()
+    def log_step(
+        self,
+        agent_name: str,
+        input_data: str,
+        output_data: str,
+        run_id: Optional[str] = None,
+        model: Optional[str] = None,
+        duration_ms: Optional[float] = None,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+    ):
+        """
+        Log a single agent step (queued for the writer thread).
 
-    def log_step(self, agent_name: str, input_data: str, output_data: str):
+        Args:
+            agent_name (str): Node/agent that produced the step
+            input_data (str): Text the agent was given
+            output_data (str): Text the agent produced
+            run_id (str | None): Report the step belongs to
+            model (str | None): LLM model used
+            duration_ms (float | None): Wall time of the step
+            prompt_tokens (int | None): Prompt tokens evaluated by the LLM
+            completion_tokens (int | None): Tokens generated by the LLM
         """
-        Log a single agent step.
+        if not self._finalizer.alive:
+            raise RuntimeError("LoggingAgent is closed")
+
+        self._rows.put(("step", (
+            datetime.utcnow().isoformat(),
+            run_id,
+            agent_name,
+            model,
+            duration_ms,
+            prompt_tokens,
+            completion_tokens,
+            input_data,
+            output_data,
+        )))
+
+    def log_llm_call(self, metrics, run_id: Optional[str] = None, node: Optional[str] = None):
+        """
+        Record one LLM call's timings and token counts (queued like log_step).
+
+        Args:
+            metrics (CallMetrics): Metrics captured by the LLM client
+            run_id (str | None): Report the call belongs to
+            node (str | None): Graph node that made the call
         """
+        if not self._finalizer.alive:
+            raise RuntimeError("LoggingAgent is closed")
+
+        self._rows.put(("call", (
+            datetime.utcnow().isoformat(),
+            run_id,
+            node,
+            *(getattr(metrics, column) for column in _CALL_COLUMNS),
+        )))
+
+    def get_run(self, run_id: str) -> list:
+        """
+        All logged steps of one report, oldest first, with their payloads.
+        Pending steps are flushed first.
+        """
+        self.flush()
+
+        # Separate read connection; WAL lets it run alongside the writer
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn.row_factory = sqlite3.Row
+        try:
+            rows = conn.execute(
+                """
+                SELECT l.*, p.input_data, p.output_data
+                FROM agent_logs AS l
+                LEFT JOIN agent_log_payloads AS p ON p.log_id = l.id
+                WHERE l.run_id = ?
+                ORDER BY l.id
+                """,
+                (run_id,),
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
 
-        cursor.execute(
-            """
-            INSERT INTO agent_logs (timestamp, agent_name, input_data, output_data)
-            VALUES (?, ?, ?, ?)
-            """,
-            (
-                datetime.utcnow().isoformat(),
-                agent_name,
-                input_data,
-                output_data,
-            ),
-        )
+    def flush(self):
+        """Block until every step logged so far is committed."""
+        if self._finalizer.alive:
+            self._rows.put(_FLUSH)
+            self._rows.join()
 
-        conn.commit()
-        conn.close()
+    def close(self):
+        """Write any queued steps, stop the writer thread and close the connection."""
+        self._finalizer()
@@ -1,27 +1,83 @@
 # agents/reflection_agent.py
 
-from Python.agents.logger import LoggingAgent
-from Python.llm_client import Phi3Client  # your existing LLM wrapper for Phi-3
+from typing import Callable, Optional
+
+from Python.agents.context_builder import ReflectionContextBuilder
+from Python.llm_client import AsyncOllamaClient, OllamaClient, Phi3Client  # your existing LLM wrapper for Phi-3
 
 class ReflectionAgent:
     """
     Agent that looks at shared logs and provides constructive feedback.
     """
-    def __init__(self, model: str = "phi3"):
+    # Appended to the prompt for a brief reflection (see build_prompt)
+    BRIEF_INSTRUCTION = "Keep it brief: at most two short suggestions.\n"
+
+    def __init__(
+        self,
+        model: str = "phi3",
+        client: Optional[OllamaClient] = None,
+        aclient: Optional[AsyncOllamaClient] = None,
+        num_ctx: int = 4096,
+        max_tokens: int = 512,
+    ):
+        """
+        Args:
+            num_ctx (int): Context window the model runs with; the prompt plus
+                ``max_tokens`` of output are kept inside it
+            max_tokens (int): Max tokens of reflection generated
+        """
         self.model = model
-        self.client = Phi3Client(model=self.model)
+        self.num_ctx = num_ctx
+        self.max_tokens = max_tokens
+        self.client = Phi3Client(model=self.model, client=client)
+        self.aclient = aclient or AsyncOllamaClient(model=self.model)
+        self.context_builder = ReflectionContextBuilder(num_ctx=num_ctx, max_tokens=max_tokens)
 
-    def reflect(self, logs: list) -> str:
+    def build_prompt(self, logs: list, brief: bool = False) -> str:
+        """
+        Reflection prompt for ``logs``, truncated to fit the context window.
+
+        Args:
+            brief (bool): Ask for a couple of short suggestions only
+        """
+        prompt = self.context_builder.build(logs)
+        return prompt + self.BRIEF_INSTRUCTION if brief else prompt
+
+    def reflect(
+        self,
+        logs: list,
+        on_token: Optional[Callable[[str], None]] = None,
+        prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> str:
         """
         Generate reflection feedback from logs.
         Args:
             logs (list): List of dicts with keys: agent, input, output
+            on_token (callable | None): Receives text chunks while the LLM streams
+            prompt (str | None): Prompt already built with build_prompt(logs)
+            max_tokens (int | None): Lower output cap for this call; at most
+                the agent's ``max_tokens``, which the prompt was sized for
         Returns:
             str: Reflection suggestions
         """
-        prompt = "You are a professional reflection agent. Review the following logs and suggest improvements:\n\n"
-        for log in logs:
-            prompt += f"Agent: {log['agent']}\nInput: {log['input']}\nOutput: {log['output']}\n\n"
-        prompt += "Provide concise, actionable, professional suggestions for each step."
+        return self.client.run(
+            prompt or self.build_prompt(logs), on_token=on_token,
+            max_tokens=self._max_tokens(max_tokens), num_ctx=self.num_ctx,
+        )
+
+    async def areflect(
+        self,
+        logs: list,
+        on_token: Optional[Callable[[str], None]] = None,
+        prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> str:
+        """Async version of reflect()."""
+        return await self.aclient.generate(
+            prompt or self.build_prompt(logs), on_token=on_token,
+            max_tokens=self._max_tokens(max_tokens), num_ctx=self.num_ctx,
+        )
 
-        return self.client.run(prompt)
+    def _max_tokens(self, max_tokens: Optional[int]) -> int:
+        return self.max_tokens if max_tokens is None else min(max_tokens, self.max_tokens)
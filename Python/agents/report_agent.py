@@ -0,0 +1,144 @@
+import json
+from typing import Optional
+
+from Python.llm_client import AsyncOllamaClient, OllamaClient
+
+# Ollama structured output: the completion must be a JSON object with both fields
+REPORT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "email": {"type": "string"},
+    },
+    "required": ["summary", "email"],
+}
+
+
+class ReportFormatError(ValueError):
+    """The model's fused report does not match REPORT_SCHEMA."""
+
+
+def parse_report(text: str) -> dict:
+    """
+    Split a fused completion into its two parts.
+
+    Args:
+        text (str): JSON completion requested with REPORT_SCHEMA
+
+    Returns:
+        dict: {"summary": str, "email_text": str}
+
+    Raises:
+        ReportFormatError: If the completion is not a JSON object with non-empty
+            "summary" and "email" strings
+    """
+    try:
+        report = json.loads(text)
+    except json.JSONDecodeError as exc:
+        raise ReportFormatError(f"fused report is not valid JSON: {exc}") from exc
+
+    if not isinstance(report, dict):
+        raise ReportFormatError("fused report is not a JSON object")
+    summary, email_text = report.get("summary"), report.get("email")
+    if not isinstance(summary, str) or not isinstance(email_text, str) or not summary.strip() or not email_text.strip():
+        raise ReportFormatError("fused report is missing the summary or the email")
+    return {"summary": summary.strip(), "email_text": email_text.strip()}
+
+
+class ReportAgent:
+    """
+    Agent that writes the summary and the email in one LLM call, asking
+    for both as one JSON object. Same rules as SummarizerAgent and
+    EmailAgent; saves a round trip (and re-reading the summary) per report.
+    """
+
+    def __init__(
+        self,
+        model: str = "llama3.1",
+        client: Optional[OllamaClient] = None,
+        aclient: Optional[AsyncOllamaClient] = None,
+        max_tokens: int = 1024,
+    ):
+        """
+        Args:
+            max_tokens (int): Completion budget for both parts together
+        """
+        self.client = client or OllamaClient(model=model)
+        self.aclient = aclient or AsyncOllamaClient(model=model)
+        self.max_tokens = max_tokens
+
+    def _build_prompts(self, user_worklog: str, recipient_name: str) -> tuple:
+        system_prompt = (
+            """You are a professional workplace assistant and corporate communication assistant.
+
+Your task:
+- Convert raw, informal task updates into a concise, professional summary
+- Convert that summary into a professional email update to a manager
+
+Rules for the summary:
+- 2 or 3 sentences, neutral corporate tone
+- Do NOT use bullet points
+- Do NOT include opinions or suggestions
+- Avoid adding information not present in the input
+
+Rules for the email:
+- Start with "Subject: ..." on its own line, then the email body
+- Maintain a polite, professional tone
+- Avoid slang or informal phrases
+- Do NOT add new tasks or claims
+- End with a polite closing
+
+Respond with a JSON object: {"summary": "...", "email": "..."}
+"""
+        )
+
+        user_prompt = f"""
+Recipient: {recipient_name}
+Daily work log:
+\"\"\"
+{user_worklog}
+\"\"\"
+
+Return JSON with:
+- "summary": a short professional paragraph, no bullet points
+- "email": a short professional email to the recipient with a polite greeting,
+  a clear summary of completed work, no emojis, and a polite sign-off
+"""
+
+        return system_prompt, user_prompt
+
+    def run(self, user_worklog: str, recipient_name: str = "Manager") -> dict:
+        """
+        Writes the summary and the email for a work log in one call.
+
+        Args:
+            user_worklog (str): Raw daily work log
+            recipient_name (str): Name/title of the email recipient
+
+        Returns:
+            dict: {"summary": str, "email_text": str}
+
+        Raises:
+            ReportFormatError: If the model did not return both parts (see parse_report)
+        """
+        system_prompt, user_prompt = self._build_prompts(user_worklog, recipient_name)
+        text = self.client.generate(
+            prompt=user_prompt,
+            system=system_prompt,
+            temperature=0.2,
+            max_tokens=self.max_tokens,
+            format=REPORT_SCHEMA,
+        )
+        return parse_report(text)
+
+    async def arun(self, user_worklog: str, recipient_name: str = "Manager") -> dict:
+        """Async version of run()."""
+        system_prompt, user_prompt = self._build_prompts(user_worklog, recipient_name)
+        text = await self.aclient.generate(
+            prompt=user_prompt,
+            system=system_prompt,
+            temperature=0.2,
+            max_tokens=self.max_tokens,
+            format=REPORT_SCHEMA,
+        )
+        return parse_report(text)
@@ -1,14 +1,23 @@
-from Python.llm_client import OllamaClient
+from typing import Callable, Optional
+
+from Python.llm_client import AsyncOllamaClient, OllamaClient
 
 class SummarizerAgent:
     """
     Agent responsible for summarizing daily work logs
     """
 
-    def __init__(self, model: str = "llama3.1"):
-        self.client = OllamaClient(model=model)
+    def __init__(
+        self,
+        model: str = "llama3.1",
+        client: Optional[OllamaClient] = None,
+        aclient: Optional[AsyncOllamaClient] = None,
+    ):
+        # Shared clients (see AgentRegistry) reuse one connection pool per model
+        self.client = client or OllamaClient(model=model)
+        self.aclient = aclient or AsyncOllamaClient(model=model)
 
-    def run(self, user_worklog: str) -> str:
+    def _build_prompts(self, user_worklog: str) -> tuple:
         system_prompt = ("""
 You are a professional workplace assistant.
 
@@ -36,9 +45,23 @@ Return:
 - No bullet points
 """
 
+        return system_prompt, user_prompt
+
+    def run(self, user_worklog: str, on_token: Optional[Callable[[str], None]] = None) -> str:
+        system_prompt, user_prompt = self._build_prompts(user_worklog)
         return self.client.generate(
             prompt=user_prompt,
             system=system_prompt,
-            temperature=0.2
+            temperature=0.2,
+            on_token=on_token
+        )
+
+    async def arun(self, user_worklog: str, on_token: Optional[Callable[[str], None]] = None) -> str:
+        system_prompt, user_prompt = self._build_prompts(user_worklog)
+        return await self.aclient.generate(
+            prompt=user_prompt,
+            system=system_prompt,
+            temperature=0.2,
+            on_token=on_token
         )
 
@@ -0,0 +1,541 @@
+# batch.py
+"""
+Batch report mode: run many work logs through compiled_graph in one process.
+
+Usage:
+    python -m Python.batch worklogs.jsonl --output reports.jsonl --concurrency 8
+
+Input is JSONL ({"id": ..., "user_input": ...} per line) or CSV with
+``id`` and ``user_input`` columns. Each finished ReportState is appended to
+the output JSONL as soon as it completes, so a crashed run can be restarted
+with the same arguments and will skip IDs that are already in the output.
+Rows also carry the report's wall time in ``latency_s`` (not in --staged
+runs, where reports advance stage by stage).
+Reports that failed part-way resume from their last completed node (the
+graph is checkpointed to db/checkpoints.db; --staged runs are not).
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, Optional
+
+from Python.metrics import METRICS, capture_calls
+
+
+def load_worklogs(path: str) -> Iterator[dict]:
+    """
+    Yield {"id", "user_input"} records from a JSONL or CSV file.
+    Records without an ID get their 1-based row number.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if Path(path).suffix.lower() == ".csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+
+        for row_number, row in enumerate(rows, start=1):
+            yield {
+                "id": str(row.get("id") or row_number),
+                "user_input": row["user_input"],
+            }
+
+
+def completed_ids(output_path: str) -> set:
+    """IDs already written to the output file by a previous run."""
+    done = set()
+    if not Path(output_path).exists():
+        return done
+
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(str(json.loads(line)["id"]))
+            except (ValueError, KeyError):
+                # Half-written last line from a crash; that report is redone
+                continue
+    return done
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class BatchStats:
+    """Collects per-report and per-node latencies for the throughput summary."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.node_latencies = {}  # node name -> list of seconds
+        self.report_latencies = []
+        self.swap_report = None   # set by run_batch_staged, see swap_savings()
+
+    def record(self, node_latencies: dict, total: float):
+        self.completed += 1
+        self.report_latencies.append(total)
+        for node, seconds in node_latencies.items():
+            self.node_latencies.setdefault(node, []).append(seconds)
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        rate = self.completed / elapsed * 60 if elapsed else 0.0
+
+        lines = [
+            f"Completed {self.completed} reports in {elapsed:.1f}s "
+            f"({rate:.1f} reports/min), {self.failed} failed, {self.skipped} skipped"
+        ]
+        rows = list(self.node_latencies.items())
+        if self.report_latencies:
+            rows.append(("total", self.report_latencies))
+        for node, values in rows:
+            lines.append(
+                f"  {node:<12} p50={percentile(values, 50):.3f}s p95={percentile(values, 95):.3f}s"
+            )
+        if self.swap_report:
+            swap = self.swap_report
+            lines.append(
+                f"Model switches: {swap['staged_switches']} staged vs {swap['per_report_switches']} "
+                f"in per-report order; {swap['cold_loads']} cold loads took {swap['load_ms'] / 1000:.1f}s, "
+                f"est. {swap['saved_ms'] / 1000:.1f}s of model loading saved"
+            )
+        return "\n".join(lines)
+
+
+def _initial_state(record: dict) -> dict:
+    return {
+        "run_id": record["id"],
+        "user_input": record["user_input"],
+        "summary": "",
+        "email_text": "",
+        "evaluation": "",
+        "logs": [],
+        "reflection": ""
+    }
+
+
+async def _run_report(graph, record: dict) -> tuple:
+    """
+    Invoke the graph for one work log, timing each node as its update lands.
+    With a checkpointed graph, a report that failed part-way in an earlier
+    run resumes after its last completed node.
+    """
+    from Python.langgraph.checkpointer import aresume_input, forget_report, report_config
+
+    initial_state = _initial_state(record)
+
+    node_latencies = {}
+    final_state = initial_state
+    start = last = time.perf_counter()
+
+    graph_input = await aresume_input(graph, initial_state)
+    async for mode, chunk in graph.astream(
+        graph_input, config=report_config(record["id"]), stream_mode=["updates", "values"]
+    ):
+        now = time.perf_counter()
+        if mode == "values":
+            final_state = chunk
+            continue
+        for node in chunk:
+            node_latencies[node] = now - last
+        last = now
+
+    forget_report(graph, record["id"])
+    return final_state, node_latencies, time.perf_counter() - start
+
+
+async def run_batch(
+    records,
+    output_path: str,
+    concurrency: int = 8,
+    graph=None,
+    progress_every: int = 10,
+    metrics_file: Optional[str] = None,
+) -> BatchStats:
+    """
+    Run every record through the graph with at most ``concurrency`` reports
+    in flight, appending each final state to ``output_path``.
+
+    Args:
+        records: Iterable of {"id", "user_input"} dicts
+        output_path (str): JSONL file results are appended to
+        concurrency (int): Max reports processed at the same time
+        graph: Compiled graph to use (defaults to the checkpointed
+            compiled_graph, so failed reports resume on the next run)
+        progress_every (int): Print progress after this many completions
+        metrics_file (str | None): Prometheus text file refreshed with every
+            progress line and at the end of the run
+
+    Returns:
+        BatchStats: Counters and latencies for the run
+    """
+    if graph is None:
+        from Python.langgraph.graph import get_compiled_graph
+        graph = get_compiled_graph(checkpointed=True)
+
+    stats = BatchStats()
+    done = completed_ids(output_path)
+    pending = iter(records)
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "a", encoding="utf-8") as out:
+
+        async def worker():
+            # Workers pull from a shared iterator so the input is streamed,
+            # never loaded in full
+            for record in pending:
+                if record["id"] in done:
+                    stats.skipped += 1
+                    continue
+
+                try:
+                    final_state, node_latencies, total = await _run_report(graph, record)
+                except Exception as exc:
+                    # Not written to the output, so a resumed run retries it
+                    stats.failed += 1
+                    print(f"[batch] {record['id']} failed: {exc!r}", file=sys.stderr)
+                    continue
+
+                row = {"id": record["id"], **final_state, "latency_s": round(total, 3)}
+                out.write(json.dumps(row) + "\n")
+                out.flush()
+                stats.record(node_latencies, total)
+
+                if stats.completed % progress_every == 0:
+                    elapsed = time.perf_counter() - stats.started
+                    print(
+                        f"[batch] {stats.completed} done, {stats.failed} failed "
+                        f"({stats.completed / elapsed * 60:.1f} reports/min)",
+                        file=sys.stderr,
+                    )
+                    if metrics_file:
+                        METRICS.write_prometheus(metrics_file)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    if metrics_file:
+        METRICS.write_prometheus(metrics_file)
+
+    return stats
+
+
+def _apply_update(state: dict, update: dict):
+    # Same merge as the graph: logs go through the append reducer, the rest overwrite
+    for key, value in update.items():
+        state[key] = state[key] + value if key == "logs" else value
+
+
+def _model_switches(stage_models: list, repeats: int) -> int:
+    """Model loads needed to run ``stage_models`` ``repeats`` times in a row with one resident model."""
+    switches = 0
+    previous = None
+    for _ in range(repeats):
+        for model in stage_models:
+            if model != previous:
+                switches += 1
+            previous = model
+    return switches
+
+
+def swap_savings(calls: list, stage_models: list, reports: int, waves: int, cold_load_ms: float = 100.0) -> dict:
+    """
+    Estimate the model-load time the staged order saved over running each
+    report through the whole pipeline.
+
+    With one model resident at a time, the per-report order reloads on every
+    model change of every report; the staged order once per change per wave.
+    The difference is priced at the mean cold load observed in this run, so
+    if no cold load was seen (all models fit in memory) the saving is 0.
+
+    Args:
+        calls (list): CallMetrics captured during the staged run
+        stage_models (list): Model of each pipeline stage, in order
+        reports (int): Reports processed
+        waves (int): Stage-by-stage passes the batch was split into
+        cold_load_ms (float): load_duration above which a call was a cold load
+    """
+    loads = [c.load_ms for c in calls if c.load_ms is not None and c.load_ms >= cold_load_ms]
+    mean_load_ms = sum(loads) / len(loads) if loads else 0.0
+    staged = _model_switches(stage_models, waves)
+    per_report = _model_switches(stage_models, reports)
+    return {
+        "staged_switches": staged,
+        "per_report_switches": per_report,
+        "cold_loads": len(loads),
+        "load_ms": sum(loads),
+        "saved_ms": max(0, per_report - staged) * mean_load_ms,
+    }
+
+
+async def run_batch_staged(
+    records,
+    output_path: str,
+    concurrency: int = 8,
+    registry=None,
+    parallel: bool = False,
+    wave_size: int = 256,
+    fused: bool = False,
+    metrics_file: Optional[str] = None,
+    cascade: bool = False,
+    escalation_threshold: Optional[float] = None,
+    reflection_threshold: Optional[float] = None,
+    high_score_reflection: str = "skip",
+) -> BatchStats:
+    """
+    Run the pipeline stage by stage across the batch instead of report by
+    report: every summarize call of a wave, then every email call on the
+    same warm model, then the evaluator/reflection calls. Ollama then swaps
+    models once per stage change instead of several times per report.
+
+    Records are taken ``wave_size`` at a time so per-report state for the
+    whole input never has to sit in memory. Output and resume behave as in
+    run_batch.
+
+    Args:
+        records: Iterable of {"id", "user_input"} dicts
+        output_path (str): JSONL file results are appended to
+        concurrency (int): Max LLM calls in flight within a stage
+        registry (AgentRegistry | None): Agents to run; the process-wide one if None
+        parallel (bool): Include the summary evaluation stage
+        wave_size (int): Reports carried through the stages together
+        fused (bool): Write summary and email in one call per report
+        metrics_file (str | None): Prometheus text file written after each wave
+        cascade (bool): Draft with the cheaper model and rewrite only
+            low-scoring drafts (see build_graph)
+        escalation_threshold (float | None): Cascade score threshold; the
+            graph default if None
+        reflection_threshold (float | None): Evaluator score at or above
+            which reflection is skipped or kept brief; None always reflects
+        high_score_reflection (str): "skip" or "brief"
+
+    Returns:
+        BatchStats: Counters, latencies and the model-swap report
+    """
+    from Python.langgraph.graph import DEFAULT_ESCALATION_THRESHOLD, pipeline_stages
+    from Python.langgraph.registry import get_registry
+
+    registry = registry or get_registry()
+    if escalation_threshold is None:
+        escalation_threshold = DEFAULT_ESCALATION_THRESHOLD
+    stages = pipeline_stages(
+        parallel, fused, cascade, escalation_threshold, reflection_threshold, high_score_reflection
+    )
+    stats = BatchStats()
+    done = completed_ids(output_path)
+    semaphore = asyncio.Semaphore(concurrency)
+    waves = 0
+
+    async def run_node(afunc, state: dict) -> tuple:
+        async with semaphore:
+            start = time.perf_counter()
+            update = await afunc(state, registry)
+            return update, time.perf_counter() - start
+
+    pending = iter(records)
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "a", encoding="utf-8") as out, capture_calls() as calls:
+        while True:
+            wave = []
+            for record in islice(pending, wave_size):
+                if record["id"] in done:
+                    stats.skipped += 1
+                else:
+                    wave.append(record)
+            if not wave:
+                break
+            waves += 1
+
+            # Per-report state carried from stage to stage
+            states = {record["id"]: _initial_state(record) for record in wave}
+            latencies = {report_id: {} for report_id in states}
+            started = time.perf_counter()
+
+            for node_name, afunc, _ in stages:
+                live = list(states)
+                results = await asyncio.gather(
+                    *(run_node(afunc, states[report_id]) for report_id in live), return_exceptions=True
+                )
+                for report_id, result in zip(live, results):
+                    if isinstance(result, Exception):
+                        # Dropped from later stages and not written, so a resumed run retries it
+                        stats.failed += 1
+                        print(f"[batch] {report_id} failed at {node_name}: {result!r}", file=sys.stderr)
+                        del states[report_id]
+                        continue
+                    update, seconds = result
+                    _apply_update(states[report_id], update)
+                    latencies[report_id][node_name] = seconds
+
+            # Every report in a wave finishes together
+            total = time.perf_counter() - started
+            for report_id, state in states.items():
+                out.write(json.dumps({"id": report_id, **state}) + "\n")
+                stats.record(latencies[report_id], total)
+            out.flush()
+
+            elapsed = time.perf_counter() - stats.started
+            print(
+                f"[batch] {stats.completed} done, {stats.failed} failed "
+                f"({stats.completed / elapsed * 60:.1f} reports/min)",
+                file=sys.stderr,
+            )
+            if metrics_file:
+                METRICS.write_prometheus(metrics_file)
+
+    stage_models = [registry.models[role] for _, _, role in stages]
+    stats.swap_report = swap_savings(calls, stage_models, stats.completed + stats.failed, waves)
+    return stats
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Generate daily reports for a file of work logs.")
+    parser.add_argument("input", help="JSONL or CSV file with id and user_input")
+    parser.add_argument("--output", default="reports.jsonl", help="JSONL file to append reports to")
+    parser.add_argument("--concurrency", type=int, default=8, help="Max reports in flight")
+    parser.add_argument("--progress-every", type=int, default=10)
+    parser.add_argument("--metrics-file", help="Write Prometheus-format metrics to this file")
+    parser.add_argument(
+        "--parallel", action="store_true",
+        help="Use the fan-out topology (summary evaluation alongside email drafting)",
+    )
+    parser.add_argument(
+        "--fused", action="store_true",
+        help="Write the summary and the email with one structured-JSON LLM call per report",
+    )
+    parser.add_argument(
+        "--cascade", action="store_true",
+        help="Draft with the cheaper model and escalate to the larger ones only when the evaluator score is low",
+    )
+    parser.add_argument(
+        "--escalation-threshold", type=float,
+        help="Cascade: lowest evaluator score (out of 10) a draft can ship with",
+    )
+    parser.add_argument(
+        "--reflection-threshold", type=float,
+        help="Skip (or shorten) reflection for emails the evaluator scores at least this (out of 10)",
+    )
+    parser.add_argument(
+        "--high-score-reflection", choices=["skip", "brief"], default="skip",
+        help="What --reflection-threshold does to high-scoring reports",
+    )
+    parser.add_argument(
+        "--staged", action="store_true",
+        help="Run stage by stage across the batch so each model stays loaded for a whole stage",
+    )
+    parser.add_argument("--wave-size", type=int, default=256, help="Reports per stage-by-stage pass")
+    parser.add_argument("--keep-alive", default="30m", help="Ollama keep_alive sent with every request")
+    parser.add_argument(
+        "--coalesce", action="store_true",
+        help="Share one generation between identical LLM calls in flight at the same time (duplicate work logs)",
+    )
+    parser.add_argument(
+        "--adaptive-concurrency", action="store_true",
+        help="Cap LLM calls in flight per model, raising the cap while latency holds and cutting it on overload",
+    )
+    parser.add_argument(
+        "--retry", action="store_true",
+        help="Retry transient LLM failures with backoff and fail fast while a host keeps failing",
+    )
+    parser.add_argument(
+        "--pin-models", action="store_true",
+        help="Preload the graph's models and keep them resident until the batch ends",
+    )
+    args = parser.parse_args(argv)
+
+    from Python.langgraph.graph import DEFAULT_ESCALATION_THRESHOLD, pipeline_stages
+    from Python.langgraph.model_manager import ModelManager
+    threshold = args.escalation_threshold
+    topology = dict(
+        parallel=args.parallel, fused=args.fused, cascade=args.cascade,
+        escalation_threshold=DEFAULT_ESCALATION_THRESHOLD if threshold is None else threshold,
+        reflection_threshold=args.reflection_threshold,
+        high_score_reflection=args.high_score_reflection,
+    )
+    models = ModelManager(keep_alive=args.keep_alive, stages=pipeline_stages(**topology))
+    if args.coalesce:
+        models.registry.set_coalesce(True)
+    if args.adaptive_concurrency:
+        from Python.concurrency_limiter import AdaptiveLimiter
+        models.registry.set_limiter(AdaptiveLimiter())
+    if args.retry:
+        from Python.resilience import CircuitBreaker, RetryPolicy
+        models.registry.set_resilience(RetryPolicy(), CircuitBreaker())
+
+    graph = None
+    custom_graph = args.parallel or args.fused or args.cascade or args.reflection_threshold is not None
+    if custom_graph and not args.staged:
+        from Python.langgraph.checkpointer import SqliteCheckpointSaver
+        from Python.langgraph.graph import build_graph
+        graph = build_graph(**topology, checkpointer=SqliteCheckpointSaver())
+
+    async def closing(batch):
+        # httpx connections must be closed on the loop that opened them
+        try:
+            return await batch
+        finally:
+            await models.registry.aclose()
+
+    def run():
+        if args.staged:
+            return asyncio.run(closing(run_batch_staged(
+                load_worklogs(args.input),
+                args.output,
+                concurrency=args.concurrency,
+                parallel=args.parallel,
+                wave_size=args.wave_size,
+                fused=args.fused,
+                metrics_file=args.metrics_file,
+                cascade=args.cascade,
+                escalation_threshold=args.escalation_threshold,
+                reflection_threshold=args.reflection_threshold,
+                high_score_reflection=args.high_score_reflection,
+            )))
+        return asyncio.run(closing(run_batch(
+            load_worklogs(args.input),
+            args.output,
+            concurrency=args.concurrency,
+            graph=graph,
+            progress_every=args.progress_every,
+            metrics_file=args.metrics_file,
+        )))
+
+    if args.pin_models:
+        with models.pinned():
+            stats = run()
+    elif args.staged:
+        # The first stage loads its model; preloading all of them would
+        # just evict it again on a box that holds one model at a time
+        stats = run()
+    else:
+        models.preload()
+        stats = run()
+    print(stats.summary())
+    if args.cascade:
+        drafts = METRICS.get("cascade_drafts_total")
+        escalations = METRICS.get("cascade_escalations_total")
+        print(f"cascade: {escalations:.0f}/{drafts:.0f} drafts escalated ({escalations / max(1, drafts):.0%})")
+    if args.coalesce:
+        registry = models.registry
+        coalesced = registry.single_flight.coalesced + registry.async_single_flight.coalesced
+        print(f"coalesced LLM calls: {coalesced}")
+    if args.adaptive_concurrency:
+        for entry in models.registry.limiter.snapshot():
+            print(f"concurrency limit {entry['model']} @ {entry['host']}: {entry['limit']}")
+    if args.reflection_threshold is not None:
+        counts = {mode: METRICS.get("reflection_runs_total", {"mode": mode}) for mode in ("full", "brief", "skip")}
+        print("reflection: " + ", ".join(f"{count:.0f} {mode}" for mode, count in counts.items()))
+    print(models.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Python/benchmarks/bench_agent_reuse.py
+"""
+Per-invoke overhead of compiled_graph with agents rebuilt on every node call
+(the old behaviour) vs. agents shared through an AgentRegistry, measured
+against the local stub server so model latency is out of the picture.
+
+Run with:  python -m Python.benchmarks.bench_agent_reuse --invokes 200
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from Python.agents.logger import LoggingAgent
+from Python.langgraph.graph import build_graph
+from Python.langgraph.registry import AgentRegistry
+from Python.llm_client import AsyncOllamaClient, OllamaClient
+from Python.stub_ollama import StubOllamaServer
+
+
+class FreshAgentRegistry(AgentRegistry):
+    """Builds a new agent, client and LoggingAgent on every access, like the nodes used to."""
+
+    def client(self, model: str) -> OllamaClient:
+        return OllamaClient(model=model, host=self.host)
+
+    def aclient(self, model: str) -> AsyncOllamaClient:
+        return AsyncOllamaClient(model=model, host=self.host)
+
+    def _agent(self, role: str, agent_cls, **agent_kwargs):
+        model = self.models[role]
+        return agent_cls(model=model, client=self.client(model), aclient=self.aclient(model), **agent_kwargs)
+
+    def logger(self) -> LoggingAgent:
+        return LoggingAgent(db_path=self.db_path)
+
+
+def _initial_state(i: int) -> dict:
+    return {
+        "user_input": f"Report {i}: completed feature engineering and prepared slides.",
+        "summary": "",
+        "email_text": "",
+        "evaluation": "",
+        "logs": [],
+        "reflection": ""
+    }
+
+
+def _time_invokes(graph, invokes: int) -> list:
+    graph.invoke(_initial_state(-1))  # warm-up
+    latencies = []
+    for i in range(invokes):
+        start = time.perf_counter()
+        graph.invoke(_initial_state(i))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _time_construction(registry_cls, host: str, db_path: str, rounds: int) -> float:
+    """Mean ms to obtain all four agents and the logger once."""
+    registry = registry_cls(host=host, db_path=db_path)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        registry.summarizer(), registry.email_agent(), registry.evaluator()
+        registry.reflection_agent(), registry.logger()
+    return (time.perf_counter() - start) * 1000 / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--invokes", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, StubOllamaServer() as server:
+        db_path = str(Path(tmp) / "logs.db")
+
+        results = {}
+        for label, registry_cls in (("per-call", FreshAgentRegistry), ("registry", AgentRegistry)):
+            registry = registry_cls(host=server.url, db_path=db_path)
+            latencies = _time_invokes(build_graph(registry), args.invokes)
+            construction = _time_construction(registry_cls, server.url, db_path, args.invokes)
+            results[label] = (latencies, construction)
+            registry.close()
+
+    print(f"{args.invokes} invokes of the 4-node graph against the stub server")
+    for label, (latencies, construction) in results.items():
+        print(
+            f"{label:<9} invoke mean={statistics.mean(latencies):.3f}ms "
+            f"p50={statistics.median(latencies):.3f}ms  agent setup={construction:.3f}ms"
+        )
+    saved = statistics.mean(results["per-call"][0]) - statistics.mean(results["registry"][0])
+    print(f"overhead removed per invoke: {saved:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
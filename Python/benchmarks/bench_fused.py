@@ -0,0 +1,127 @@
+# Python/benchmarks/bench_fused.py
+"""
+Fused summary+email (one structured-JSON call) vs the two-call path.
+
+Reports, over --reports work logs:
+  * mean and p95 latency of producing summary and email each way
+  * output parity: difflib similarity of the fused summary/email to the
+    two-call ones, their length ratio, and how often each email opens with
+    a "Subject:" line
+
+Against the stub (default), the server takes --latency-ms per call and
+generates --tokens-per-second, so the saving is one prompt evaluation plus
+the summary no longer being re-read; parity is only meaningful against a
+real model (--host).
+
+Run with:  python -m Python.benchmarks.bench_fused --reports 10
+           python -m Python.benchmarks.bench_fused --host http://localhost:11434
+"""
+
+import argparse
+import difflib
+import json
+import statistics
+import tempfile
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+from Python.batch import percentile
+from Python.langgraph.registry import AgentRegistry
+from Python.stub_ollama import StubOllamaServer
+
+SUMMARY = (
+    "Completed feature engineering for the sales dataset and resolved several data pipeline defects. "
+    "Met with stakeholders to review progress and prepared slides for tomorrow's presentation."
+)
+EMAIL = (
+    "Subject: Daily Work Update\n\nDear Manager,\n\nI completed feature engineering for the sales "
+    "dataset and resolved several data pipeline defects. I also met with stakeholders to review "
+    "progress and prepared slides for tomorrow's presentation.\n\nBest regards"
+)
+
+
+def _stub_responder(payload: dict) -> str:
+    # Realistic output lengths so generation time counts the way it does on a model
+    if "format" in payload:
+        return json.dumps({"summary": SUMMARY, "email": EMAIL})
+    if "corporate communication assistant" in payload.get("system", ""):
+        return EMAIL
+    return SUMMARY
+
+
+def _worklogs(count: int) -> list:
+    return [
+        f"Report {i}: completed feature engineering for sales data, fixed pipeline bugs, "
+        f"met with stakeholders and prepared slides."
+        for i in range(count)
+    ]
+
+
+def _similarity(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def _two_call(registry: AgentRegistry, worklog: str) -> dict:
+    summary = registry.summarizer().run(worklog)
+    return {"summary": summary, "email_text": registry.email_agent().run(summary)}
+
+
+def _fused(registry: AgentRegistry, worklog: str) -> dict:
+    try:
+        return registry.report_agent().run(worklog)
+    except ValueError:
+        # What the graph's report node does on unusable JSON
+        return _two_call(registry, worklog)
+
+
+def _timed(func, registry: AgentRegistry, worklogs: list) -> tuple:
+    outputs, latencies = [], []
+    for worklog in worklogs:
+        start = time.perf_counter()
+        outputs.append(func(registry, worklog))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return outputs, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reports", type=int, default=10)
+    parser.add_argument("--host", help="Real Ollama server; the stub is used if omitted")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Stub prompt evaluation time")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Stub generation speed")
+    args = parser.parse_args()
+
+    stub = None if args.host else StubOllamaServer(
+        latency_ms=args.latency_ms, tokens_per_second=args.tokens_per_second, responder=_stub_responder
+    )
+    worklogs = _worklogs(args.reports)
+
+    with tempfile.TemporaryDirectory() as tmp, stub or nullcontext():
+        registry = AgentRegistry(host=args.host or stub.url, db_path=str(Path(tmp) / "logs.db"))
+        # Warm both paths (model load, connection) before timing
+        _two_call(registry, worklogs[0])
+        _fused(registry, worklogs[0])
+
+        two_call, two_call_ms = _timed(_two_call, registry, worklogs)
+        fused, fused_ms = _timed(_fused, registry, worklogs)
+        registry.close()
+
+    print(f"{args.reports} reports against {'the stub' if stub else args.host}")
+    for label, latencies in (("two-call", two_call_ms), ("fused", fused_ms)):
+        print(f"{label:<9} mean={statistics.mean(latencies):8.1f}ms p95={percentile(latencies, 95):8.1f}ms")
+    saving = 1 - statistics.mean(fused_ms) / statistics.mean(two_call_ms)
+    print(f"fused saves {saving:.1%} of summary+email latency")
+
+    print("parity (fused vs two-call):")
+    for field in ("summary", "email_text"):
+        similarity = statistics.mean(_similarity(f[field], t[field]) for f, t in zip(fused, two_call))
+        length_ratio = statistics.mean(len(f[field]) / max(1, len(t[field])) for f, t in zip(fused, two_call))
+        print(f"  {field:<11} similarity={similarity:.2f} length ratio={length_ratio:.2f}")
+    for label, outputs in (("two-call", two_call), ("fused", fused)):
+        subjects = sum(o["email_text"].lstrip().lower().startswith("subject:") for o in outputs)
+        print(f"  {label:<9} emails with a Subject line: {subjects}/{len(outputs)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# Python/benchmarks/bench_log_memory.py
+"""
+State size with compact LogEntry records vs the old {"agent", "input",
+"output"} dict entries, on long work logs. The stub echoes the prompt back
+so every output is as long as its input.
+
+Reports, per work-log size:
+  * bytes serialized for every state snapshot of one run (what a values
+    stream or a per-step checkpoint writes) with each entry shape
+  * size of the final state as written by batch mode
+  * tracemalloc peak while the graph runs
+
+Run with:  python -m Python.benchmarks.bench_log_memory --sizes 10000 100000 1000000
+"""
+
+import argparse
+import json
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from Python.langgraph.graph import build_graph, resolve_logs
+from Python.langgraph.registry import AgentRegistry
+from Python.stub_ollama import StubOllamaServer
+
+
+def _legacy(state: dict) -> dict:
+    # The pre-LogEntry shape: every entry carries its own input/output text
+    return {**state, "logs": resolve_logs(state)}
+
+
+def _initial_state(size: int) -> dict:
+    return {
+        "run_id": f"mem-{size}",
+        "user_input": ("fixed pipeline bugs and met stakeholders " * (size // 40 + 1))[:size],
+        "summary": "",
+        "email_text": "",
+        "evaluation": "",
+        "logs": [],
+        "reflection": ""
+    }
+
+
+def _run(graph, size: int) -> tuple:
+    compact_bytes = legacy_bytes = 0
+    final_state = None
+    for snapshot in graph.stream(_initial_state(size), stream_mode="values"):
+        final_state = snapshot
+        compact_bytes += len(json.dumps(snapshot))
+        legacy_bytes += len(json.dumps(_legacy(snapshot)))
+    final_sizes = (len(json.dumps(final_state)), len(json.dumps(_legacy(final_state))))
+
+    # Separate run so the serialization above does not count towards the peak
+    state = _initial_state(size)
+    tracemalloc.start()
+    graph.invoke(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return compact_bytes, legacy_bytes, final_sizes, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp, StubOllamaServer(responder=lambda p: p["prompt"]) as server:
+        registry = AgentRegistry(host=server.url, db_path=str(Path(tmp) / "logs.db"))
+        graph = build_graph(registry)
+
+        print(f"{'work log':>10} {'snapshots compact':>18} {'legacy':>12} {'final compact':>14} {'legacy':>12} {'peak':>10}")
+        for size in args.sizes:
+            compact, legacy, (final_compact, final_legacy), peak = _run(graph, size)
+            print(
+                f"{size / 1000:>8.0f}KB {compact / 1e6:>16.2f}MB {legacy / 1e6:>10.2f}MB "
+                f"{final_compact / 1e6:>12.2f}MB {final_legacy / 1e6:>10.2f}MB {peak / 1e6:>8.1f}MB"
+            )
+        registry.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Python/benchmarks/bench_model_affinity.py
+"""
+Batch wall time and model loads for report-by-report vs stage-by-stage order,
+against a stub server that holds one model at a time and takes --load-ms to
+load one (a memory-constrained Ollama box).
+
+Run with:  python -m Python.benchmarks.bench_model_affinity --reports 20 --load-ms 200
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from Python.batch import run_batch, run_batch_staged
+from Python.langgraph.graph import build_graph
+from Python.langgraph.registry import AgentRegistry
+from Python.stub_ollama import StubOllamaServer
+
+
+def _records(count: int) -> list:
+    return [
+        {"id": str(i), "user_input": f"Report {i}: completed feature engineering and prepared slides."}
+        for i in range(count)
+    ]
+
+
+def _run(staged: bool, args, tmp: str) -> tuple:
+    with StubOllamaServer(load_ms=args.load_ms, max_loaded_models=1) as server:
+        registry = AgentRegistry(host=server.url, db_path=str(Path(tmp) / "logs.db"))
+        output = str(Path(tmp) / f"reports-{'staged' if staged else 'per-report'}.jsonl")
+        start = time.perf_counter()
+        if staged:
+            stats = asyncio.run(run_batch_staged(
+                _records(args.reports), output, concurrency=args.concurrency, registry=registry
+            ))
+        else:
+            stats = asyncio.run(run_batch(
+                _records(args.reports), output, concurrency=args.concurrency,
+                graph=build_graph(registry), progress_every=args.reports + 1,
+            ))
+        elapsed = time.perf_counter() - start
+        registry.close()
+        return elapsed, server.load_count, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reports", type=int, default=20)
+    parser.add_argument("--load-ms", type=float, default=200.0)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        per_report = _run(False, args, tmp)
+        staged = _run(True, args, tmp)
+
+    print(f"{args.reports} reports, concurrency {args.concurrency}, {args.load_ms:.0f}ms per model load")
+    for label, (elapsed, loads, _) in (("per-report", per_report), ("staged", staged)):
+        print(f"{label:<11} wall={elapsed:.2f}s model loads={loads}")
+    print(f"measured saving: {per_report[0] - staged[0]:.2f}s")
+    print(staged[2].summary().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    main()
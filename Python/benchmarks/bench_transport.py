@@ -0,0 +1,73 @@
+# Python/benchmarks/bench_transport.py
+"""
+Per-call latency of OllamaClient.generate against a local stub server:
+one-shot ``requests.post`` (new TCP connection per call) vs. the pooled
+keep-alive session.
+
+Run with:  python -m Python.benchmarks.bench_transport --calls 500
+"""
+
+import argparse
+import statistics
+import time
+
+import requests
+
+from Python.llm_client import OllamaClient
+from Python.stub_ollama import StubOllamaServer
+
+
+def _one_shot_generate(client: OllamaClient, prompt: str) -> str:
+    # Pre-pooling behaviour: module-level requests.post, no connection reuse
+    payload = {
+        "model": client.model,
+        "prompt": prompt,
+        "stream": False,
+        "options": {"temperature": 0.3, "num_predict": 512},
+    }
+    response = requests.post(client.url, json=payload)
+    response.raise_for_status()
+    return response.json().get("response", "").strip()
+
+
+def _time_calls(fn, calls: int) -> list:
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _report(label: str, latencies: list):
+    ordered = sorted(latencies)
+    p95 = ordered[int(0.95 * (len(ordered) - 1))]
+    print(
+        f"{label:<14} mean={statistics.mean(ordered):.3f}ms "
+        f"p50={statistics.median(ordered):.3f}ms p95={p95:.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    prompt = "Completed feature engineering and prepared slides for the meeting."
+
+    with StubOllamaServer() as server:
+        with OllamaClient(host=server.url) as client:
+            # Warm up both paths so the first connection isn't counted
+            _one_shot_generate(client, prompt)
+            client.generate(prompt)
+
+            before = _time_calls(lambda: _one_shot_generate(client, prompt), args.calls)
+            after = _time_calls(lambda: client.generate(prompt), args.calls)
+
+    print(f"{args.calls} calls against {server.url}")
+    _report("requests.post", before)
+    _report("pooled", after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+# Python/benchmarks/suite.py
+"""
+Benchmark suite for the reporting pipeline, run against the stub LLM server
+so model latency does not drown out pipeline overhead.
+
+Run and save results:
+    python -m Python.benchmarks.suite run --output bench/base.json
+Compare two runs (exit code 1 if any metric regressed):
+    python -m Python.benchmarks.suite compare bench/base.json bench/new.json --threshold 0.10
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from Python.agents.email_agent import EmailAgent
+from Python.agents.evaluator import EvaluatorAgent
+from Python.agents.logger import LoggingAgent
+from Python.agents.reflection_agent import ReflectionAgent
+from Python.agents.summarizer import SummarizerAgent
+from Python.batch import percentile, run_batch
+from Python.langgraph.graph import build_graph
+from Python.langgraph.registry import AgentRegistry
+from Python.llm_client import AsyncOllamaClient, OllamaClient
+from Python.stub_ollama import StubOllamaServer
+
+WORKLOG = "Completed feature engineering for sales data, fixed pipeline bugs and prepared slides."
+
+
+def _metric(value: float, unit: str, better: str = "lower") -> dict:
+    return {"value": round(value, 4), "unit": unit, "better": better}
+
+
+def _initial_state(i: int) -> dict:
+    return {
+        "run_id": f"bench-{i}",
+        "user_input": WORKLOG,
+        "summary": "",
+        "email_text": "",
+        "evaluation": "",
+        "logs": [],
+        "reflection": ""
+    }
+
+
+def bench_graph_invoke(server: StubOllamaServer, tmp: str, invokes: int) -> dict:
+    """Per-invoke latency of the compiled graph with an instant LLM."""
+    registry = AgentRegistry(host=server.url, db_path=str(Path(tmp) / "invoke.db"))
+    graph = build_graph(registry)
+    graph.invoke(_initial_state(-1))  # warm-up
+
+    latencies = []
+    for i in range(invokes):
+        start = time.perf_counter()
+        graph.invoke(_initial_state(i))
+        latencies.append((time.perf_counter() - start) * 1000)
+    registry.close()
+
+    return {
+        "graph_invoke_mean_ms": _metric(statistics.mean(latencies), "ms"),
+        "graph_invoke_p95_ms": _metric(percentile(latencies, 95), "ms"),
+    }
+
+
+def bench_log_step(tmp: str, rows: int) -> dict:
+    """LoggingAgent.log_step throughput, including the final flush to SQLite."""
+    logger = LoggingAgent(db_path=str(Path(tmp) / "log_step.db"))
+    output = "x" * 1000
+
+    start = time.perf_counter()
+    for i in range(rows):
+        logger.log_step("BenchNode", WORKLOG, output, run_id=str(i % 100), model="phi3", duration_ms=1.0)
+    logger.flush()
+    elapsed = time.perf_counter() - start
+    logger.close()
+
+    return {"log_step_rows_per_s": _metric(rows / elapsed, "rows/s", better="higher")}
+
+
+def bench_agent_construction(server: StubOllamaServer, tmp: str, rounds: int) -> dict:
+    """Cost of building every agent, client and logger from scratch."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        agents = [
+            cls(model=model, client=OllamaClient(model=model, host=server.url),
+                aclient=AsyncOllamaClient(model=model, host=server.url))
+            for cls, model in (
+                (SummarizerAgent, "llama3.1"), (EmailAgent, "llama3.1"),
+                (EvaluatorAgent, "phi3"), (ReflectionAgent, "phi3"),
+            )
+        ]
+        logger = LoggingAgent(db_path=str(Path(tmp) / "construction.db"))
+        logger.close()
+        for agent in agents:
+            agent.client.close()
+    elapsed = time.perf_counter() - start
+
+    return {"agent_construction_ms": _metric(elapsed * 1000 / rounds, "ms")}
+
+
+def bench_reflection_prompt(rounds: int) -> dict:
+    """ReflectionAgent prompt building for a normal run and for oversized logs."""
+    agent = ReflectionAgent()
+    small = [{"agent": f"Node{i}", "input": WORKLOG, "output": "y" * 800} for i in range(3)]
+    large = [{"agent": f"Node{i}", "input": "x" * 20_000, "output": "y" * 20_000} for i in range(200)]
+
+    results = {}
+    for label, logs in (("small", small), ("large", large)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            agent.build_prompt(logs)
+        results[f"reflection_prompt_{label}_us"] = _metric(
+            (time.perf_counter() - start) * 1_000_000 / rounds, "us"
+        )
+    return results
+
+
+def bench_reports_per_second(tmp: str, reports: int, levels: list, latency_ms: float) -> dict:
+    """End-to-end batch throughput at several concurrency levels, LLM at a fixed latency."""
+    results = {}
+    with StubOllamaServer(latency_ms=latency_ms) as server:
+        for concurrency in levels:
+            registry = AgentRegistry(host=server.url, db_path=str(Path(tmp) / f"batch-{concurrency}.db"))
+            records = [{"id": str(i), "user_input": WORKLOG} for i in range(reports)]
+            output = str(Path(tmp) / f"reports-{concurrency}.jsonl")
+
+            start = time.perf_counter()
+            asyncio.run(run_batch(
+                records, output, concurrency=concurrency,
+                graph=build_graph(registry), progress_every=reports + 1,
+            ))
+            elapsed = time.perf_counter() - start
+            registry.close()
+
+            results[f"reports_per_s_c{concurrency}"] = _metric(reports / elapsed, "reports/s", better="higher")
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_suite(quick: bool = False) -> dict:
+    """
+    Run every benchmark once.
+
+    Args:
+        quick (bool): Fewer iterations, for smoke runs
+
+    Returns:
+        dict: {"meta": {...}, "results": {name: {"value", "unit", "better"}}}
+    """
+    scale = 0.1 if quick else 1.0
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, StubOllamaServer() as server:
+        results.update(bench_graph_invoke(server, tmp, invokes=max(5, int(200 * scale))))
+        results.update(bench_log_step(tmp, rows=max(100, int(20_000 * scale))))
+        results.update(bench_agent_construction(server, tmp, rounds=max(5, int(100 * scale))))
+        results.update(bench_reflection_prompt(rounds=max(5, int(200 * scale))))
+        results.update(bench_reports_per_second(
+            tmp, reports=max(32, int(128 * scale)), levels=[1, 4, 16], latency_ms=20.0
+        ))
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(base: dict, new: dict, threshold: float = 0.10) -> list:
+    """
+    Relative change of every metric present in both runs.
+
+    Args:
+        base (dict): Earlier run_suite() output
+        new (dict): Later run_suite() output
+        threshold (float): Relative worsening that counts as a regression
+
+    Returns:
+        list: (name, base value, new value, change, regressed) per metric;
+            ``change`` is positive when the metric got worse
+    """
+    rows = []
+    for name, before in base["results"].items():
+        after = new["results"].get(name)
+        if after is None or not before["value"]:
+            continue
+        change = (after["value"] - before["value"]) / before["value"]
+        if before.get("better", "lower") == "higher":
+            change = -change
+        rows.append((name, before["value"], after["value"], change, change > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the suite and save JSON results")
+    run_parser.add_argument("--output", default="bench/results.json")
+    run_parser.add_argument("--quick", action="store_true", help="Fewer iterations")
+
+    compare_parser = commands.add_parser("compare", help="Flag regressions between two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Relative change that fails")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_suite(quick=args.quick)
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        for name, metric in results["results"].items():
+            print(f"{name:<32} {metric['value']:>12} {metric['unit']}")
+        print(f"saved to {args.output}")
+        return 0
+
+    base = json.loads(Path(args.base).read_text())
+    new = json.loads(Path(args.new).read_text())
+    regressions = 0
+    print(f"{'metric':<32} {'base':>12}    {'new':<12} worse by")
+    for name, before, after, change, regressed in compare(base, new, args.threshold):
+        regressions += regressed
+        flag = "REGRESSION" if regressed else ""
+        print(f"{name:<32} {before:>12} -> {after:<12} {change:+.1%} {flag}")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
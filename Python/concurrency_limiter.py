@@ -0,0 +1,277 @@
+# Python/concurrency_limiter.py
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+
+from Python.metrics import METRICS, CallMetrics
+
+
+def _first_token_ms(metrics: Optional[CallMetrics]) -> Optional[float]:
+    """
+    Client-side wait for the first token: queueing at the server + model
+    load + prompt evaluation. Streamed calls measure it directly; for
+    non-streamed ones it is the wall time minus generation time.
+    """
+    if metrics is None or metrics.wall_ms is None:
+        return None
+    if metrics.streamed:
+        return metrics.ttft_ms
+    return metrics.wall_ms - (metrics.eval_ms or 0.0)
+
+
+def _p95(values: list) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class Slot:
+    """Held for one call; the client sets ``metrics`` once the call finished."""
+    __slots__ = ("metrics",)
+
+    def __init__(self):
+        self.metrics = None
+
+
+class _Limit:
+    __slots__ = ("limit", "in_flight", "waiting", "samples", "errors", "latencies", "saturated", "baseline_ms")
+
+    def __init__(self, limit: float):
+        self.limit = limit
+        self.in_flight = 0
+        self.waiting = 0
+        self.samples = 0
+        self.errors = 0
+        self.latencies = []
+        self.saturated = False  # callers hit the limit during this window
+        self.baseline_ms = None  # p95 time-to-first-token when not overloaded
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit per (host, model) in front of Ollama.
+
+    Calls beyond the current limit wait for a slot. Every ``window``
+    completed calls the limit is re-evaluated from that window:
+
+    * error rate above ``error_rate_threshold``, or p95 time-to-first-token
+      more than ``latency_tolerance`` times the baseline: multiply the limit
+      by ``backoff`` (Ollama is queueing or failing)
+    * otherwise, if callers were held back by the limit, add one (its
+      parallel slots may be idle)
+
+    The baseline is the lowest p95 seen, drifting up slowly while latency is
+    within tolerance so longer prompts do not read as overload forever.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        window: int = 20,
+        latency_tolerance: float = 1.5,
+        error_rate_threshold: float = 0.1,
+        backoff: float = 0.75,
+    ):
+        """
+        Args:
+            initial_limit (int): In-flight calls allowed before any feedback
+            min_limit (int): The limit never drops below this
+            max_limit (int): The limit never rises above this
+            window (int): Completed calls per re-evaluation
+            latency_tolerance (float): p95 TTFT over baseline that counts as overload
+            error_rate_threshold (float): Failed share of a window that counts as overload
+            backoff (float): Multiplicative decrease on overload
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("need 1 <= min_limit <= initial_limit <= max_limit")
+
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.window = window
+        self.latency_tolerance = latency_tolerance
+        self.error_rate_threshold = error_rate_threshold
+        self.backoff = backoff
+
+        self._limits = {}  # (host, model) -> _Limit
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._async_waiters = []  # (loop, future) pairs woken on release
+
+    def _state(self, key: tuple) -> _Limit:
+        """Lock held."""
+        state = self._limits.get(key)
+        if state is None:
+            state = self._limits[key] = _Limit(float(self.initial_limit))
+        return state
+
+    def _try_take(self, state: _Limit) -> bool:
+        """Lock held."""
+        if state.in_flight < int(state.limit):
+            state.in_flight += 1
+            if state.in_flight == int(state.limit):
+                state.saturated = True
+            return True
+        state.saturated = True
+        return False
+
+    def acquire(self, host: str, model: str, timeout: Optional[float] = None):
+        """Wait for a slot for ``model`` on ``host``; pair with release()."""
+        key = (host, model)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._available:
+            state = self._state(key)
+            if self._try_take(state):
+                self._report(key, state)
+                return
+            state.waiting += 1
+            self._report(key, state)
+            try:
+                while not self._try_take(state):
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"no concurrency slot for {model} on {host} within {timeout}s")
+                    self._available.wait(remaining)
+            finally:
+                state.waiting -= 1
+                self._report(key, state)
+
+    async def aacquire(self, host: str, model: str):
+        """asyncio version of acquire(); waits without blocking the event loop."""
+        key = (host, model)
+        loop = asyncio.get_running_loop()
+        queued = False
+        try:
+            while True:
+                with self._lock:
+                    state = self._state(key)
+                    if self._try_take(state):
+                        return
+                    if not queued:
+                        queued = True
+                        state.waiting += 1
+                        self._report(key, state)
+                    waiter = loop.create_future()
+                    self._async_waiters.append((loop, waiter))
+                try:
+                    await asyncio.wait_for(waiter, timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if queued:
+                with self._lock:
+                    state.waiting -= 1
+                    self._report(key, state)
+
+    def release(self, host: str, model: str, first_token_ms: Optional[float] = None, ok: bool = True):
+        """
+        Return a slot and feed the call's outcome into the limit.
+
+        Args:
+            first_token_ms (float | None): Time to first token of the call
+            ok (bool): False if the call failed
+        """
+        key = (host, model)
+        with self._lock:
+            state = self._state(key)
+            state.in_flight -= 1
+            state.samples += 1
+            if not ok:
+                state.errors += 1
+            elif first_token_ms is not None:
+                state.latencies.append(first_token_ms)
+            if state.samples >= self.window:
+                self._adjust(key, state)
+            self._report(key, state)
+
+            self._available.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # That event loop is closed; nobody is waiting any more
+                pass
+
+    def _adjust(self, key: tuple, state: _Limit):
+        """End of a window: AIMD step. Lock held."""
+        error_rate = state.errors / state.samples
+        p95 = _p95(state.latencies) if state.latencies else None
+        slow = p95 is not None and state.baseline_ms is not None and p95 > state.baseline_ms * self.latency_tolerance
+
+        if error_rate > self.error_rate_threshold or slow:
+            state.limit = max(float(self.min_limit), state.limit * self.backoff)
+            METRICS.inc(
+                "llm_concurrency_backoffs_total", labels={"host": key[0], "model": key[1]},
+                help_text="Times the adaptive concurrency limit was cut",
+            )
+        else:
+            if p95 is not None:
+                if state.baseline_ms is None or p95 < state.baseline_ms:
+                    state.baseline_ms = p95
+                else:
+                    state.baseline_ms += (p95 - state.baseline_ms) * 0.1
+            if state.saturated:
+                state.limit = min(float(self.max_limit), state.limit + 1)
+
+        state.samples = state.errors = 0
+        state.latencies = []
+        state.saturated = state.in_flight >= int(state.limit)
+
+    def _report(self, key: tuple, state: _Limit):
+        labels = {"host": key[0], "model": key[1]}
+        METRICS.set_gauge("llm_concurrency_limit", int(state.limit), labels, "Adaptive in-flight limit")
+        METRICS.set_gauge("llm_concurrency_queue_depth", state.waiting, labels, "Calls waiting for a concurrency slot")
+
+    @contextmanager
+    def slot(self, host: str, model: str):
+        """Hold a slot around one call; set ``slot.metrics`` when it finishes."""
+        self.acquire(host, model)
+        slot = Slot()
+        failed = False
+        try:
+            yield slot
+        except Exception:
+            failed = True
+            raise
+        finally:
+            # A consumer abandoning a stream (GeneratorExit) is not a failure
+            self.release(host, model, None if failed else _first_token_ms(slot.metrics), ok=not failed)
+
+    @asynccontextmanager
+    async def aslot(self, host: str, model: str):
+        """asyncio version of slot()."""
+        await self.aacquire(host, model)
+        slot = Slot()
+        failed = False
+        try:
+            yield slot
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(host, model, None if failed else _first_token_ms(slot.metrics), ok=not failed)
+
+    def snapshot(self) -> list:
+        """Current limit and load per (host, model), for logs and debugging."""
+        with self._lock:
+            return [
+                {
+                    "host": host,
+                    "model": model,
+                    "limit": int(state.limit),
+                    "in_flight": state.in_flight,
+                    "waiting": state.waiting,
+                    "baseline_ms": state.baseline_ms,
+                }
+                for (host, model), state in self._limits.items()
+            ]
+
+
+def _wake(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
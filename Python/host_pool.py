@@ -0,0 +1,942 @@
+# Python/host_pool.py
+
+import asyncio
+import queue
+import socket
+import sys
+import threading
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from Python.llm_client import (
+    AsyncOllamaClient,
+    OllamaClient,
+    _acoalesce,
+    _cache_lookup,
+    _coalesce,
+    _flight_key,
+)
+from Python.metrics import METRICS
+from Python.resilience import CircuitOpenError, count_hedge, count_hedge_win, count_retry, is_transient
+
+
+class NoHealthyHostError(RuntimeError):
+    """Every host in the pool is ejected."""
+
+
+def _model_tag(model: str) -> str:
+    # Ollama reports loaded models with their tag ("phi3:latest")
+    return model if ":" in model else f"{model}:latest"
+
+
+class _Host:
+    __slots__ = ("url", "in_flight", "failures", "ejected_until", "loaded")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.in_flight = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.loaded = set()  # model tags resident on the host, as far as we know
+
+
+class HostPool:
+    """
+    Routes requests over several Ollama hosts.
+
+    Each request goes to the host with the fewest in-flight requests among
+    those that already have the model loaded, falling back to the least
+    loaded host otherwise. A host takes at most ``max_in_flight`` requests
+    at once; callers wait for a free slot. After ``failure_threshold``
+    failed requests or a failed health check, a host is ejected for
+    ``eject_seconds`` and then gets traffic again on probation (one more
+    failure ejects it again).
+
+    A daemon thread polls ``/api/ps`` on every host each ``health_interval``
+    seconds, which both checks liveness and refreshes the loaded models.
+    """
+
+    def __init__(
+        self,
+        hosts: list,
+        max_in_flight: int = 4,
+        failure_threshold: int = 3,
+        eject_seconds: float = 30.0,
+        health_interval: Optional[float] = 15.0,
+        health_timeout: float = 2.0,
+    ):
+        """
+        Args:
+            hosts (list): Base URLs of the Ollama servers
+            max_in_flight (int): Concurrency cap per host
+            failure_threshold (int): Consecutive failures before a host is ejected
+            eject_seconds (float): How long an ejected host gets no traffic
+            health_interval (float | None): Seconds between health checks (None = off)
+            health_timeout (float): Timeout of one health check request
+        """
+        if not hosts:
+            raise ValueError("HostPool needs at least one host")
+
+        self.max_in_flight = max_in_flight
+        self.failure_threshold = failure_threshold
+        self.eject_seconds = eject_seconds
+        self.health_timeout = health_timeout
+
+        self._hosts = [_Host(url.rstrip("/")) for url in hosts]
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._async_waiters = []  # (loop, future) pairs woken on release
+        self._session = requests.Session()
+
+        self._stopped = threading.Event()
+        self._health_thread = None
+        if health_interval:
+            self._health_thread = threading.Thread(
+                target=self._health_loop, args=(health_interval,), name="HostPoolHealth", daemon=True
+            )
+            self._health_thread.start()
+
+    @property
+    def hosts(self) -> list:
+        return [host.url for host in self._hosts]
+
+    def _pick(self, model: str, exclude=()) -> Optional[_Host]:
+        """Least-outstanding host with a free slot, preferring ones with the model loaded. Lock held."""
+        now = time.monotonic()
+        live = [host for host in self._hosts if host.ejected_until <= now]
+        if not live:
+            raise NoHealthyHostError(f"all {len(self._hosts)} Ollama hosts are ejected")
+
+        free = [host for host in live if host.in_flight < self.max_in_flight and host.url not in exclude]
+        if not free:
+            return None
+
+        tag = _model_tag(model)
+        warm = [host for host in free if tag in host.loaded]
+        host = min(warm or free, key=lambda h: h.in_flight)
+        host.in_flight += 1
+        self._report(host)
+        return host
+
+    def _report(self, host: _Host):
+        METRICS.set_gauge(
+            "ollama_host_in_flight", host.in_flight, {"host": host.url}, "Requests in flight per Ollama host"
+        )
+
+    def acquire(self, model: str, timeout: Optional[float] = None) -> str:
+        """
+        Reserve a slot on the best host for ``model``, waiting while every
+        live host is at its cap.
+
+        Returns:
+            str: Host URL; pass it to release() when the request is done
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._available:
+            while True:
+                host = self._pick(model)
+                if host is not None:
+                    return host.url
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"no free Ollama host slot for {model} within {timeout}s")
+                # Woken on release; the timeout also lets ejections expire
+                self._available.wait(min(remaining, 1.0) if remaining is not None else 1.0)
+
+    async def aacquire(self, model: str) -> str:
+        """asyncio version of acquire(); waits without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                host = self._pick(model)
+                if host is not None:
+                    return host.url
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await asyncio.wait_for(waiter, timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+
+    def try_acquire(self, model: str, exclude=()) -> Optional[str]:
+        """
+        Reserve a slot without waiting, e.g. for a hedged duplicate.
+
+        Args:
+            exclude (iterable): Host URLs not to use
+
+        Returns:
+            str | None: Host URL, or None if no other live host has a free slot
+        """
+        with self._lock:
+            try:
+                host = self._pick(model, exclude)
+            except NoHealthyHostError:
+                return None
+            return host.url if host is not None else None
+
+    def release(self, url: str, model: Optional[str] = None, ok: bool = True):
+        """
+        Return a slot taken with acquire().
+
+        Args:
+            url (str): Host the request went to
+            model (str | None): Model it used; a success marks it loaded there
+            ok (bool): False if the host failed (connection error, timeout, 5xx)
+        """
+        with self._lock:
+            host = self._host(url)
+            host.in_flight -= 1
+            if ok:
+                host.failures = 0
+                if model:
+                    host.loaded.add(_model_tag(model))
+            else:
+                self._record_failure(host)
+            self._report(host)
+
+            self._available.notify_all()
+            waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # That event loop is closed; nobody is waiting any more
+                pass
+
+    def mark_loaded(self, url: str, model: str, loaded: bool = True):
+        """Record that ``model`` was loaded on (or unloaded from) a host."""
+        with self._lock:
+            host = self._host(url)
+            if loaded:
+                host.loaded.add(_model_tag(model))
+            else:
+                host.loaded.discard(_model_tag(model))
+
+    def _host(self, url: str) -> _Host:
+        for host in self._hosts:
+            if host.url == url:
+                return host
+        raise KeyError(url)
+
+    def _record_failure(self, host: _Host, eject: bool = False):
+        host.failures += 1
+        if eject or host.failures >= self.failure_threshold:
+            if host.ejected_until <= time.monotonic():
+                print(f"[HostPool] ejecting {host.url} for {self.eject_seconds}s", file=sys.stderr)
+                METRICS.inc("ollama_host_ejections_total", labels={"host": host.url}, help_text="Hosts ejected")
+            host.ejected_until = time.monotonic() + self.eject_seconds
+            host.loaded.clear()
+
+    def check_health(self) -> dict:
+        """
+        Probe every host's ``/api/ps``. Healthy hosts are readmitted and
+        their loaded models refreshed; unreachable ones are ejected.
+
+        Returns:
+            dict: host URL -> healthy
+        """
+        results = {}
+        for host in self._hosts:
+            try:
+                response = self._session.get(f"{host.url}/api/ps", timeout=self.health_timeout)
+                response.raise_for_status()
+                loaded = {entry.get("name") or entry.get("model") for entry in response.json().get("models", [])}
+            except (requests.RequestException, ValueError):
+                with self._lock:
+                    self._record_failure(host, eject=True)
+                results[host.url] = False
+                continue
+
+            with self._lock:
+                host.failures = 0
+                host.ejected_until = 0.0
+                host.loaded = {_model_tag(name) for name in loaded if name}
+                self._available.notify_all()
+            results[host.url] = True
+        return results
+
+    def _health_loop(self, interval: float):
+        while not self._stopped.is_set():
+            self.check_health()
+            self._stopped.wait(interval)
+
+    def live_hosts(self) -> list:
+        now = time.monotonic()
+        with self._lock:
+            return [host.url for host in self._hosts if host.ejected_until <= now]
+
+    def snapshot(self) -> list:
+        """Per-host routing state, for logs and debugging."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "host": host.url,
+                    "in_flight": host.in_flight,
+                    "failures": host.failures,
+                    "ejected": host.ejected_until > now,
+                    "loaded": sorted(host.loaded),
+                }
+                for host in self._hosts
+            ]
+
+    def close(self):
+        """Stop health checks."""
+        self._stopped.set()
+        self._session.close()
+
+    def __len__(self) -> int:
+        return len(self._hosts)
+
+
+def _wake(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def _is_host_failure(exc: Exception) -> bool:
+    """Connection errors, timeouts, 5xx and open circuits count against the host; 4xx do not."""
+    response = getattr(exc, "response", None)
+    if response is not None:
+        return response.status_code >= 500
+    return True
+
+
+def _replaces_attempt(exc: Exception, failures: int, retry, hosts: int) -> bool:
+    """
+    Whether a hedged call starts another attempt after its ``failures``-th
+    attempt failed before any token. Without a RetryPolicy, like the
+    unhedged failover, each host gets one try.
+    """
+    if not (_is_host_failure(exc) or is_transient(exc)):
+        return False  # a 4xx would fail the same way on every host
+    return failures < (retry.max_attempts if retry is not None else hosts)
+
+
+class HedgeCancelled(BaseException):
+    """
+    A hedged attempt was abandoned for a faster host while awaiting its
+    response. A BaseException like asyncio.CancelledError, so retries, the
+    circuit breaker and the concurrency limiter do not count it as a failure.
+    """
+
+
+class _Attempt:
+    """
+    One sync hedged attempt. While its thread waits for the response
+    headers (the host is still evaluating the prompt) nothing checks a flag,
+    so abandon() shuts that connection's socket down to wake it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.abandoned = False
+        self.waiting_on = None  # connection blocked in getresponse()
+
+    def abandon(self):
+        with self.lock:
+            self.abandoned = True
+            conn = self.waiting_on
+        sock = getattr(conn, "sock", None)
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # already closed
+
+
+# Hedged attempt run by the current thread, if any
+_current_attempt = threading.local()
+
+
+class _AbortableMixin:
+    def getresponse(self, *args, **kwargs):
+        attempt = getattr(_current_attempt, "attempt", None)
+        if attempt is None:
+            return super().getresponse(*args, **kwargs)
+        with attempt.lock:
+            if attempt.abandoned:
+                raise HedgeCancelled("hedged attempt abandoned")
+            attempt.waiting_on = self
+        try:
+            return super().getresponse(*args, **kwargs)
+        except Exception:
+            # Not a host failure: keep it out of the retry and breaker paths
+            if attempt.abandoned:
+                raise HedgeCancelled("hedged attempt abandoned") from None
+            raise
+        finally:
+            with attempt.lock:
+                attempt.waiting_on = None
+
+
+class _AbortableHTTPConnection(_AbortableMixin, HTTPConnection):
+    pass
+
+
+class _AbortableHTTPSConnection(_AbortableMixin, HTTPSConnection):
+    pass
+
+
+class _AbortableHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _AbortableHTTPConnection
+
+
+class _AbortableHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _AbortableHTTPSConnection
+
+
+class _AbortableAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _AbortableHTTPConnectionPool,
+            "https": _AbortableHTTPSConnectionPool,
+        }
+
+
+def _hedge_session(pool_maxsize: int) -> requests.Session:
+    """Keep-alive session whose requests a hedged call can abandon mid-wait."""
+    session = requests.Session()
+    adapter = _AbortableAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class PooledOllamaClient:
+    """
+    OllamaClient over a HostPool, with the same generate/generate_stream/
+    load interface so agents and the registry can use it unchanged.
+
+    A call that fails on one host before any text was streamed is retried
+    on another live host. With a HedgePolicy, a call still waiting for its
+    first token after the hedge delay is duplicated on a second host; the
+    first to start answering is used and the other is abandoned. A hedged
+    attempt that fails before its first token is replaced on another host
+    at once, within the RetryPolicy's attempt budget.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        pool: HostPool,
+        cache=None,
+        keep_alive=None,
+        single_flight=None,
+        hedge=None,
+        retry=None,
+        **client_kwargs,
+    ):
+        """
+        Args:
+            model (str): Ollama model name
+            pool (HostPool): Hosts to route over
+            cache (ResponseCache | None): Checked before a host slot is taken
+            keep_alive (str | int | None): Sent with every request
+            single_flight (SingleFlight | None): Identical concurrent calls
+                share one generation (and one host slot)
+            hedge (HedgePolicy | None): When to duplicate a slow call on a
+                second host
+            retry (RetryPolicy | None): Per-host retries; with ``hedge``, also
+                the budget of attempts a hedged call may start after failures
+            client_kwargs: Extra OllamaClient arguments for the per-host
+                clients (timeouts, breaker)
+        """
+        self.model = model
+        self.pool = pool
+        self.cache = cache
+        self.single_flight = single_flight
+        self.hedge = hedge
+        self.retry = retry
+        # Hedged losers are cut off while they wait; those sessions are ours to close
+        self._sessions = {}
+        if hedge is not None:
+            pool_maxsize = client_kwargs.pop("pool_maxsize", 10)
+            self._sessions = {url: _hedge_session(pool_maxsize) for url in pool.hosts}
+        self._clients = {
+            url: OllamaClient(
+                model=model, host=url, keep_alive=keep_alive, retry=retry,
+                session=self._sessions.get(url), **client_kwargs
+            )
+            for url in pool.hosts
+        }
+
+    @property
+    def keep_alive(self):
+        return next(iter(self._clients.values())).keep_alive
+
+    @keep_alive.setter
+    def keep_alive(self, keep_alive):
+        for client in self._clients.values():
+            client.keep_alive = keep_alive
+
+    @property
+    def limiter(self):
+        return next(iter(self._clients.values())).limiter
+
+    @limiter.setter
+    def limiter(self, limiter):
+        # Limits are kept per host inside the limiter, next to the pool's caps
+        for client in self._clients.values():
+            client.limiter = limiter
+
+    def generate(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: int = 512,
+        on_token: Optional[Callable[[str], None]] = None,
+        num_ctx: Optional[int] = None,
+        format=None,
+    ) -> str:
+        cache_key, cached = _cache_lookup(
+            self.cache, self.model, system, prompt, temperature, max_tokens, num_ctx, format
+        )
+        if cached is not None:
+            if on_token is not None:
+                on_token(cached)
+            return cached
+
+        def call() -> str:
+            text = self._generate(prompt, system, temperature, max_tokens, on_token, num_ctx, format)
+            if cache_key is not None:
+                self.cache.set(cache_key, text)
+            return text
+
+        key = _flight_key(self.model, system, prompt, temperature, max_tokens, num_ctx, format)
+        return _coalesce(self.single_flight, key, self.model, call, on_token)
+
+    def _generate(self, prompt, system, temperature, max_tokens, on_token, num_ctx, format) -> str:
+        if self.hedge is not None and len(self.pool) > 1:
+            return self._hedged(prompt, system, temperature, max_tokens, on_token, num_ctx, format)
+
+        streamed = []
+
+        def forward(token: str):
+            streamed.append(token)
+            on_token(token)
+
+        for attempt in range(len(self.pool)):
+            url = self.pool.acquire(self.model)
+            ok = True
+            try:
+                return self._clients[url].generate(
+                    prompt, system, temperature, max_tokens,
+                    on_token=forward if on_token is not None else None, num_ctx=num_ctx, format=format,
+                )
+            except (requests.RequestException, CircuitOpenError) as exc:
+                ok = not _is_host_failure(exc)
+                # Retrying after tokens went out would repeat them to the caller
+                if ok or streamed or attempt == len(self.pool) - 1:
+                    raise
+            finally:
+                # Also on a failing on_token callback: the slot must not leak
+                self.pool.release(url, self.model, ok=ok)
+
+    def _hedged(self, prompt, system, temperature, max_tokens, on_token, num_ctx, format) -> str:
+        """
+        Stream the call from one host; if no token arrived within the hedge
+        delay, start the same call on a second host. Attempts run in threads
+        and report to this one, which forwards only the winner's tokens.
+        An attempt that fails before any token is replaced straight away.
+        """
+        events = queue.Queue()  # (attempt, kind, value)
+        attempts = []           # per attempt: _Attempt, abandoned once another wins
+        urls = []
+        started = []            # per attempt: perf_counter() at launch
+        released = set()        # attempts whose pool slot was given back
+        release_lock = threading.Lock()
+
+        def release(index: int, ok: bool):
+            with release_lock:
+                if index in released:
+                    return
+                released.add(index)
+            self.pool.release(urls[index], self.model, ok=ok)
+
+        def abandon(index: int):
+            attempts[index].abandon()
+            # The host did nothing wrong; its slot is free from now on
+            release(index, ok=True)
+
+        def run(index: int, url: str):
+            _current_attempt.attempt = attempts[index]
+            try:
+                stream = self._clients[url].generate_stream(
+                    prompt, system, temperature, max_tokens, num_ctx, format
+                )
+                try:
+                    for token in stream:
+                        if attempts[index].abandoned:
+                            break
+                        events.put((index, "token", token))
+                finally:
+                    # Mid-stream, closing drops the connection so Ollama stops
+                    # generating; a loser still waiting was cut off by abandon()
+                    stream.close()
+            except HedgeCancelled:
+                release(index, ok=True)
+                return
+            except Exception as exc:
+                release(index, ok=not _is_host_failure(exc))
+                events.put((index, "error", exc))
+                return
+            finally:
+                _current_attempt.attempt = None
+            # Slot first, so it is free by the time generate() returns
+            release(index, ok=True)
+            events.put((index, "done", None))
+
+        def launch(url: str):
+            attempts.append(_Attempt())
+            urls.append(url)
+            started.append(time.perf_counter())
+            threading.Thread(target=run, args=(len(urls) - 1, url), name="HedgedCall", daemon=True).start()
+
+        delay = self.hedge.delay(self.model)
+        launch(self.pool.acquire(self.model))
+        hedge_at = None if delay is None else started[0] + delay
+        winner, chunks, running, failures = None, [], 1, 0
+        try:
+            while True:
+                timeout = None
+                if winner is None and hedge_at is not None and running == 1:
+                    timeout = max(0.0, hedge_at - time.perf_counter())
+                try:
+                    index, kind, value = events.get(timeout=timeout)
+                except queue.Empty:
+                    # Hedge at most once per call; with no spare host, wait instead
+                    hedge_at = None
+                    url = self.pool.try_acquire(self.model, exclude=urls)
+                    if url is not None:
+                        count_hedge(self.model)
+                        launch(url)
+                        running += 1
+                    continue
+
+                if kind == "token":
+                    if winner is None:
+                        winner = index
+                        self.hedge.observe(self.model, (time.perf_counter() - started[index]) * 1000)
+                        if index > 0:
+                            count_hedge_win(self.model)
+                        for other in range(len(attempts)):
+                            if other != winner:
+                                abandon(other)
+                    if index == winner:
+                        chunks.append(value)
+                        if on_token is not None:
+                            on_token(value)
+                    continue
+
+                running -= 1
+                if kind == "done" and winner in (None, index):
+                    return "".join(chunks).strip()
+                if kind != "error" or winner not in (None, index):
+                    continue
+                if index == winner:
+                    raise value
+
+                # Nothing streamed yet: replace the failed attempt, preferring an untried host
+                failures += 1
+                if _replaces_attempt(value, failures, self.retry, len(self.pool)):
+                    url = self.pool.try_acquire(self.model, exclude=urls)
+                    if url is None and running == 0:
+                        if self.retry is not None:
+                            time.sleep(self.retry.delay(failures))
+                        url = self.pool.acquire(self.model)
+                    if url is not None:
+                        count_retry(urls[index], self.model)
+                        launch(url)
+                        running += 1
+                        if hedge_at is not None:
+                            hedge_at = started[-1] + delay
+                        continue
+                if running == 0:
+                    raise value
+        finally:
+            for index in range(len(attempts)):
+                if index != winner:
+                    abandon(index)
+                else:
+                    attempts[index].abandoned = True
+
+    def generate_stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: int = 512,
+        num_ctx: Optional[int] = None,
+        format=None,
+    ) -> Iterator[str]:
+        url = self.pool.acquire(self.model)
+        ok = True
+        try:
+            yield from self._clients[url].generate_stream(
+                prompt, system, temperature, max_tokens, num_ctx, format
+            )
+        except requests.RequestException as exc:
+            ok = not _is_host_failure(exc)
+            raise
+        finally:
+            self.pool.release(url, self.model, ok=ok)
+
+    def load(self, keep_alive=None) -> float:
+        """Load the model on every live host; returns the slowest load in ms."""
+        timings = [0.0]
+        for url in self.pool.live_hosts():
+            timings.append(self._clients[url].load(keep_alive))
+            self.pool.mark_loaded(url, self.model, loaded=keep_alive != 0)
+        return max(timings)
+
+    def unload(self):
+        self.load(keep_alive=0)
+
+    def close(self):
+        for client in self._clients.values():
+            client.close()
+        for session in self._sessions.values():
+            session.close()
+
+
+class AsyncPooledOllamaClient:
+    """asyncio counterpart of PooledOllamaClient over AsyncOllamaClients."""
+
+    def __init__(
+        self,
+        model: str,
+        pool: HostPool,
+        cache=None,
+        keep_alive=None,
+        single_flight=None,
+        hedge=None,
+        retry=None,
+        **client_kwargs,
+    ):
+        self.model = model
+        self.pool = pool
+        self.cache = cache
+        self.single_flight = single_flight
+        self.hedge = hedge
+        self.retry = retry
+        self._clients = {
+            url: AsyncOllamaClient(model=model, host=url, keep_alive=keep_alive, retry=retry, **client_kwargs)
+            for url in pool.hosts
+        }
+
+    @property
+    def keep_alive(self):
+        return next(iter(self._clients.values())).keep_alive
+
+    @keep_alive.setter
+    def keep_alive(self, keep_alive):
+        for client in self._clients.values():
+            client.keep_alive = keep_alive
+
+    @property
+    def limiter(self):
+        return next(iter(self._clients.values())).limiter
+
+    @limiter.setter
+    def limiter(self, limiter):
+        # Limits are kept per host inside the limiter, next to the pool's caps
+        for client in self._clients.values():
+            client.limiter = limiter
+
+    async def generate(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: int = 512,
+        on_token: Optional[Callable[[str], None]] = None,
+        num_ctx: Optional[int] = None,
+        format=None,
+    ) -> str:
+        cache_key, cached = _cache_lookup(
+            self.cache, self.model, system, prompt, temperature, max_tokens, num_ctx, format
+        )
+        if cached is not None:
+            if on_token is not None:
+                on_token(cached)
+            return cached
+
+        async def call() -> str:
+            text = await self._generate(prompt, system, temperature, max_tokens, on_token, num_ctx, format)
+            if cache_key is not None:
+                self.cache.set(cache_key, text)
+            return text
+
+        key = _flight_key(self.model, system, prompt, temperature, max_tokens, num_ctx, format)
+        return await _acoalesce(self.single_flight, key, self.model, call, on_token)
+
+    async def _generate(self, prompt, system, temperature, max_tokens, on_token, num_ctx, format) -> str:
+        import httpx
+
+        if self.hedge is not None and len(self.pool) > 1:
+            return await self._hedged(prompt, system, temperature, max_tokens, on_token, num_ctx, format)
+
+        streamed = []
+
+        def forward(token: str):
+            streamed.append(token)
+            on_token(token)
+
+        for attempt in range(len(self.pool)):
+            url = await self.pool.aacquire(self.model)
+            ok = True
+            try:
+                return await self._clients[url].generate(
+                    prompt, system, temperature, max_tokens,
+                    on_token=forward if on_token is not None else None, num_ctx=num_ctx, format=format,
+                )
+            except (httpx.HTTPError, CircuitOpenError) as exc:
+                ok = not _is_host_failure(exc)
+                if ok or streamed or attempt == len(self.pool) - 1:
+                    raise
+            finally:
+                # Also on cancellation (e.g. asyncio.wait_for timing out)
+                self.pool.release(url, self.model, ok=ok)
+
+    async def _hedged(self, prompt, system, temperature, max_tokens, on_token, num_ctx, format) -> str:
+        """asyncio version of PooledOllamaClient._hedged; losing attempts are cancelled."""
+        events = asyncio.Queue()  # (attempt, kind, value)
+        tasks = []
+        urls = []
+        started = []
+        released = set()
+
+        def release(index: int, ok: bool):
+            if index not in released:
+                released.add(index)
+                self.pool.release(urls[index], self.model, ok=ok)
+
+        def abandon(index: int):
+            tasks[index].cancel()
+            # Free the slot now rather than when the task gets to its cancellation
+            release(index, ok=True)
+
+        async def run(index: int, url: str):
+            ok = True
+            try:
+                stream = self._clients[url].generate_stream(
+                    prompt, system, temperature, max_tokens, num_ctx, format
+                )
+                # aclosing: a cancelled loser closes its connection right away
+                async with aclosing(stream):
+                    async for token in stream:
+                        events.put_nowait((index, "token", token))
+                events.put_nowait((index, "done", None))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                ok = not _is_host_failure(exc)
+                events.put_nowait((index, "error", exc))
+            finally:
+                release(index, ok)
+
+        def launch(url: str):
+            urls.append(url)
+            started.append(time.perf_counter())
+            tasks.append(asyncio.ensure_future(run(len(urls) - 1, url)))
+
+        delay = self.hedge.delay(self.model)
+        launch(await self.pool.aacquire(self.model))
+        hedge_at = None if delay is None else started[0] + delay
+        winner, chunks, running, failures = None, [], 1, 0
+        try:
+            while True:
+                timeout = None
+                if winner is None and hedge_at is not None and running == 1:
+                    timeout = max(0.0, hedge_at - time.perf_counter())
+                try:
+                    index, kind, value = await asyncio.wait_for(events.get(), timeout)
+                except asyncio.TimeoutError:
+                    hedge_at = None
+                    url = self.pool.try_acquire(self.model, exclude=urls)
+                    if url is not None:
+                        count_hedge(self.model)
+                        launch(url)
+                        running += 1
+                    continue
+
+                if kind == "token":
+                    if winner is None:
+                        winner = index
+                        self.hedge.observe(self.model, (time.perf_counter() - started[index]) * 1000)
+                        if index > 0:
+                            count_hedge_win(self.model)
+                        for other in range(len(tasks)):
+                            if other != winner:
+                                abandon(other)
+                    if index == winner:
+                        chunks.append(value)
+                        if on_token is not None:
+                            on_token(value)
+                    continue
+
+                running -= 1
+                if kind == "done" and winner in (None, index):
+                    return "".join(chunks).strip()
+                if kind != "error" or winner not in (None, index):
+                    continue
+                if index == winner:
+                    raise value
+
+                failures += 1
+                if _replaces_attempt(value, failures, self.retry, len(self.pool)):
+                    url = self.pool.try_acquire(self.model, exclude=urls)
+                    if url is None and running == 0:
+                        if self.retry is not None:
+                            await asyncio.sleep(self.retry.delay(failures))
+                        url = await self.pool.aacquire(self.model)
+                    if url is not None:
+                        count_retry(urls[index], self.model)
+                        launch(url)
+                        running += 1
+                        if hedge_at is not None:
+                            hedge_at = started[-1] + delay
+                        continue
+                if running == 0:
+                    raise value
+        finally:
+            for index in range(len(tasks)):
+                abandon(index)
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: int = 512,
+        num_ctx: Optional[int] = None,
+        format=None,
+    ) -> AsyncIterator[str]:
+        import httpx
+
+        url = await self.pool.aacquire(self.model)
+        ok = True
+        try:
+            async for token in self._clients[url].generate_stream(
+                prompt, system, temperature, max_tokens, num_ctx, format
+            ):
+                yield token
+        except httpx.HTTPError as exc:
+            ok = not _is_host_failure(exc)
+            raise
+        finally:
+            self.pool.release(url, self.model, ok=ok)
+
+    async def aclose(self):
+        for client in self._clients.values():
+            await client.aclose()
@@ -0,0 +1,304 @@
+# Python/langgraph/checkpointer.py
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+DEFAULT_CHECKPOINT_PATH = "db/checkpoints.db"
+
+# Types stored in ReportState that the msgpack serializer may rebuild
+STATE_TYPES = [("Python.langgraph.graph", "LogEntry")]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    checkpoint_type TEXT,
+    checkpoint BLOB,
+    metadata_type TEXT,
+    metadata BLOB,
+    updated_at REAL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS checkpoint_writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT,
+    value_type TEXT,
+    value BLOB,
+    task_path TEXT,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoints_updated_at ON checkpoints (updated_at);
+"""
+
+
+def report_config(run_id: str) -> dict:
+    """Graph config that checkpoints a report under its report ID."""
+    return {"configurable": {"thread_id": run_id}}
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver):
+    """
+    LangGraph checkpointer storing graph state in SQLite, so a report whose
+    graph run failed part-way resumes from its last completed node instead
+    of paying for every LLM call again. Threads are report IDs (see
+    report_config).
+
+    Only the latest checkpoint of a report is kept: it is all a resume
+    needs, and the per-node history would grow the file with every run.
+    Reports untouched for ``max_age_seconds`` are dropped when the saver
+    opens and on prune_stale().
+    """
+
+    def __init__(self, db_path: str = DEFAULT_CHECKPOINT_PATH, max_age_seconds: Optional[float] = 7 * 86400):
+        """
+        Args:
+            db_path (str): SQLite database file
+            max_age_seconds (float | None): Age after which a report's
+                checkpoint is garbage (None = keep until deleted)
+        """
+        super().__init__(serde=JsonPlusSerializer(allowed_msgpack_modules=STATE_TYPES))
+        self.db_path = db_path
+        self.max_age_seconds = max_age_seconds
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        # Shared by the graph's executor threads; the lock serializes them
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.prune_stale()
+
+    def _tuple(self, row: tuple) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, checkpoint_type, checkpoint, metadata_type, metadata = row
+        writes = self._conn.execute(
+            """
+            SELECT task_id, channel, value_type, value FROM checkpoint_writes
+            WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?
+            ORDER BY task_id, idx
+            """,
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+
+        def config(cid: str) -> dict:
+            return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": cid}}
+
+        return CheckpointTuple(
+            config=config(checkpoint_id),
+            checkpoint=self.serde.loads_typed((checkpoint_type, checkpoint)),
+            metadata=self.serde.loads_typed((metadata_type, metadata)),
+            parent_config=config(parent_id) if parent_id else None,
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, value)))
+                for task_id, channel, value_type, value in writes
+            ],
+        )
+
+    def get_tuple(self, config: dict) -> Optional[CheckpointTuple]:
+        """Checkpoint named by ``config``, or the thread's latest one without a checkpoint_id."""
+        configurable = config["configurable"]
+        query = """
+            SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,
+                   checkpoint_type, checkpoint, metadata_type, metadata
+            FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?
+        """
+        params = [configurable["thread_id"], configurable.get("checkpoint_ns", "")]
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id:
+            query += " AND checkpoint_id = ?"
+            params.append(checkpoint_id)
+        else:
+            query += " ORDER BY checkpoint_id DESC LIMIT 1"
+
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+            return self._tuple(row) if row else None
+
+    def list(
+        self,
+        config: Optional[dict],
+        *,
+        filter: Optional[dict] = None,
+        before: Optional[dict] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """Checkpoints matching ``config``, newest first."""
+        query = """
+            SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,
+                   checkpoint_type, checkpoint, metadata_type, metadata
+            FROM checkpoints WHERE 1 = 1
+        """
+        params = []
+        if config:
+            configurable = config["configurable"]
+            query += " AND thread_id = ?"
+            params.append(configurable["thread_id"])
+            if configurable.get("checkpoint_ns") is not None:
+                query += " AND checkpoint_ns = ?"
+                params.append(configurable["checkpoint_ns"])
+            if get_checkpoint_id(config):
+                query += " AND checkpoint_id = ?"
+                params.append(get_checkpoint_id(config))
+        if before and get_checkpoint_id(before):
+            query += " AND checkpoint_id < ?"
+            params.append(get_checkpoint_id(before))
+        query += " ORDER BY checkpoint_id DESC"
+
+        with self._lock:
+            tuples = [self._tuple(row) for row in self._conn.execute(query, params).fetchall()]
+
+        for checkpoint in tuples:
+            if filter and any(checkpoint.metadata.get(key) != value for key, value in filter.items()):
+                continue
+            if limit is not None:
+                if limit <= 0:
+                    return
+                limit -= 1
+            yield checkpoint
+
+    def put(self, config: dict, checkpoint: dict, metadata: dict, new_versions: dict) -> dict:
+        """Store ``checkpoint`` as the thread's latest and drop the ones before it."""
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id, checkpoint_ns, checkpoint["id"], configurable.get("checkpoint_id"),
+                    checkpoint_type, checkpoint_blob, metadata_type, metadata_blob, time.time(),
+                ),
+            )
+            # Checkpoint IDs sort by creation time
+            for table in ("checkpoints", "checkpoint_writes"):
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                    (thread_id, checkpoint_ns, checkpoint["id"]),
+                )
+
+        return {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}}
+
+    def put_writes(self, config: dict, writes: Sequence[tuple], task_id: str, task_path: str = "") -> None:
+        """Store the writes a task made on top of a checkpoint (kept if a later task fails)."""
+        configurable = config["configurable"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, value_blob = self.serde.dumps_typed(value)
+            rows.append((
+                configurable["thread_id"], configurable.get("checkpoint_ns", ""), configurable["checkpoint_id"],
+                task_id, WRITES_IDX_MAP.get(channel, idx), channel, value_type, value_blob, task_path,
+            ))
+        # Special writes (errors, interrupts) replace earlier ones; regular writes are idempotent
+        replace = all(WRITES_IDX_MAP.get(channel, 0) < 0 for channel, _ in writes)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO checkpoint_writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Drop every checkpoint of a report, e.g. once it finished."""
+        with self._lock, self._conn:
+            for table in ("checkpoints", "checkpoint_writes"):
+                self._conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+
+    def prune_stale(self, max_age_seconds: Optional[float] = None) -> int:
+        """
+        Garbage-collect reports whose checkpoint was last written more than
+        ``max_age_seconds`` (default: the saver's) ago.
+
+        Returns:
+            int: Number of reports dropped
+        """
+        max_age = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        if max_age is None:
+            return 0
+        cutoff = time.time() - max_age
+        with self._lock, self._conn:
+            stale = [
+                row[0] for row in self._conn.execute(
+                    "SELECT DISTINCT thread_id FROM checkpoints WHERE updated_at < ?", (cutoff,)
+                )
+            ]
+            for table in ("checkpoints", "checkpoint_writes"):
+                self._conn.executemany(f"DELETE FROM {table} WHERE thread_id = ?", [(t,) for t in stale])
+        return len(stale)
+
+    # asyncio API used by ainvoke/astream. A local SQLite write takes well
+    # under a millisecond, so it runs inline rather than on a thread pool.
+    async def aget_tuple(self, config: dict) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(self, config: Optional[dict], *, filter=None, before=None, limit=None):
+        for checkpoint in self.list(config, filter=filter, before=before, limit=limit):
+            yield checkpoint
+
+    async def aput(self, config: dict, checkpoint: dict, metadata: dict, new_versions: dict) -> dict:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: dict, writes: Sequence[tuple], task_id: str, task_path: str = "") -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def resume_input(graph, initial_state: dict):
+    """
+    What to invoke ``graph`` with for a report: None resumes a run of the
+    same report ID that stopped part-way; a finished run's checkpoint is
+    dropped so the report starts over from ``initial_state``.
+    """
+    if graph.checkpointer is None:
+        return initial_state
+    config = report_config(initial_state["run_id"])
+    snapshot = graph.get_state(config)
+    if snapshot.next:
+        return None
+    if snapshot.values:
+        graph.checkpointer.delete_thread(initial_state["run_id"])
+    return initial_state
+
+
+async def aresume_input(graph, initial_state: dict):
+    """asyncio version of resume_input()."""
+    if graph.checkpointer is None:
+        return initial_state
+    config = report_config(initial_state["run_id"])
+    snapshot = await graph.aget_state(config)
+    if snapshot.next:
+        return None
+    if snapshot.values:
+        await graph.checkpointer.adelete_thread(initial_state["run_id"])
+    return initial_state
+
+
+def forget_report(graph, run_id: str):
+    """Drop a finished report's checkpoint; nothing is left to resume."""
+    if graph.checkpointer is not None:
+        graph.checkpointer.delete_thread(run_id)
@@ -1,103 +1,716 @@
-from typing import TypedDict
+import operator
+import threading
+import time
+from functools import partial
+from typing import Annotated, NamedTuple, Optional, Sequence, TypedDict
+
+from Python.agents.report_agent import ReportFormatError
+from Python.langgraph.registry import AgentRegistry, get_registry
+from Python.metrics import METRICS, CallMetrics, capture_calls
+
+# LangGraph/LangChain take most of a second to import, so they are only
+# imported once a graph is actually built (see build_graph/get_compiled_graph)
+_get_stream_writer = None
+
+# Cascade mode: drafts scored below this are rewritten with the larger models
+DEFAULT_ESCALATION_THRESHOLD = 7.0
+# Output cap of a brief reflection, given to emails scored at or above the
+# reflection threshold when high_score_reflection="brief"
+BRIEF_REFLECTION_TOKENS = 128
+REFLECTION_MODES = ("skip", "brief")
+
+class LogEntry(NamedTuple):
+    """
+    One node step in ReportState.logs. Names the state fields the step read
+    and wrote instead of holding copies of their text, so the log stays a
+    few small tuples however long the work log is; resolve_logs() looks the
+    text up when it is needed.
+    """
+    agent: str
+    input_key: str
+    output_key: str
 
-from langgraph.graph import StateGraph, START, END
 
 # Define shared state
 class ReportState(TypedDict):
+    run_id: str      # report ID, tags every agent_logs row of this run
     user_input: str
     summary: str
     email_text: str
     evaluation: str
-    logs: list       # stores intermediate node logs
+    evaluation_score: Optional[float]  # parsed from evaluation; None if it gave no score
+    escalated: bool  # cascade mode: draft was rewritten with the larger models
+    # Cascade mode: the first pass, kept apart so escalation can overwrite
+    # summary/email_text/evaluation without changing what the draft logs show
+    draft_summary: str
+    draft_email: str
+    draft_evaluation: str
+    summary_evaluation: str  # only filled by the parallel topology
+    # LogEntry records. Nodes return just their new entries and the reducer
+    # appends them, so parallel branches can both write logs in one step.
+    logs: Annotated[list, operator.add]
     reflection: str  # optional field for future reflection suggestions
 
-# Node functions live outside classes
-def summarize_node(state: ReportState) -> dict:
-    from Python.agents.summarizer import SummarizerAgent
-    agent = SummarizerAgent()
-    summary = agent.run(state["user_input"])
+def _token_stream(node_name: str):
+    """
+    Forward LLM text chunks to callers of graph.stream(..., stream_mode="custom")
+    as {"node": ..., "token": ...} events. A no-op under plain invoke().
+    """
+    global _get_stream_writer
+    if _get_stream_writer is None:
+        from langgraph.config import get_stream_writer as _get_stream_writer
+
+    try:
+        writer = _get_stream_writer()
+    except RuntimeError:
+        # Node called directly, outside a graph run (e.g. the staged batch
+        # executor): nobody to stream to, so make a plain non-streamed call
+        return None
+    return lambda token: writer({"node": node_name, "token": token})
+
+def resolve_logs(state: ReportState) -> list:
+    """State log entries as {"agent", "input", "output"} dicts with the text filled in from ``state``."""
+    return [
+        {"agent": agent, "input": state.get(input_key, ""), "output": state.get(output_key, "")}
+        for agent, input_key, output_key in state.get("logs", [])
+    ]
+
+def _elapsed_ms(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+def _record_step(
+    state: ReportState,
+    registry: AgentRegistry,
+    agent_name: str,
+    input_data: str,
+    output_data: str,
+    model: Optional[str] = None,
+    duration_ms: Optional[float] = None,
+    calls: Sequence[CallMetrics] = (),
+):
+    """Persist one node step and the LLM calls it made, and feed node metrics."""
+    logger = registry.logger()
+    run_id = state.get("run_id")
+
+    prompt_tokens = [c.prompt_tokens for c in calls if c.prompt_tokens is not None]
+    completion_tokens = [c.completion_tokens for c in calls if c.completion_tokens is not None]
+    logger.log_step(
+        agent_name, input_data, output_data,
+        run_id=run_id, model=model, duration_ms=duration_ms,
+        prompt_tokens=sum(prompt_tokens) if prompt_tokens else None,
+        completion_tokens=sum(completion_tokens) if completion_tokens else None,
+    )
+    for call in calls:
+        logger.log_llm_call(call, run_id=run_id, node=agent_name)
+
+    if duration_ms is not None:
+        METRICS.record_node(agent_name, duration_ms)
+
+def _evaluation_keys(state: ReportState) -> tuple:
+    """State fields an evaluation is logged under: the draft_* ones for a cascade draft that may still be rewritten."""
+    if state.get("escalated") is False:
+        return "draft_email", "draft_evaluation"
+    return "email_text", "evaluation"
+
+def _count_fused_fallback():
+    METRICS.inc("fused_report_fallbacks_total", help_text="Fused reports redone with two calls after bad JSON")
+
+def _report_update(
+    state: ReportState,
+    registry: AgentRegistry,
+    report: dict,
+    duration_ms: float,
+    calls: Sequence[CallMetrics],
+) -> dict:
+    """Stream, log and return the two fields written by the fused report node."""
+    summary, email_text = report["summary"], report["email_text"]
+    # The JSON completion is not worth streaming token by token; send each
+    # part whole under the node names the two-call path streams under
+    for node_name, text in (("summarize", summary), ("email", email_text)):
+        on_token = _token_stream(node_name)
+        if on_token is not None:
+            on_token(text)
+
+    _record_step(
+        state, registry, "ReportNode", state["user_input"], f"{summary}\n\n{email_text}",
+        model=registry.models["report"], duration_ms=duration_ms, calls=calls
+    )
+    return {
+        "summary": summary,
+        "email_text": email_text,
+        "logs": [LogEntry("ReportNode", "user_input", "summary"), LogEntry("ReportNode", "user_input", "email_text")],
+    }
+
+# Node functions live outside classes. Each takes the registry the compiled
+# graph was built with, so agents and clients are shared across invocations.
+def summarize_node(state: ReportState, registry: Optional[AgentRegistry] = None) -> dict:
+    registry = registry or get_registry()
+    start = time.perf_counter()
+    with capture_calls() as calls:
+        summary = registry.summarizer().run(state["user_input"], on_token=_token_stream("summarize"))
     # Log and store in shared state
-    updated_logs = logger_node(state, "SummarizerNode", state["user_input"], summary)["logs"]
-    return {"summary": summary, "logs": updated_logs}
+    new_logs = logger_node(
+        state, "SummarizerNode", "user_input", "summary", summary, registry,
+        model=registry.models["summarizer"], duration_ms=_elapsed_ms(start), calls=calls
+    )["logs"]
+    return {"summary": summary, "logs": new_logs}
 
-def email_node(state: ReportState) -> dict:
-    from Python.agents.email_agent import EmailAgent
-    agent = EmailAgent()
-    email_text = agent.run(state["summary"])
+def email_node(state: ReportState, registry: Optional[AgentRegistry] = None) -> dict:
+    registry = registry or get_registry()
+    start = time.perf_counter()
+    with capture_calls() as calls:
+        email_text = registry.email_agent().run(state["summary"], on_token=_token_stream("email"))
     # Log and store in shared state
-    updated_logs = logger_node(state, "EmailNode", state["summary"], email_text)["logs"]
-    return {"email_text": email_text, "logs": updated_logs}
+    new_logs = logger_node(
+        state, "EmailNode", "summary", "email_text", email_text, registry,
+        model=registry.models["email"], duration_ms=_elapsed_ms(start), calls=calls
+    )["logs"]
+    return {"email_text": email_text, "logs": new_logs}
 
-def eval_node(state: ReportState) -> dict:
-    from Python.agents.evaluator import EvaluatorAgent
-    agent = EvaluatorAgent()
-    evaluation = agent.run(state["email_text"])
+def eval_node(state: ReportState, registry: Optional[AgentRegistry] = None) -> dict:
+    registry = registry or get_registry()
+    start = time.perf_counter()
+    with capture_calls() as calls:
+        evaluation, score = registry.evaluator().evaluate(state["email_text"], on_token=_token_stream("evaluate"))
     # Log and store in shared state
-    updated_logs = logger_node(state, "EvaluatorNode", state["email_text"], evaluation)["logs"]
-    return {"evaluation": evaluation, "logs": updated_logs}
+    input_key, output_key = _evaluation_keys(state)
+    new_logs = logger_node(
+        state, "EvaluatorNode", input_key, output_key, evaluation, registry,
+        model=registry.models["evaluator"], duration_ms=_elapsed_ms(start), calls=calls
+    )["logs"]
+    return {"evaluation": evaluation, output_key: evaluation, "evaluation_score": score, "logs": new_logs}
 
-def logger_node(state: ReportState, agent_name: str, input_data: str, output_data: str) -> dict:
-    from Python.agents.logger import LoggingAgent
-    logger = LoggingAgent(db_path="db/logs.db")
-    logger.log_step(agent_name, input_data, output_data)
+def report_node(state: ReportState, registry: Optional[AgentRegistry] = None) -> dict:
+    """
+    Fused summarize+email: one structured-JSON call fills both fields.
+    Falls back to the two-call path if the model's JSON is unusable;
+    transport and response-decoding errors propagate.
+    """
+    registry = registry or get_registry()
+    start = time.perf_counter()
+    try:
+        with capture_calls() as calls:
+            report = registry.report_agent().run(state["user_input"])
+    except ReportFormatError:
+        _count_fused_fallback()
+        update = summarize_node(state, registry)
+        email_update = email_node({**state, **update}, registry)
+        return {**update, **email_update, "logs": update["logs"] + email_update["logs"]}
+    return _report_update(state, registry, report, _elapsed_ms(start), calls)
 
-    # Append to in-memory log
-    if "logs" not in state or state["logs"] is None:
-        state["logs"] = []
-    state["logs"].append({
-        "agent": agent_name,
-        "input": input_data,
-        "output": output_data
-    })
+def needs_escalation(state: ReportState, threshold: float = DEFAULT_ESCALATION_THRESHOLD) -> bool:
+    """True if a cascade draft has not been escalated yet and scored below ``threshold`` (or unscored)."""
+    if state.get("escalated"):
+        return False
+    score = state.get("evaluation_score")
+    return score is None or score < threshold
 
-    return {"logs": state["logs"]}
+def reflection_action(state: ReportState, threshold: Optional[float] = None, mode: str = "skip") -> str:
+    """
+    How much reflection a report gets: "full", or ``mode`` ("skip" or
+    "brief") when the email scored at least ``threshold``. Always "full"
+    when there is no threshold or no parsed score.
+    """
+    score = state.get("evaluation_score")
+    if threshold is None or score is None or score < threshold:
+        return "full"
+    return mode
+
+def _count_reflection(action: str):
+    METRICS.inc("reflection_runs_total", labels={"mode": action}, help_text="Reflection stage outcomes (full, brief, skip)")
+
+def route_reflection(state: ReportState, threshold: Optional[float] = None, mode: str = "skip") -> str:
+    """Conditional edge after evaluation: end the run instead of reflecting on a high-scoring email."""
+    from langgraph.graph import END
+
+    if reflection_action(state, threshold, mode) == "skip":
+        _count_reflection("skip")
+        return END
+    return "reflection"
+
+def route_after_evaluation(
+    state: ReportState,
+    threshold: float = DEFAULT_ESCALATION_THRESHOLD,
+    reflection_threshold: Optional[float] = None,
+    high_score_reflection: str = "skip",
+) -> str:
+    """Cascade conditional edge: rewrite a weak draft, otherwise go on to reflection (or skip it)."""
+    if needs_escalation(state, threshold):
+        return "escalate"
+    return route_reflection(state, reflection_threshold, high_score_reflection)
 
-def reflection_node(state: ReportState) -> dict:
+def draft_node(state: ReportState, registry: Optional[AgentRegistry] = None) -> dict:
+    """Cascade first pass: summary and email from the cheaper draft model."""
+    registry = registry or get_registry()
+    METRICS.inc("cascade_drafts_total", help_text="Reports drafted with the cascade's draft model")
+
+    start = time.perf_counter()
+    with capture_calls() as calls:
+        summary = registry.draft_summarizer().run(state["user_input"], on_token=_token_stream("summarize"))
+    new_logs = logger_node(
+        state, "DraftSummarizerNode", "user_input", "draft_summary", summary, registry,
+        model=registry.models["draft_summarizer"], duration_ms=_elapsed_ms(start), calls=calls
+    )["logs"]
+
+    state = {**state, "draft_summary": summary}
+    start = time.perf_counter()
+    with capture_calls() as calls:
+        email_text = registry.draft_email_agent().run(summary, on_token=_token_stream("email"))
+    new_logs += logger_node(
+        state, "DraftEmailNode", "draft_summary", "draft_email", email_text, registry,
+        model=registry.models["draft_email"], duration_ms=_elapsed_ms(start), calls=calls
+    )["logs"]
+    return {
+        "summary": summary, "email_text": email_text, "draft_summary": summary, "draft_email": email_text,
+        "escalated": False, "logs": new_logs,
+    }
+
+def escalate_node(
+    state: ReportState,
+    registry: Optional[AgentRegistry] = None,
+    threshold: float = DEFAULT_ESCALATION_THRESHOLD,
+) -> dict:
+    """
+    Cascade second pass: rewrite summary and email with the summarizer and
+    email models. The draft stays in the draft_* fields its log entries
+    point at. A no-op for drafts that passed, so the staged batch
+    executor can run it over every report.
+    """
+    registry = registry or get_registry()
+    if not needs_escalation(state, threshold):
+        return {}
+    METRICS.inc("cascade_escalations_total", help_text="Cascade drafts rewritten with the larger models")
+    update = summarize_node(state, registry)
+    email_update = email_node({**state, **update}, registry)
+    return {**update, **email_update, "escalated": True, "logs": update["logs"] + email_update["logs"]}
+
+def summary_eval_node(state: ReportState, registry: Optional[AgentRegistry] = None) -> dict:
+    """Judge the summary against the raw work log; runs alongside email drafting."""
+    registry = registry or get_registry()
+    start = time.perf_counter()
+    with capture_calls() as calls:
+        summary_evaluation = registry.evaluator().evaluate_summary(
+            state["summary"], state["user_input"], on_token=_token_stream("evaluate_summary")
+        )
+    new_logs = logger_node(
+        state, "SummaryEvaluatorNode", "summary", "summary_evaluation", summary_evaluation, registry,
+        model=registry.models["evaluator"], duration_ms=_elapsed_ms(start), calls=calls
+    )["logs"]
+    return {"summary_evaluation": summary_evaluation, "logs": new_logs}
+
+def logger_node(
+    state: ReportState,
+    agent_name: str,
+    input_key: str,
+    output_key: str,
+    output_data: str,
+    registry: Optional[AgentRegistry] = None,
+    model: Optional[str] = None,
+    duration_ms: Optional[float] = None,
+    calls: Sequence[CallMetrics] = (),
+) -> dict:
+    """
+    Persist a step (full text goes to SQLite) and return its LogEntry.
+
+    Args:
+        input_key (str): State field the node read
+        output_key (str): State field the node writes ``output_data`` to
+    """
+    registry = registry or get_registry()
+    _record_step(state, registry, agent_name, state[input_key], output_data, model, duration_ms, calls)
+
+    # New in-memory log entry; the ReportState reducer appends it
+    return {"logs": [LogEntry(agent_name, input_key, output_key)]}
+
+def reflection_node(
+    state: ReportState,
+    registry: Optional[AgentRegistry] = None,
+    threshold: Optional[float] = None,
+    mode: str = "skip",
+) -> dict:
     """
     Node function to integrate ReflectionAgent into LangGraph.
     Args:
         state (ReportState): shared memory containing 'logs'
+        registry (AgentRegistry | None): source of the shared agent and logger
+        threshold (float | None): Evaluation score at or above which
+            reflection is skipped or kept brief (see reflection_action)
+        mode (str): "skip" or "brief"
     Returns:
-        dict: updated state with 'reflection' key populated
+        dict: state update with 'reflection' key populated
     """
-    from Python.agents.reflection_agent import ReflectionAgent
-    from Python.agents.logger import LoggingAgent
+    registry = registry or get_registry()
+    action = reflection_action(state, threshold, mode)
+    if action == "skip":
+        # Reached without a conditional edge in front (parallel join, staged batch)
+        _count_reflection(action)
+        return {}
+
+    agent = registry.reflection_agent()
 
-    # Initialize ReflectionAgent
-    agent = ReflectionAgent(model="phi3")
-    reflection_text = agent.reflect(state.get("logs", []))
+    start = time.perf_counter()
+    # Token-budgeted prompt; it is also what gets logged, so the log row
+    # stays bounded however long the run's logs grow
+    logs = resolve_logs(state)
+    prompt = agent.build_prompt(logs, brief=action == "brief")
+    with capture_calls() as calls:
+        reflection_text = agent.reflect(
+            logs, on_token=_token_stream("reflection"), prompt=prompt,
+            max_tokens=BRIEF_REFLECTION_TOKENS if action == "brief" else None,
+        )
+    _count_reflection(action)
 
     # Log reflection to SQLite via LoggingAgent
-    logger = LoggingAgent(db_path="db/logs.db")
-    logger.log_step(
-        agent_name="ReflectionNode",
-        input_data=str(state.get("logs", [])),
-        output_data=reflection_text
+    _record_step(
+        state, registry, "ReflectionNode", prompt, reflection_text,
+        model=registry.models["reflection"], duration_ms=_elapsed_ms(start), calls=calls
     )
 
-    # Update shared memory
-    state["reflection"] = reflection_text
+    return {"reflection": reflection_text}
 
-    return {"reflection": reflection_text, "logs": state.get("logs", [])}
+# Async variants, used by compiled_graph.ainvoke / astream. LoggingAgent only
+# queues rows for its writer thread, so logging does not block the event loop.
+async def asummarize_node(state: ReportState, registry: Optional[AgentRegistry] = None) -> dict:
+    registry = registry or get_registry()
+    start = time.perf_counter()
+    with capture_calls() as calls:
+        summary = await registry.summarizer().arun(state["user_input"], on_token=_token_stream("summarize"))
+    result = logger_node(
+        state, "SummarizerNode", "user_input", "summary", summary, registry,
+        model=registry.models["summarizer"], duration_ms=_elapsed_ms(start), calls=calls
+    )
+    return {"summary": summary, "logs": result["logs"]}
 
+async def aemail_node(state: ReportState, registry: Optional[AgentRegistry] = None) -> dict:
+    registry = registry or get_registry()
+    start = time.perf_counter()
+    with capture_calls() as calls:
+        email_text = await registry.email_agent().arun(state["summary"], on_token=_token_stream("email"))
+    result = logger_node(
+        state, "EmailNode", "summary", "email_text", email_text, registry,
+        model=registry.models["email"], duration_ms=_elapsed_ms(start), calls=calls
+    )
+    return {"email_text": email_text, "logs": result["logs"]}
 
+async def aeval_node(state: ReportState, registry: Optional[AgentRegistry] = None) -> dict:
+    registry = registry or get_registry()
+    start = time.perf_counter()
+    with capture_calls() as calls:
+        evaluation, score = await registry.evaluator().aevaluate(
+            state["email_text"], on_token=_token_stream("evaluate")
+        )
+    input_key, output_key = _evaluation_keys(state)
+    result = logger_node(
+        state, "EvaluatorNode", input_key, output_key, evaluation, registry,
+        model=registry.models["evaluator"], duration_ms=_elapsed_ms(start), calls=calls
+    )
+    return {"evaluation": evaluation, output_key: evaluation, "evaluation_score": score, "logs": result["logs"]}
+
+async def areport_node(state: ReportState, registry: Optional[AgentRegistry] = None) -> dict:
+    registry = registry or get_registry()
+    start = time.perf_counter()
+    try:
+        with capture_calls() as calls:
+            report = await registry.report_agent().arun(state["user_input"])
+    except ReportFormatError:
+        _count_fused_fallback()
+        update = await asummarize_node(state, registry)
+        email_update = await aemail_node({**state, **update}, registry)
+        return {**update, **email_update, "logs": update["logs"] + email_update["logs"]}
+    return _report_update(state, registry, report, _elapsed_ms(start), calls)
+
+async def adraft_node(state: ReportState, registry: Optional[AgentRegistry] = None) -> dict:
+    registry = registry or get_registry()
+    METRICS.inc("cascade_drafts_total", help_text="Reports drafted with the cascade's draft model")
+
+    start = time.perf_counter()
+    with capture_calls() as calls:
+        summary = await registry.draft_summarizer().arun(state["user_input"], on_token=_token_stream("summarize"))
+    new_logs = logger_node(
+        state, "DraftSummarizerNode", "user_input", "draft_summary", summary, registry,
+        model=registry.models["draft_summarizer"], duration_ms=_elapsed_ms(start), calls=calls
+    )["logs"]
+
+    state = {**state, "draft_summary": summary}
+    start = time.perf_counter()
+    with capture_calls() as calls:
+        email_text = await registry.draft_email_agent().arun(summary, on_token=_token_stream("email"))
+    new_logs += logger_node(
+        state, "DraftEmailNode", "draft_summary", "draft_email", email_text, registry,
+        model=registry.models["draft_email"], duration_ms=_elapsed_ms(start), calls=calls
+    )["logs"]
+    return {
+        "summary": summary, "email_text": email_text, "draft_summary": summary, "draft_email": email_text,
+        "escalated": False, "logs": new_logs,
+    }
+
+async def aescalate_node(
+    state: ReportState,
+    registry: Optional[AgentRegistry] = None,
+    threshold: float = DEFAULT_ESCALATION_THRESHOLD,
+) -> dict:
+    registry = registry or get_registry()
+    if not needs_escalation(state, threshold):
+        return {}
+    METRICS.inc("cascade_escalations_total", help_text="Cascade drafts rewritten with the larger models")
+    update = await asummarize_node(state, registry)
+    email_update = await aemail_node({**state, **update}, registry)
+    return {**update, **email_update, "escalated": True, "logs": update["logs"] + email_update["logs"]}
+
+async def areevaluate_node(state: ReportState, registry: Optional[AgentRegistry] = None) -> dict:
+    """Staged cascade: score the rewritten email; the graph loops back to evaluate instead."""
+    if not state.get("escalated"):
+        return {}
+    return await aeval_node(state, registry)
+
+async def asummary_eval_node(state: ReportState, registry: Optional[AgentRegistry] = None) -> dict:
+    registry = registry or get_registry()
+    start = time.perf_counter()
+    with capture_calls() as calls:
+        summary_evaluation = await registry.evaluator().aevaluate_summary(
+            state["summary"], state["user_input"], on_token=_token_stream("evaluate_summary")
+        )
+    result = logger_node(
+        state, "SummaryEvaluatorNode", "summary", "summary_evaluation", summary_evaluation, registry,
+        model=registry.models["evaluator"], duration_ms=_elapsed_ms(start), calls=calls
+    )
+    return {"summary_evaluation": summary_evaluation, "logs": result["logs"]}
+
+async def areflection_node(
+    state: ReportState,
+    registry: Optional[AgentRegistry] = None,
+    threshold: Optional[float] = None,
+    mode: str = "skip",
+) -> dict:
+    registry = registry or get_registry()
+    action = reflection_action(state, threshold, mode)
+    if action == "skip":
+        _count_reflection(action)
+        return {}
+
+    agent = registry.reflection_agent()
+
+    start = time.perf_counter()
+    logs = resolve_logs(state)
+    prompt = agent.build_prompt(logs, brief=action == "brief")
+    with capture_calls() as calls:
+        reflection_text = await agent.areflect(
+            logs, on_token=_token_stream("reflection"), prompt=prompt,
+            max_tokens=BRIEF_REFLECTION_TOKENS if action == "brief" else None,
+        )
+    _count_reflection(action)
+
+    _record_step(
+        state, registry, "ReflectionNode", prompt, reflection_text,
+        model=registry.models["reflection"], duration_ms=_elapsed_ms(start), calls=calls
+    )
+
+    return {"reflection": reflection_text}
+
+
+def _node(func, afunc, registry: AgentRegistry):
+    from langchain_core.runnables import RunnableLambda
+
+    # Sync function for invoke/stream, async one for ainvoke/astream
+    return RunnableLambda(partial(func, registry=registry), afunc=partial(afunc, registry=registry))
+
+
+def pipeline_stages(
+    parallel: bool = False,
+    fused: bool = False,
+    cascade: bool = False,
+    escalation_threshold: float = DEFAULT_ESCALATION_THRESHOLD,
+    reflection_threshold: Optional[float] = None,
+    high_score_reflection: str = "skip",
+) -> list:
+    """
+    The graph's nodes in an order that respects its edges, as
+    (node name, async node function, registry model role) tuples. Used to
+    run a whole batch one stage at a time (see Python.batch.run_batch_staged).
+    In cascade mode the escalation stages skip reports whose draft passed;
+    likewise reflection skips (or shortens) itself for high-scoring emails.
+    """
+    _check_topology(parallel, fused, cascade, high_score_reflection)
+    reflection = partial(areflection_node, threshold=reflection_threshold, mode=high_score_reflection)
+    if cascade:
+        return [
+            ("draft", adraft_node, "draft_summarizer"),
+            ("evaluate", aeval_node, "evaluator"),
+            ("escalate", partial(aescalate_node, threshold=escalation_threshold), "summarizer"),
+            ("reevaluate", areevaluate_node, "evaluator"),
+            ("reflection", reflection, "reflection"),
+        ]
+
+    if fused:
+        stages = [("report", areport_node, "report")]
+    else:
+        stages = [
+            ("summarize", asummarize_node, "summarizer"),
+            ("email", aemail_node, "email"),
+        ]
+    stages += [
+        ("evaluate", aeval_node, "evaluator"),
+        ("reflection", reflection, "reflection"),
+    ]
+    if parallel:
+        # Next to the other evaluator-model stage so the model stays warm
+        stages.insert(len(stages) - 2, ("evaluate_summary", asummary_eval_node, "evaluator"))
+    return stages
 
-# Build the graph
-builder = StateGraph(ReportState)
 
-# 1️⃣ Add nodes
-builder.add_node("summarize", summarize_node)
-builder.add_node("email", email_node)
-builder.add_node("evaluate", eval_node)
-builder.add_node("reflection", reflection_node)  # add reflection node BEFORE using in edges
+def _check_topology(parallel: bool, fused: bool, cascade: bool, high_score_reflection: str):
+    if cascade and (parallel or fused):
+        raise ValueError("cascade mode cannot be combined with parallel or fused")
+    if high_score_reflection not in REFLECTION_MODES:
+        raise ValueError(f"high_score_reflection must be one of {REFLECTION_MODES}, got {high_score_reflection!r}")
 
-# 2️⃣ Define sequence (edges)
-builder.add_edge(START, "summarize")
-builder.add_edge("summarize", "email")
-builder.add_edge("email", "evaluate")
-builder.add_edge("evaluate", "reflection")  # now this works
-builder.add_edge("reflection", END)
+
+def build_graph(
+    registry: Optional[AgentRegistry] = None,
+    parallel: bool = False,
+    fused: bool = False,
+    cascade: bool = False,
+    escalation_threshold: float = DEFAULT_ESCALATION_THRESHOLD,
+    reflection_threshold: Optional[float] = None,
+    high_score_reflection: str = "skip",
+    checkpointer=None,
+):
+    """
+    Build and compile the report graph.
+
+    Args:
+        registry (AgentRegistry | None): Agents/clients the nodes close over;
+            defaults to the process-wide registry
+        parallel (bool): Fan out after summarize: a summary-quality evaluation
+            runs alongside email drafting and evaluation, and reflection waits
+            for both branches. Wall time drops to the longest branch.
+        fused (bool): One "report" node asks for the summary and the email
+            as a single JSON completion, in place of the summarize and
+            email nodes
+        cascade (bool): Draft summary and email with the cheaper draft
+            model; a conditional edge after evaluation rewrites them with
+            the larger models (and evaluates again) only when the score is
+            below ``escalation_threshold``
+        escalation_threshold (float): Lowest evaluator score (out of 10)
+            a cascade draft can ship with
+        reflection_threshold (float | None): Evaluator score at or above
+            which reflection is skipped (a conditional edge ends the run
+            after evaluation) or kept brief; None always reflects in full
+        high_score_reflection (str): "skip" or "brief" (a reflection of at
+            most BRIEF_REFLECTION_TOKENS tokens)
+        checkpointer (BaseCheckpointSaver | None): Persists the state after
+            every node, keyed by report ID, so a failed run can resume
+            (see Python.langgraph.checkpointer). Invocations then need
+            ``config=report_config(run_id)``.
+    Returns:
+        Compiled LangGraph graph
+    """
+    from langgraph.graph import StateGraph, START, END
+
+    _check_topology(parallel, fused, cascade, high_score_reflection)
+    registry = registry or get_registry()
+    builder = StateGraph(ReportState)
+    reflection = _node(
+        partial(reflection_node, threshold=reflection_threshold, mode=high_score_reflection),
+        partial(areflection_node, threshold=reflection_threshold, mode=high_score_reflection),
+        registry,
+    )
+
+    if cascade:
+        builder.add_node("draft", _node(draft_node, adraft_node, registry))
+        builder.add_node("evaluate", _node(eval_node, aeval_node, registry))
+        builder.add_node("escalate", _node(
+            partial(escalate_node, threshold=escalation_threshold),
+            partial(aescalate_node, threshold=escalation_threshold),
+            registry,
+        ))
+        builder.add_node("reflection", reflection)
+
+        builder.add_edge(START, "draft")
+        builder.add_edge("draft", "evaluate")
+        builder.add_conditional_edges(
+            "evaluate",
+            partial(
+                route_after_evaluation, threshold=escalation_threshold,
+                reflection_threshold=reflection_threshold, high_score_reflection=high_score_reflection,
+            ),
+            ["escalate", "reflection", END],
+        )
+        # The rewrite is scored again; needs_escalation() is False from then on
+        builder.add_edge("escalate", "evaluate")
+        builder.add_edge("reflection", END)
+        return builder.compile(checkpointer=checkpointer)
+
+    # 1️⃣ Add nodes
+    if fused:
+        builder.add_node("report", _node(report_node, areport_node, registry))
+    else:
+        builder.add_node("summarize", _node(summarize_node, asummarize_node, registry))
+        builder.add_node("email", _node(email_node, aemail_node, registry))
+    builder.add_node("evaluate", _node(eval_node, aeval_node, registry))
+    builder.add_node("reflection", reflection)  # add reflection node BEFORE using in edges
+
+    # 2️⃣ Define sequence (edges)
+    if fused:
+        builder.add_edge(START, "report")
+        builder.add_edge("report", "evaluate")
+        summary_source = "report"
+    else:
+        builder.add_edge(START, "summarize")
+        builder.add_edge("summarize", "email")
+        builder.add_edge("email", "evaluate")
+        summary_source = "summarize"
+
+    if parallel:
+        builder.add_node("evaluate_summary", _node(summary_eval_node, asummary_eval_node, registry))
+        builder.add_edge(summary_source, "evaluate_summary")
+        # Join: reflection runs once both branches have finished (and
+        # skips itself for a high-scoring email; a join has no conditional edge)
+        builder.add_edge(["evaluate", "evaluate_summary"], "reflection")
+    elif reflection_threshold is not None:
+        # High-scoring emails end the run here instead of reflecting
+        builder.add_conditional_edges(
+            "evaluate",
+            partial(route_reflection, threshold=reflection_threshold, mode=high_score_reflection),
+            ["reflection", END],
+        )
+    else:
+        builder.add_edge("evaluate", "reflection")  # now this works
+
+    builder.add_edge("reflection", END)
+
+    # Compile
+    return builder.compile(checkpointer=checkpointer)
+
+
+_compiled_graphs = {}  # checkpointed flag -> compiled default graph
+_compiled_lock = threading.Lock()
+
+
+def get_compiled_graph(checkpointed: bool = False):
+    """
+    The default sequential graph over the process-wide registry, compiled
+    on first use and cached.
+
+    Args:
+        checkpointed (bool): Checkpoint runs to DEFAULT_CHECKPOINT_PATH so a
+            failed report can resume; invoke that graph with
+            ``config=report_config(run_id)``. The plain graph needs no config
+            and touches no checkpoint database.
+    """
+    with _compiled_lock:
+        if checkpointed not in _compiled_graphs:
+            checkpointer = None
+            if checkpointed:
+                from Python.langgraph.checkpointer import SqliteCheckpointSaver
+                checkpointer = SqliteCheckpointSaver()
+            _compiled_graphs[checkpointed] = build_graph(checkpointer=checkpointer)
+        return _compiled_graphs[checkpointed]
 
 
-# Compile
-compiled_graph = builder.compile()
+def __getattr__(name: str):
+    # ``from Python.langgraph.graph import compiled_graph`` keeps working,
+    # but importing this module no longer compiles the graph
+    if name == "compiled_graph":
+        return get_compiled_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
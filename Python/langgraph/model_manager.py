@@ -0,0 +1,163 @@
+# Python/langgraph/model_manager.py
+
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+import requests
+
+from Python.langgraph.graph import pipeline_stages
+from Python.langgraph.registry import AgentRegistry, get_registry
+from Python.metrics import METRICS, CallMetrics, add_metrics_hook, remove_metrics_hook
+
+
+# Stages that call more than the one role pipeline_stages lists for them
+_STAGE_ROLES = {
+    "draft": ("draft_summarizer", "draft_email"),
+    "escalate": ("summarizer", "email"),
+}
+
+
+class ModelManager:
+    """
+    Model lifecycle on top of the registry's OllamaClients.
+
+    On a memory-constrained box Ollama unloads idle models and reloads them
+    on the next request, which costs far more than generation. The manager:
+
+    * preloads the models the configured graph uses (``preload``),
+    * sends ``keep_alive`` with every request through the registry's clients,
+    * pins models for the length of a batch (``pinned``),
+    * keeps model load time apart from generation time (``stats``/``report``).
+    """
+
+    def __init__(
+        self,
+        registry: Optional[AgentRegistry] = None,
+        keep_alive="30m",
+        cold_load_ms: float = 100.0,
+        stages: Optional[list] = None,
+    ):
+        """
+        Args:
+            registry (AgentRegistry | None): Registry whose clients are managed;
+                defaults to the process-wide one used by compiled_graph
+            keep_alive (str | int): keep_alive sent with every request
+            cold_load_ms (float): load_duration above which a call counts as
+                a cold load (the model had been evicted)
+            stages (list | None): The graph's ``pipeline_stages``; only their
+                models are preloaded and pinned. Defaults to the default graph
+        """
+        self.registry = registry or get_registry()
+        self.keep_alive = keep_alive
+        self.cold_load_ms = cold_load_ms
+        self.stages = pipeline_stages() if stages is None else stages
+        self.registry.set_keep_alive(keep_alive)
+
+        self._lock = threading.Lock()
+        self._stats = {}  # model -> counters, see _model_stats
+        add_metrics_hook(self._on_call)
+
+    @property
+    def models(self) -> list:
+        """
+        Distinct models the configured graph calls, in first-use order.
+        Roles it never runs (e.g. the draft model outside cascade mode) are
+        left out so preloading them cannot evict a model the run needs.
+        """
+        roles = []
+        for name, _, role in self.stages:
+            roles += _STAGE_ROLES.get(name, (role,))
+        return list(dict.fromkeys(self.registry.models[role] for role in roles))
+
+    def _model_stats(self, model: str) -> dict:
+        return self._stats.setdefault(model, {
+            "preload_ms": 0.0,
+            "calls": 0,
+            "cold_loads": 0,
+            "load_ms": 0.0,
+            "generation_ms": 0.0,
+        })
+
+    def _on_call(self, metrics: CallMetrics):
+        with self._lock:
+            stats = self._model_stats(metrics.model)
+            stats["calls"] += 1
+            load_ms = metrics.load_ms or 0.0
+            stats["load_ms"] += load_ms
+            if load_ms >= self.cold_load_ms:
+                stats["cold_loads"] += 1
+            stats["generation_ms"] += (metrics.prompt_eval_ms or 0.0) + (metrics.eval_ms or 0.0)
+
+    def preload(self, keep_alive=None) -> dict:
+        """
+        Load every model the graph uses, one after the other.
+
+        Args:
+            keep_alive (str | int | None): Override for this request only
+
+        Returns:
+            dict: model -> load request wall time in ms
+        """
+        timings = {}
+        for model in self.models:
+            elapsed_ms = self.registry.client(model).load(keep_alive)
+            timings[model] = elapsed_ms
+            with self._lock:
+                self._model_stats(model)["preload_ms"] += elapsed_ms
+            METRICS.observe(
+                "llm_preload_seconds", elapsed_ms / 1000, {"model": model}, "Model preload request wall time"
+            )
+        return timings
+
+    def preload_in_background(self) -> threading.Thread:
+        """Preload on a daemon thread, e.g. while the user is still typing."""
+        def run():
+            try:
+                self.preload()
+            except requests.RequestException as exc:
+                # The first real request will load the model instead
+                print(f"[ModelManager] preload failed: {exc}", file=sys.stderr)
+
+        thread = threading.Thread(target=run, name="ModelPreload", daemon=True)
+        thread.start()
+        return thread
+
+    @contextmanager
+    def pinned(self):
+        """
+        Keep every graph model resident (``keep_alive=-1``) inside the block,
+        then restore the normal keep_alive so they expire again afterwards.
+        """
+        self.registry.set_keep_alive(-1)
+        try:
+            self.preload(-1)
+            yield self
+        finally:
+            self.registry.set_keep_alive(self.keep_alive)
+            for model in self.models:
+                try:
+                    # A request with the normal keep_alive resets the expiry timer
+                    self.registry.client(model).load(self.keep_alive)
+                except requests.RequestException as exc:
+                    print(f"[ModelManager] could not unpin {model}: {exc}", file=sys.stderr)
+
+    def stats(self) -> dict:
+        """Per-model preload, cold-load and generation totals."""
+        with self._lock:
+            return {model: dict(stats) for model, stats in self._stats.items()}
+
+    def report(self) -> str:
+        lines = ["Model load vs generation time:"]
+        for model, stats in self.stats().items():
+            lines.append(
+                f"  {model:<12} preload={stats['preload_ms'] / 1000:.2f}s "
+                f"load={stats['load_ms'] / 1000:.2f}s ({stats['cold_loads']} cold of {stats['calls']} calls) "
+                f"generation={stats['generation_ms'] / 1000:.2f}s"
+            )
+        return "\n".join(lines)
+
+    def close(self):
+        """Stop collecting call stats."""
+        remove_metrics_hook(self._on_call)
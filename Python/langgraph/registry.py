@@ -0,0 +1,253 @@
+# Python/langgraph/registry.py
+
+import threading
+from typing import Optional
+
+from Python.agents.email_agent import EmailAgent
+from Python.agents.evaluator import EvaluatorAgent
+from Python.agents.logger import LoggingAgent
+from Python.agents.reflection_agent import ReflectionAgent
+from Python.agents.report_agent import ReportAgent
+from Python.agents.summarizer import SummarizerAgent
+from Python.host_pool import AsyncPooledOllamaClient, HostPool, PooledOllamaClient
+from Python.llm_client import AsyncOllamaClient, OllamaClient
+from Python.single_flight import AsyncSingleFlight, SingleFlight
+
+
+class AgentRegistry:
+    """
+    Per-process home for the agents, LLM clients and logger used by the graph.
+
+    Everything is built lazily on first use and then shared across graph
+    invocations, so one HTTP pool per model and one LoggingAgent serve every
+    report instead of being rebuilt inside each node call.
+    """
+
+    def __init__(
+        self,
+        host: str = "http://localhost:11434",
+        db_path: str = "db/logs.db",
+        summarizer_model: str = "llama3.1",
+        email_model: str = "llama3.1",
+        evaluator_model: str = "phi3",
+        reflection_model: str = "phi3",
+        cache=None,
+        client_kwargs: Optional[dict] = None,
+        reflection_num_ctx: int = 4096,
+        keep_alive=None,
+        hosts: Optional[list] = None,
+        pool_kwargs: Optional[dict] = None,
+        report_model: Optional[str] = None,
+        draft_model: str = "phi3",
+        coalesce: bool = False,
+        limiter=None,
+        retry=None,
+        circuit_breaker=None,
+        hedge=None,
+    ):
+        """
+        Args:
+            host (str): Base URL of the Ollama server
+            db_path (str): SQLite file for LoggingAgent
+            *_model (str): Model used by each agent
+            cache (ResponseCache | None): Response cache shared by every client
+            client_kwargs (dict | None): Extra OllamaClient arguments (timeouts, pool size)
+            reflection_num_ctx (int): Context window the reflection prompt must fit
+            keep_alive (str | int | None): keep_alive sent with every LLM request
+            hosts (list | None): Several Ollama servers to balance over; when
+                given, clients route through a HostPool instead of ``host``
+            pool_kwargs (dict | None): Extra HostPool arguments (caps, ejection)
+            report_model (str | None): Model of the fused summary+email
+                agent; the summarizer's model if None
+            draft_model (str): Cheaper model the cascade drafts the summary
+                and email with before escalating to the summarizer/email models
+            coalesce (bool): Concurrent identical LLM calls (same model,
+                prompts and options) share one in-flight generation
+            limiter (AdaptiveLimiter | None): Adaptive per-model cap on
+                LLM calls in flight, shared by every client
+            retry (RetryPolicy | None): Backoff and retry of transient LLM
+                call failures
+            circuit_breaker (CircuitBreaker | None): Per-host breaker shared
+                by every client
+            hedge (HedgePolicy | None): With ``hosts``, duplicate calls slow
+                to start on a second host
+        """
+        self.host = host
+        self.db_path = db_path
+        self.models = {
+            "summarizer": summarizer_model,
+            "email": email_model,
+            "evaluator": evaluator_model,
+            "reflection": reflection_model,
+            "report": report_model or summarizer_model,
+            "draft_summarizer": draft_model,
+            "draft_email": draft_model,
+        }
+        self.cache = cache
+        self.client_kwargs = client_kwargs or {}
+        self.reflection_num_ctx = reflection_num_ctx
+        self.keep_alive = keep_alive
+        self.pool = HostPool(hosts, **(pool_kwargs or {})) if hosts else None
+        # Shared by every client; keys include the model
+        self.single_flight = SingleFlight() if coalesce else None
+        self.async_single_flight = AsyncSingleFlight() if coalesce else None
+        self.limiter = limiter
+        self.retry = retry
+        self.circuit_breaker = circuit_breaker
+        self.hedge = hedge
+
+        self._lock = threading.RLock()
+        self._clients = {}   # model -> OllamaClient
+        self._aclients = {}  # model -> AsyncOllamaClient
+        self._agents = {}    # role -> agent
+        self._logger = None
+
+    def client(self, model: str) -> OllamaClient:
+        with self._lock:
+            if model not in self._clients:
+                if self.pool is not None:
+                    self._clients[model] = PooledOllamaClient(
+                        model, self.pool, cache=self.cache, keep_alive=self.keep_alive,
+                        single_flight=self.single_flight, hedge=self.hedge, limiter=self.limiter,
+                        retry=self.retry, breaker=self.circuit_breaker, **self.client_kwargs
+                    )
+                else:
+                    self._clients[model] = OllamaClient(
+                        model=model, host=self.host, cache=self.cache, keep_alive=self.keep_alive,
+                        single_flight=self.single_flight, limiter=self.limiter,
+                        retry=self.retry, breaker=self.circuit_breaker, **self.client_kwargs
+                    )
+            return self._clients[model]
+
+    def aclient(self, model: str) -> AsyncOllamaClient:
+        with self._lock:
+            if model not in self._aclients:
+                if self.pool is not None:
+                    self._aclients[model] = AsyncPooledOllamaClient(
+                        model, self.pool, cache=self.cache, keep_alive=self.keep_alive,
+                        single_flight=self.async_single_flight, hedge=self.hedge, limiter=self.limiter,
+                        retry=self.retry, breaker=self.circuit_breaker,
+                    )
+                else:
+                    self._aclients[model] = AsyncOllamaClient(
+                        model=model, host=self.host, cache=self.cache, keep_alive=self.keep_alive,
+                        single_flight=self.async_single_flight, limiter=self.limiter,
+                        retry=self.retry, breaker=self.circuit_breaker,
+                    )
+            return self._aclients[model]
+
+    def set_keep_alive(self, keep_alive):
+        """Change keep_alive for existing and future clients."""
+        with self._lock:
+            self.keep_alive = keep_alive
+            for client in (*self._clients.values(), *self._aclients.values()):
+                client.keep_alive = keep_alive
+
+    def set_coalesce(self, enabled: bool):
+        """Turn single-flight coalescing on or off for existing and future clients."""
+        with self._lock:
+            self.single_flight = SingleFlight() if enabled else None
+            self.async_single_flight = AsyncSingleFlight() if enabled else None
+            for client in self._clients.values():
+                client.single_flight = self.single_flight
+            for client in self._aclients.values():
+                client.single_flight = self.async_single_flight
+
+    def set_limiter(self, limiter):
+        """Put an AdaptiveLimiter (or None) in front of existing and future clients."""
+        with self._lock:
+            self.limiter = limiter
+            for client in (*self._clients.values(), *self._aclients.values()):
+                client.limiter = limiter
+
+    def set_resilience(self, retry, circuit_breaker):
+        """Give existing and future clients a RetryPolicy and CircuitBreaker (or None)."""
+        with self._lock:
+            self.retry = retry
+            self.circuit_breaker = circuit_breaker
+            for client in (*self._clients.values(), *self._aclients.values()):
+                client.retry = retry
+                if isinstance(client, (PooledOllamaClient, AsyncPooledOllamaClient)):
+                    # The breaker lives on the per-host clients
+                    for host_client in client._clients.values():
+                        host_client.retry = retry
+                        host_client.breaker = circuit_breaker
+                else:
+                    client.breaker = circuit_breaker
+
+    def _agent(self, role: str, agent_cls, **agent_kwargs):
+        with self._lock:
+            if role not in self._agents:
+                model = self.models[role]
+                self._agents[role] = agent_cls(
+                    model=model, client=self.client(model), aclient=self.aclient(model), **agent_kwargs
+                )
+            return self._agents[role]
+
+    def summarizer(self) -> SummarizerAgent:
+        return self._agent("summarizer", SummarizerAgent)
+
+    def email_agent(self) -> EmailAgent:
+        return self._agent("email", EmailAgent)
+
+    def draft_summarizer(self) -> SummarizerAgent:
+        return self._agent("draft_summarizer", SummarizerAgent)
+
+    def draft_email_agent(self) -> EmailAgent:
+        return self._agent("draft_email", EmailAgent)
+
+    def report_agent(self) -> ReportAgent:
+        return self._agent("report", ReportAgent)
+
+    def evaluator(self) -> EvaluatorAgent:
+        return self._agent("evaluator", EvaluatorAgent)
+
+    def reflection_agent(self) -> ReflectionAgent:
+        return self._agent("reflection", ReflectionAgent, num_ctx=self.reflection_num_ctx)
+
+    def logger(self) -> LoggingAgent:
+        with self._lock:
+            if self._logger is None:
+                self._logger = LoggingAgent(db_path=self.db_path)
+            return self._logger
+
+    async def aclose(self):
+        """
+        Close the async clients' connections on the running event loop.
+        Await it before the loop ends (e.g. at the end of the coroutine
+        given to asyncio.run); the clients stay usable from later loops.
+        """
+        with self._lock:
+            aclients = list(self._aclients.values())
+        for client in aclients:
+            await client.aclose()
+
+    def close(self):
+        """
+        Close pooled HTTP sessions and flush/close the logger.
+        Async connections are closed by aclose(), on their event loop.
+        """
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            if self._logger is not None:
+                self._logger.close()
+                self._logger = None
+            if self.pool is not None:
+                self.pool.close()
+            self._clients.clear()
+            self._aclients.clear()
+            self._agents.clear()
+
+
+_default_registry = None
+_default_lock = threading.Lock()
+
+
+def get_registry() -> AgentRegistry:
+    """Process-wide registry used by compiled_graph."""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = AgentRegistry()
+        return _default_registry
@@ -0,0 +1,182 @@
+# Python/llm_cache.py
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+class ResponseCache:
+    """
+    Content-addressed cache for LLM completions.
+
+    Keys are a SHA-256 of every generation parameter that shapes the output:
+    (model, system, prompt, temperature, max_tokens, num_ctx, format).
+    Lookups hit an in-memory LRU first and fall back to a SQLite table on
+    disk; disk hits are promoted into memory. Both tiers honour a TTL and a
+    max entry count (least recently used entries are evicted first).
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = "db/llm_cache.db",
+        max_memory_entries: int = 256,
+        max_disk_entries: int = 10_000,
+        ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        bypass_above_temperature: Optional[float] = None,
+    ):
+        """
+        Args:
+            db_path (str | None): SQLite file for the disk tier (None = memory only)
+            max_memory_entries (int): LRU size of the in-memory tier
+            max_disk_entries (int): Max rows kept in the disk tier
+            ttl_seconds (float | None): Entry lifetime (None = never expire)
+            bypass_above_temperature (float | None): Skip the cache for calls
+                sampled above this temperature, whose output is not meant to repeat
+        """
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.bypass_above_temperature = bypass_above_temperature
+
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+        self._memory = OrderedDict()  # key -> (created_at, response)
+        self._lock = threading.Lock()
+        self._conn = None
+        if db_path is not None:
+            self._conn = self._open_db(db_path)
+
+    @staticmethod
+    def _open_db(db_path: str) -> sqlite3.Connection:
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT,
+                created_at REAL,
+                last_access REAL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+        conn.commit()
+        return conn
+
+    @staticmethod
+    def make_key(
+        model: str,
+        system: Optional[str],
+        prompt: str,
+        temperature: float,
+        max_tokens: int,
+        num_ctx: Optional[int] = None,
+        format=None,
+    ) -> str:
+        # format: a JSON-mode answer must never be served for a free-text call
+        raw = json.dumps(
+            [model, system, prompt, temperature, max_tokens, num_ctx, format], ensure_ascii=False, sort_keys=True
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def should_bypass(self, temperature: float) -> bool:
+        if self.bypass_above_temperature is not None and temperature > self.bypass_above_temperature:
+            with self._lock:
+                self.bypassed += 1
+            return True
+        return False
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key`` or None, updating hit/miss counters."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    response, created_at = row
+                    if not self._expired(created_at, now):
+                        self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                        self._conn.commit()
+                        self._remember(key, created_at, response)
+                        self.hits += 1
+                        return response
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, response: str):
+        """Store a response in both tiers, evicting the least recently used overflow."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, response)
+
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response, created_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, response, now, now),
+                )
+                if self.ttl_seconds is not None:
+                    self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+                self._conn.execute(
+                    """
+                    DELETE FROM llm_cache WHERE key IN (
+                        SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (self.max_disk_entries,),
+                )
+                self._conn.commit()
+
+    def _remember(self, key: str, created_at: float, response: str):
+        # Caller holds the lock
+        self._memory[key] = (created_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM llm_cache")
+                self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -1,50 +1,623 @@
-import requests 
+import asyncio
+import functools
+import requests
 import json
-from typing import Optional
+import ssl
+import threading
+import time
+import weakref
+from contextlib import nullcontext
+from typing import AsyncIterator, Callable, Iterator, Optional
+
+from requests.adapters import HTTPAdapter
+
+from Python.concurrency_limiter import Slot
+from Python.metrics import METRICS, CallMetrics, record_call
+from Python.resilience import count_retry
+
+
+def _build_payload(
+    model: str,
+    prompt: str,
+    system: Optional[str],
+    temperature: float,
+    max_tokens: int,
+    stream: bool,
+    num_ctx: Optional[int] = None,
+    keep_alive=None,
+    format=None,
+) -> dict:
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": stream,
+        "options": {
+            "temperature": temperature,
+            "num_predict": max_tokens,
+        }
+    }
+
+    if num_ctx is not None:
+        payload["options"]["num_ctx"] = num_ctx
+
+    if system:
+        payload["system"] = system
+
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+
+    if format is not None:
+        payload["format"] = format
+
+    return payload
+
+
+def _parse_stream_line(line) -> dict:
+    """Decode one NDJSON line of an Ollama stream."""
+    chunk = json.loads(line)
+    if "error" in chunk:
+        raise RuntimeError(f"Ollama error: {chunk['error']}")
+    return chunk
+
+
+def _cache_lookup(cache, model, system, prompt, temperature, max_tokens, num_ctx=None, format=None) -> tuple:
+    """Return (key, cached_text); key is None when the cache is off or bypassed."""
+    if cache is None or cache.should_bypass(temperature):
+        return None, None
+    key = cache.make_key(model, system, prompt, temperature, max_tokens, num_ctx, format)
+    cached = cache.get(key)
+    METRICS.inc(
+        "llm_cache_hits_total" if cached is not None else "llm_cache_misses_total",
+        labels={"model": model}, help_text="Response cache lookups",
+    )
+    return key, cached
+
+
+def _flight_key(model, system, prompt, temperature, max_tokens, num_ctx, format) -> str:
+    """Single-flight key: everything that shapes the completion."""
+    return json.dumps([model, system, prompt, temperature, max_tokens, num_ctx, format], sort_keys=True)
+
+
+def _shared(model: str, text: str, on_token):
+    # A coalesced caller gets the whole completion at once, like a cache hit
+    METRICS.inc(
+        "llm_coalesced_calls_total", labels={"model": model},
+        help_text="Calls that shared an identical in-flight request",
+    )
+    if on_token is not None:
+        on_token(text)
+
+
+def _coalesce(single_flight, key: str, model: str, call: Callable[[], str], on_token) -> str:
+    """Run ``call`` through ``single_flight`` (if any), sharing identical in-flight calls."""
+    if single_flight is None:
+        return call()
+    text, shared = single_flight.do(key, call)
+    if shared:
+        _shared(model, text, on_token)
+    return text
+
+
+async def _acoalesce(single_flight, key: str, model: str, call, on_token) -> str:
+    """Async version of _coalesce; ``call`` returns an awaitable."""
+    if single_flight is None:
+        return await call()
+    text, shared = await single_flight.do(key, call)
+    if shared:
+        _shared(model, text, on_token)
+    return text
+
+
+def _slot(limiter, host: str, model: str):
+    """Concurrency slot from ``limiter`` (an AdaptiveLimiter), or a no-op one."""
+    return limiter.slot(host, model) if limiter is not None else nullcontext(Slot())
+
+
+def _aslot(limiter, host: str, model: str):
+    return limiter.aslot(host, model) if limiter is not None else nullcontext(Slot())
+
+
+def _guard(breaker, host: str):
+    """Circuit-breaker check around one request, or a no-op without a breaker."""
+    return breaker.guard(host) if breaker is not None else nullcontext()
+
+
+def _publish(metrics: CallMetrics, on_metrics):
+    record_call(metrics)
+    if on_metrics is not None:
+        on_metrics(metrics)
+
+
+@functools.lru_cache(maxsize=None)
+def _default_ssl_context() -> ssl.SSLContext:
+    # Loading CA certificates takes tens of ms; do it once, not per async client
+    return ssl.create_default_context()
 
 
 class OllamaClient:
     """
-    Minimal, production-style Ollama client
+    Minimal, production-style Ollama client.
+
+    Owns a pooled keep-alive ``requests.Session`` so repeated calls reuse the
+    same TCP connections to the Ollama host. Call ``close()`` (or use the
+    client as a context manager) to release the pool.
     """
 
-    def __init__(self, model: str = "llama3.1", host: str = "http://localhost:11434"):
+    def __init__(
+        self,
+        model: str = "llama3.1",
+        host: str = "http://localhost:11434",
+        pool_maxsize: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: Optional[float] = 300.0,
+        session: Optional[requests.Session] = None,
+        cache=None,
+        on_metrics: Optional[Callable[[CallMetrics], None]] = None,
+        keep_alive=None,
+        single_flight=None,
+        limiter=None,
+        retry=None,
+        breaker=None,
+    ):
+        """
+        Args:
+            model (str): Ollama model name
+            host (str): Base URL of the Ollama server
+            pool_maxsize (int): Max keep-alive connections kept to the host
+            connect_timeout (float): Seconds to wait for the TCP connection
+            read_timeout (float | None): Seconds to wait for the response (None = forever)
+            session (requests.Session | None): Shared session to use instead of owning one
+            cache (ResponseCache | None): Opt-in response cache consulted by generate()
+            on_metrics (callable | None): Called with the CallMetrics of every
+                call this client makes (see Python.metrics for global hooks)
+            keep_alive (str | int | None): Sent as ``keep_alive`` with every
+                request, e.g. "30m" or -1 to keep the model loaded; the server
+                default (5 minutes) if None
+            single_flight (SingleFlight | None): Shares one generation
+                between concurrent identical generate() calls
+            limiter (AdaptiveLimiter | None): Adaptive cap on calls in
+                flight to this host for this model
+            retry (RetryPolicy | None): Backoff and retry of transient
+                failures (connection errors, timeouts, 429/5xx) that happen
+                before any text was streamed
+            breaker (CircuitBreaker | None): Fails calls fast while the
+                host keeps failing
+        """
         self.model = model
+        self.host = host
         self.url = f"{host}/api/generate"
+        self.timeout = (connect_timeout, read_timeout)
+        self.cache = cache
+        self.on_metrics = on_metrics
+        self.keep_alive = keep_alive
+        self.single_flight = single_flight
+        self.limiter = limiter
+        self.retry = retry
+        self.breaker = breaker
+
+        # A caller-provided session is shared, so only close sessions we own
+        self._owns_session = session is None
+        self.session = session if session is not None else self._build_session(pool_maxsize)
+
+    @staticmethod
+    def _build_session(pool_maxsize: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
 
     def generate(
         self,
         prompt: str,
         system: Optional[str] = None,
         temperature: float = 0.3,
-        max_tokens: int = 512
+        max_tokens: int = 512,
+        on_token: Optional[Callable[[str], None]] = None,
+        num_ctx: Optional[int] = None,
+        format=None,
     ) -> str:
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": temperature,
-                "num_predict": max_tokens,
-            }
-        }
+        """
+        Args:
+            on_token (callable | None): If given, the completion is streamed and
+                every text chunk is passed to it as soon as it arrives
+            num_ctx (int | None): Context window to run the model with
+                (Ollama's ``num_ctx`` option); the server default if None
+            format (str | dict | None): Ollama structured output: "json" or a
+                JSON schema the completion must follow
+
+        Returns:
+            str: Full completion text
+        """
+        cache_key, cached = _cache_lookup(
+            self.cache, self.model, system, prompt, temperature, max_tokens, num_ctx, format
+        )
+        if cached is not None:
+            if on_token is not None:
+                on_token(cached)
+            return cached
+
+        def call() -> str:
+            text = self._generate(prompt, system, temperature, max_tokens, on_token, num_ctx, format)
+            if cache_key is not None:
+                self.cache.set(cache_key, text)
+            return text
+
+        key = _flight_key(self.model, system, prompt, temperature, max_tokens, num_ctx, format)
+        return _coalesce(self.single_flight, key, self.model, call, on_token)
+
+    def _generate(self, prompt, system, temperature, max_tokens, on_token, num_ctx, format) -> str:
+        chunks = []
+        attempt = 1
+        while True:
+            try:
+                return self._generate_once(
+                    prompt, system, temperature, max_tokens, on_token, num_ctx, format, chunks
+                )
+            except Exception as exc:
+                # Once text reached the caller a retry would repeat it
+                if self.retry is None or chunks or not self.retry.should_retry(exc, attempt):
+                    raise
+                count_retry(self.host, self.model)
+                time.sleep(self.retry.delay(attempt))
+                attempt += 1
+
+    def _generate_once(self, prompt, system, temperature, max_tokens, on_token, num_ctx, format, chunks) -> str:
+        if on_token is not None:
+            for token in self.generate_stream(prompt, system, temperature, max_tokens, num_ctx, format):
+                chunks.append(token)
+                on_token(token)
+            return "".join(chunks).strip()
+
+        payload = _build_payload(
+            self.model, prompt, system, temperature, max_tokens,
+            stream=False, num_ctx=num_ctx, keep_alive=self.keep_alive, format=format,
+        )
+        with _guard(self.breaker, self.host), _slot(self.limiter, self.host, self.model) as slot:
+            metrics = CallMetrics(self.model, self.host, streamed=False)
+            start = time.perf_counter()
+
+            response = self.session.post(self.url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+
+            data = response.json()
+            text = data.get("response", "").strip()
+
+            metrics.finish(start, data)
+            slot.metrics = metrics
+        _publish(metrics, self.on_metrics)
+        return text
+
+    def generate_stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: int = 512,
+        num_ctx: Optional[int] = None,
+        format=None,
+    ) -> Iterator[str]:
+        """
+        Stream a completion from Ollama.
+
+        Ollama answers ``"stream": true`` requests with newline-delimited JSON
+        objects; each carries the next piece of text in ``response`` and the
+        last one has ``done: true``. The body is read to the end so the
+        connection goes back to the pool.
+
+        Yields:
+            str: Text chunks in generation order (unstripped)
+        """
+        payload = _build_payload(
+            self.model, prompt, system, temperature, max_tokens,
+            stream=True, num_ctx=num_ctx, keep_alive=self.keep_alive, format=format,
+        )
+        with _guard(self.breaker, self.host), _slot(self.limiter, self.host, self.model) as slot:
+            metrics = CallMetrics(self.model, self.host, streamed=True)
+            start = time.perf_counter()
+            first_token_at = None
+            final_chunk = {}
+
+            with self.session.post(self.url, json=payload, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+
+                for line in response.iter_lines():
+                    if not line:
+                        continue
 
-        if system:
-            payload["system"] = system
+                    chunk = _parse_stream_line(line)
+                    token = chunk.get("response", "")
+                    if token:
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                        yield token
+                    if chunk.get("done"):
+                        final_chunk = chunk
 
-        response = requests.post(self.url, json=payload)
+            metrics.finish(start, final_chunk, first_token_at)
+            slot.metrics = metrics
+        _publish(metrics, self.on_metrics)
+
+    def load(self, keep_alive=None) -> float:
+        """
+        Load the model into memory without generating anything (a request
+        with no prompt), so the first real call does not pay for it.
+
+        Args:
+            keep_alive (str | int | None): How long to keep it loaded; the
+                client's keep_alive if None, 0 unloads the model
+
+        Returns:
+            float: Wall time of the request in ms (the model load time)
+        """
+        payload = {"model": self.model}
+        keep_alive = self.keep_alive if keep_alive is None else keep_alive
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+
+        start = time.perf_counter()
+        response = self.session.post(self.url, json=payload, timeout=self.timeout)
         response.raise_for_status()
+        return (time.perf_counter() - start) * 1000
+
+    def unload(self):
+        """Ask the server to free the model's memory now."""
+        self.load(keep_alive=0)
+
+    def close(self):
+        """Release pooled connections (no-op for shared sessions)."""
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class AsyncOllamaClient:
+    """
+    asyncio counterpart of OllamaClient with the same ``generate`` signature.
+
+    Backed by a pooled ``httpx.AsyncClient`` so many reports can await the
+    LLM concurrently from one event loop. httpx pools are bound to the loop
+    they were created on, so there is one per running loop: the client can
+    be shared by successive ``asyncio.run`` calls or by loops in several
+    threads. Await ``aclose()`` before a loop ends to close its connections.
+    """
+
+    def __init__(
+        self,
+        model: str = "llama3.1",
+        host: str = "http://localhost:11434",
+        max_connections: int = 100,
+        connect_timeout: float = 5.0,
+        read_timeout: Optional[float] = 300.0,
+        cache=None,
+        on_metrics: Optional[Callable[[CallMetrics], None]] = None,
+        keep_alive=None,
+        single_flight=None,
+        limiter=None,
+        retry=None,
+        breaker=None,
+    ):
+        """
+        Args:
+            model (str): Ollama model name
+            host (str): Base URL of the Ollama server
+            max_connections (int): Max concurrent connections to the host
+            connect_timeout (float): Seconds to wait for the TCP connection
+            read_timeout (float | None): Seconds to wait for the response (None = forever)
+            cache (ResponseCache | None): Opt-in response cache consulted by generate()
+            on_metrics (callable | None): Called with the CallMetrics of every call
+            keep_alive (str | int | None): Sent as ``keep_alive`` with every request
+            single_flight (AsyncSingleFlight | None): Shares one generation
+                between concurrent identical generate() calls
+            limiter (AdaptiveLimiter | None): Adaptive cap on calls in flight
+            retry (RetryPolicy | None): Backoff and retry of transient failures
+            breaker (CircuitBreaker | None): Fails calls fast while the host keeps failing
+        """
+        self.model = model
+        self.host = host
+        self.url = f"{host}/api/generate"
+        self.max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.cache = cache
+        self.on_metrics = on_metrics
+        self.keep_alive = keep_alive
+        self.single_flight = single_flight
+        self.limiter = limiter
+        self.retry = retry
+        self.breaker = breaker
+
+        self._clients = weakref.WeakKeyDictionary()  # event loop -> httpx.AsyncClient
+        self._clients_lock = threading.Lock()
+
+    def _get_client(self):
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._clients.get(loop)
+            if client is None:
+                client = self._clients[loop] = self._new_client()
+                # Pools of loops that ended without aclose() are unusable
+                for stale in [other for other in self._clients if other.is_closed()]:
+                    del self._clients[stale]
+            return client
+
+    def _new_client(self):
+        import httpx
+
+        return httpx.AsyncClient(
+            verify=_default_ssl_context(),
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+
+    async def generate(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: int = 512,
+        on_token: Optional[Callable[[str], None]] = None,
+        num_ctx: Optional[int] = None,
+        format=None,
+    ) -> str:
+        """
+        Args:
+            on_token (callable | None): If given, the completion is streamed and
+                every text chunk is passed to it as soon as it arrives
+            num_ctx (int | None): Context window to run the model with
+                (Ollama's ``num_ctx`` option); the server default if None
+            format (str | dict | None): Ollama structured output: "json" or a
+                JSON schema the completion must follow
+
+        Returns:
+            str: Full completion text
+        """
+        cache_key, cached = _cache_lookup(
+            self.cache, self.model, system, prompt, temperature, max_tokens, num_ctx, format
+        )
+        if cached is not None:
+            if on_token is not None:
+                on_token(cached)
+            return cached
+
+        async def call() -> str:
+            text = await self._generate(prompt, system, temperature, max_tokens, on_token, num_ctx, format)
+            if cache_key is not None:
+                self.cache.set(cache_key, text)
+            return text
+
+        key = _flight_key(self.model, system, prompt, temperature, max_tokens, num_ctx, format)
+        return await _acoalesce(self.single_flight, key, self.model, call, on_token)
+
+    async def _generate(self, prompt, system, temperature, max_tokens, on_token, num_ctx, format) -> str:
+        chunks = []
+        attempt = 1
+        while True:
+            try:
+                return await self._generate_once(
+                    prompt, system, temperature, max_tokens, on_token, num_ctx, format, chunks
+                )
+            except Exception as exc:
+                if self.retry is None or chunks or not self.retry.should_retry(exc, attempt):
+                    raise
+                count_retry(self.host, self.model)
+                await asyncio.sleep(self.retry.delay(attempt))
+                attempt += 1
+
+    async def _generate_once(self, prompt, system, temperature, max_tokens, on_token, num_ctx, format, chunks) -> str:
+        if on_token is not None:
+            async for token in self.generate_stream(prompt, system, temperature, max_tokens, num_ctx, format):
+                chunks.append(token)
+                on_token(token)
+            return "".join(chunks).strip()
+
+        payload = _build_payload(
+            self.model, prompt, system, temperature, max_tokens,
+            stream=False, num_ctx=num_ctx, keep_alive=self.keep_alive, format=format,
+        )
+        with _guard(self.breaker, self.host):
+            async with _aslot(self.limiter, self.host, self.model) as slot:
+                metrics = CallMetrics(self.model, self.host, streamed=False)
+                start = time.perf_counter()
+
+                response = await self._get_client().post(self.url, json=payload)
+                response.raise_for_status()
+
+                data = response.json()
+                text = data.get("response", "").strip()
+
+                metrics.finish(start, data)
+                slot.metrics = metrics
+        _publish(metrics, self.on_metrics)
+        return text
+
+    async def generate_stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: int = 512,
+        num_ctx: Optional[int] = None,
+        format=None,
+    ) -> AsyncIterator[str]:
+        """
+        Async version of OllamaClient.generate_stream.
+
+        Yields:
+            str: Text chunks in generation order (unstripped)
+        """
+        payload = _build_payload(
+            self.model, prompt, system, temperature, max_tokens,
+            stream=True, num_ctx=num_ctx, keep_alive=self.keep_alive, format=format,
+        )
+
+        # The breaker is checked before waiting for a concurrency slot
+        with _guard(self.breaker, self.host):
+            async with _aslot(self.limiter, self.host, self.model) as slot:
+                metrics = CallMetrics(self.model, self.host, streamed=True)
+                start = time.perf_counter()
+                first_token_at = None
+                final_chunk = {}
+
+                async with self._get_client().stream("POST", self.url, json=payload) as response:
+                    response.raise_for_status()
+
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+
+                        chunk = _parse_stream_line(line)
+                        token = chunk.get("response", "")
+                        if token:
+                            if first_token_at is None:
+                                first_token_at = time.perf_counter()
+                            yield token
+                        if chunk.get("done"):
+                            final_chunk = chunk
+
+                metrics.finish(start, final_chunk, first_token_at)
+                slot.metrics = metrics
+        _publish(metrics, self.on_metrics)
+
+    async def aclose(self):
+        """Release the running event loop's pooled connections."""
+        with self._clients_lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
 
-        data = response.json()
-        return data.get("response", "").strip()
 class Phi3Client:
     """
     Minimal Phi-3 wrapper (can reuse OllamaClient if hosted locally)
     """
-    def __init__(self, model: str = "phi3", host: str = "http://localhost:11434"):
-        # reuse OllamaClient internally
-        
-        self.client = OllamaClient(model=model, host=host)
+    def __init__(
+        self,
+        model: str = "phi3",
+        host: str = "http://localhost:11434",
+        client: Optional[OllamaClient] = None,
+        **client_kwargs
+    ):
+        # reuse OllamaClient internally (or a shared one passed in)
+
+        self.client = client or OllamaClient(model=model, host=host, **client_kwargs)
+
+    def run(self, prompt: str, on_token: Optional[Callable[[str], None]] = None, **generate_kwargs) -> str:
+        return self.client.generate(prompt, on_token=on_token, **generate_kwargs)
 
-    def run(self, prompt: str) -> str:
-        return self.client.generate(prompt)
+    def close(self):
+        self.client.close()
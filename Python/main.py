@@ -1,12 +1,73 @@
 # main.py
+"""
+Interactive daily report: type the work update, watch the report stream in.
 
-from Python.langgraph.graph import compiled_graph
+Runs are checkpointed under a report ID, by default derived from today's
+date and the update text. If a run fails part-way (e.g. an Ollama host went
+away), its checkpoint is kept: entering the same update again the same day,
+or passing the printed ``--run-id``, resumes after the last completed node.
+A finished run's checkpoint is deleted.
+"""
 
+import sys
+import threading
+
+# Heavy modules (requests, LangGraph) are imported by _warm_up on a background
+# thread, so the prompt appears immediately and startup overlaps with typing.
+# Keep top-level imports light; test_startup checks the import-time budget.
+
+# Section headers, printed when a node starts streaming its output
+SECTION_HEADERS = {
+    "summarize": "📌 Professional Summary:\n",
+    "email": "\n\n📧 Email Draft:\n",
+    "evaluate": "\n\n🧪 Evaluation:\n",
+    "reflection": "\n\n🪞 Reflection:\n",
+}
+
+# State field each section's text ends up in
+SECTION_FIELDS = {"summarize": "summary", "email": "email_text", "evaluate": "evaluation", "reflection": "reflection"}
+
+
+def _warm_up():
+    from Python.langgraph.graph import get_compiled_graph
+    from Python.langgraph.model_manager import ModelManager
+
+    get_compiled_graph(checkpointed=True)
+    # Load the models while the user is typing rather than on the first call
+    ModelManager().preload_in_background()
+
+
+def default_run_id(user_input: str) -> str:
+    """Report ID that is the same for the same update on the same day, so a rerun resumes."""
+    import hashlib
+    from datetime import date
+
+    digest = hashlib.sha256(user_input.strip().encode("utf-8")).hexdigest()[:12]
+    return f"{date.today().isoformat()}-{digest}"
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a daily report from a work update.")
+    parser.add_argument(
+        "--run-id",
+        help="Report ID to checkpoint under; reuse the one printed by a failed run to resume it "
+             "(default: today's date and a hash of the update)",
+    )
+    args = parser.parse_args(argv)
+
+    threading.Thread(target=_warm_up, name="WarmUp", daemon=True).start()
 
-def main():
     user_input = input("Enter your daily work update:\n> ")
 
+    # Waits for the warm-up thread if it is still compiling the graph
+    from Python.langgraph.checkpointer import forget_report, report_config, resume_input
+    from Python.langgraph.graph import get_compiled_graph
+    compiled_graph = get_compiled_graph(checkpointed=True)
+
     initial_state = {
+        "run_id": args.run_id or default_run_id(user_input),
         "user_input": user_input,
         "summary": "",
         "email_text": "",
@@ -15,13 +76,39 @@ def main():
         "reflection": ""
     }
 
-    final_state = compiled_graph.invoke(initial_state)
-
     print("\n===== FINAL OUTPUT =====\n")
-    print("📌 Professional Summary:\n", final_state["summary"])
-    print("\n📧 Email Draft:\n", final_state["email_text"])
-    print("\n🧪 Evaluation:\n", final_state["evaluation"])
-    print("\n🪞 Reflection:\n", final_state["reflection"])
+
+    # Print tokens as each node generates them instead of waiting for the whole graph
+    current_node = None
+    final_state = initial_state
+    config = report_config(initial_state["run_id"])
+    # None picks up a failed earlier run of this report where it stopped
+    graph_input = resume_input(compiled_graph, initial_state)
+    if graph_input is None:
+        # Show the sections that run already finished; only the rest streams
+        restored = compiled_graph.get_state(config).values
+        for node, key in SECTION_FIELDS.items():
+            if restored.get(key):
+                current_node = node
+                print(SECTION_HEADERS[node] + restored[key], end="")
+    try:
+        for mode, chunk in compiled_graph.stream(graph_input, config=config, stream_mode=["custom", "values"]):
+            if mode == "values":
+                final_state = chunk
+                continue
+
+            if chunk["node"] != current_node:
+                current_node = chunk["node"]
+                print(SECTION_HEADERS.get(current_node, f"\n\n{current_node}:\n"), end="")
+            print(chunk["token"], end="", flush=True)
+    except Exception:
+        # The checkpoint is kept so the completed nodes are not paid for again
+        print(f"\n\nReport failed; rerun with --run-id {initial_state['run_id']} to resume it.", file=sys.stderr)
+        raise
+
+    print()
+    forget_report(compiled_graph, initial_state["run_id"])
+    return final_state
 
 
 if __name__ == "__main__":
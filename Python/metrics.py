@@ -0,0 +1,214 @@
+# Python/metrics.py
+
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+_NS_PER_MS = 1_000_000
+
+
+class CallMetrics:
+    """
+    Timing and token counts for one LLM call.
+
+    Wall time and time-to-first-token are measured by the client; the
+    rest come from the duration/count fields Ollama returns with the final
+    response (nanoseconds on the wire, milliseconds here).
+    """
+
+    __slots__ = (
+        "model", "host", "streamed", "wall_ms", "ttft_ms",
+        "prompt_tokens", "completion_tokens",
+        "load_ms", "prompt_eval_ms", "eval_ms", "total_ms",
+    )
+
+    def __init__(self, model: str, host: str, streamed: bool):
+        self.model = model
+        self.host = host
+        self.streamed = streamed
+        self.wall_ms = None
+        self.ttft_ms = None
+        self.prompt_tokens = None
+        self.completion_tokens = None
+        self.load_ms = None
+        self.prompt_eval_ms = None
+        self.eval_ms = None
+        self.total_ms = None
+
+    def finish(self, start: float, final_chunk: dict, first_token_at: Optional[float] = None):
+        """Fill in timings from the client clock and Ollama's final response."""
+        self.wall_ms = (time.perf_counter() - start) * 1000
+        self.prompt_tokens = final_chunk.get("prompt_eval_count")
+        self.completion_tokens = final_chunk.get("eval_count")
+        for attr, field in (
+            ("load_ms", "load_duration"),
+            ("prompt_eval_ms", "prompt_eval_duration"),
+            ("eval_ms", "eval_duration"),
+            ("total_ms", "total_duration"),
+        ):
+            if final_chunk.get(field) is not None:
+                setattr(self, attr, final_chunk[field] / _NS_PER_MS)
+
+        if first_token_at is not None:
+            self.ttft_ms = (first_token_at - start) * 1000
+        elif self.load_ms is not None or self.prompt_eval_ms is not None:
+            # Non-streamed: the first token is ready once the model is loaded
+            # and the prompt is evaluated
+            self.ttft_ms = (self.load_ms or 0.0) + (self.prompt_eval_ms or 0.0)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class MetricsRegistry:
+    """
+    In-process counters, gauges and summaries (sum + count) with labels,
+    exportable in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}      # name -> (type, help text)
+        self._values = {}    # (name, labels) -> value
+        self._summaries = {} # (name, labels) -> [sum, count]
+
+    @staticmethod
+    def _key(name: str, labels: Optional[dict]) -> tuple:
+        return name, tuple(sorted((labels or {}).items()))
+
+    def _declare(self, name: str, kind: str, help_text: str):
+        if name not in self._help:
+            self._help[name] = (kind, help_text or name)
+
+    def inc(self, name: str, value: float = 1, labels: Optional[dict] = None, help_text: str = ""):
+        with self._lock:
+            self._declare(name, "counter", help_text)
+            key = self._key(name, labels)
+            self._values[key] = self._values.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, labels: Optional[dict] = None, help_text: str = ""):
+        with self._lock:
+            self._declare(name, "gauge", help_text)
+            self._values[self._key(name, labels)] = value
+
+    def observe(self, name: str, value: float, labels: Optional[dict] = None, help_text: str = ""):
+        with self._lock:
+            self._declare(name, "summary", help_text)
+            entry = self._summaries.setdefault(self._key(name, labels), [0.0, 0])
+            entry[0] += value
+            entry[1] += 1
+
+    def get(self, name: str, labels: Optional[dict] = None) -> float:
+        """Current counter/gauge value, or the count of a summary."""
+        with self._lock:
+            key = self._key(name, labels)
+            if key in self._summaries:
+                return self._summaries[key][1]
+            return self._values.get(key, 0)
+
+    def record_call(self, metrics: CallMetrics):
+        labels = {"model": metrics.model}
+        self.inc("llm_calls_total", labels=labels, help_text="LLM calls completed")
+        self.observe("llm_call_seconds", metrics.wall_ms / 1000, labels, "Client-side wall time per LLM call")
+        if metrics.ttft_ms is not None:
+            self.observe("llm_ttft_seconds", metrics.ttft_ms / 1000, labels, "Time to first token per LLM call")
+        if metrics.eval_ms is not None:
+            self.observe("llm_eval_seconds", metrics.eval_ms / 1000, labels, "Ollama eval_duration per call")
+        if metrics.load_ms is not None:
+            self.observe("llm_load_seconds", metrics.load_ms / 1000, labels, "Ollama load_duration per call")
+        if metrics.prompt_tokens is not None:
+            self.inc("llm_prompt_tokens_total", metrics.prompt_tokens, labels, "Prompt tokens evaluated")
+        if metrics.completion_tokens is not None:
+            self.inc("llm_completion_tokens_total", metrics.completion_tokens, labels, "Tokens generated")
+
+    def record_node(self, node: str, duration_ms: float):
+        self.observe("node_duration_seconds", duration_ms / 1000, {"node": node}, "Wall time per graph node")
+
+    @staticmethod
+    def _format_labels(labels: tuple) -> str:
+        parts = [
+            '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+            for k, v in labels
+        ]
+        return "{" + ",".join(parts) + "}" if parts else ""
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus/OpenMetrics text format."""
+        with self._lock:
+            lines = []
+            for name, (kind, help_text) in sorted(self._help.items()):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == "summary":
+                    for (metric, labels), (total, count) in sorted(self._summaries.items()):
+                        if metric == name:
+                            lines.append(f"{name}_sum{self._format_labels(labels)} {total}")
+                            lines.append(f"{name}_count{self._format_labels(labels)} {count}")
+                else:
+                    for (metric, labels), value in sorted(self._values.items()):
+                        if metric == name:
+                            lines.append(f"{name}{self._format_labels(labels)} {value}")
+            return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """
+        Atomically write the metrics file (e.g. for node_exporter's textfile
+        collector), so scrapers never see a half-written file.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        with self._lock:
+            self._help.clear()
+            self._values.clear()
+            self._summaries.clear()
+
+
+# Process-wide metrics, fed by every LLM client and graph node
+METRICS = MetricsRegistry()
+
+_hooks = []
+_captures: ContextVar = ContextVar("llm_call_captures", default=())
+
+
+def add_metrics_hook(hook: Callable[[CallMetrics], None]):
+    """Call ``hook`` with the CallMetrics of every LLM call in this process."""
+    _hooks.append(hook)
+
+
+def remove_metrics_hook(hook: Callable[[CallMetrics], None]):
+    _hooks.remove(hook)
+
+
+def record_call(metrics: CallMetrics):
+    """Publish one call's metrics to METRICS, global hooks and active captures."""
+    METRICS.record_call(metrics)
+    for hook in list(_hooks):
+        hook(metrics)
+    for calls in _captures.get():
+        calls.append(metrics)
+
+
+@contextmanager
+def capture_calls():
+    """
+    Collect the CallMetrics of LLM calls made inside the block.
+
+    Context-local, so concurrent nodes (threads or asyncio tasks) each see
+    only their own calls.
+    """
+    calls = []
+    token = _captures.set(_captures.get() + (calls,))
+    try:
+        yield calls
+    finally:
+        _captures.reset(token)
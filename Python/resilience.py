@@ -0,0 +1,217 @@
+# Python/resilience.py
+
+import random
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+import requests
+
+from Python.metrics import METRICS
+
+# Overloaded or restarting server: worth another try
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(RuntimeError):
+    """The host's circuit breaker is open: the call was not attempted."""
+
+
+def _is_http_error(exc: BaseException) -> bool:
+    if isinstance(exc, requests.RequestException):
+        return True
+    # httpx is only imported by the async client; no need to load it here
+    httpx = sys.modules.get("httpx")
+    return httpx is not None and isinstance(exc, httpx.HTTPError)
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    Connection errors, timeouts, 429 and 5xx: the same request may well
+    succeed if sent again. Other 4xx and non-HTTP errors will not.
+    """
+    if not _is_http_error(exc):
+        return False
+    response = getattr(exc, "response", None)
+    if response is not None:
+        return response.status_code in RETRY_STATUSES
+    return True
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff for transient failures. A generation has
+    no side effects, so any LLM call is safe to repeat; clients only retry
+    before the first token reached the caller.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            max_attempts (int): Tries per call, the first one included
+            base_delay (float): Upper bound of the first backoff, in seconds;
+                doubles after each further failure
+            max_delay (float): Cap on the backoff bound
+            seed (int | None): Seed of the jitter RNG, for reproducible runs
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = random.Random(seed)
+
+    def should_retry(self, exc: BaseException, attempt: int) -> bool:
+        """True if a call that failed with ``exc`` on try ``attempt`` (1-based) gets another."""
+        return attempt < self.max_attempts and is_transient(exc)
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after failed try ``attempt``: "full jitter" over the exponential bound."""
+        bound = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return self._rng.uniform(0, bound)
+
+
+def count_retry(host: str, model: str):
+    METRICS.inc("llm_retries_total", labels={"host": host, "model": model}, help_text="LLM calls sent again after a transient failure")
+
+
+class _Circuit:
+    __slots__ = ("failures", "opened_at", "probing")
+
+    def __init__(self):
+        self.failures = 0
+        self.opened_at = None  # monotonic time the circuit opened; None while closed
+        self.probing = False   # half-open: one trial call is in flight
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker. After ``failure_threshold`` consecutive
+    transient failures a host's circuit opens and calls to it fail at once
+    with CircuitOpenError instead of waiting on a dead server. After
+    ``reset_seconds`` one trial call is let through (half-open): success
+    closes the circuit, failure opens it for another period.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        """
+        Args:
+            failure_threshold (int): Consecutive failures that open a circuit
+            reset_seconds (float): How long an open circuit fails fast
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._circuits = {}  # host -> _Circuit
+        self._lock = threading.Lock()
+
+    def before_call(self, host: str):
+        """
+        Raises:
+            CircuitOpenError: If the host's circuit is open
+        """
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit())
+            if circuit.opened_at is None:
+                return
+            if circuit.probing or time.monotonic() - circuit.opened_at < self.reset_seconds:
+                raise CircuitOpenError(f"circuit open for {host}: failing fast")
+            circuit.probing = True
+
+    def record(self, host: str, ok: bool):
+        """Outcome of a call let through by before_call()."""
+        with self._lock:
+            circuit = self._circuits.setdefault(host, _Circuit())
+            was_probing, circuit.probing = circuit.probing, False
+            if ok:
+                circuit.failures = 0
+                circuit.opened_at = None
+                return
+            circuit.failures += 1
+            if was_probing or circuit.failures >= self.failure_threshold:
+                if circuit.opened_at is None or was_probing:
+                    METRICS.inc("llm_circuit_opens_total", labels={"host": host}, help_text="Circuit breaker trips")
+                circuit.opened_at = time.monotonic()
+
+    def state(self, host: str) -> str:
+        """Circuit state of ``host``: closed, open or half-open."""
+        with self._lock:
+            circuit = self._circuits.get(host)
+            if circuit is None or circuit.opened_at is None:
+                return "closed"
+            return "half-open" if circuit.probing else "open"
+
+    @contextmanager
+    def guard(self, host: str):
+        """Check the circuit around one call and record its outcome."""
+        self.before_call(host)
+        ok = True
+        try:
+            yield
+        except Exception as exc:
+            ok = not is_transient(exc)
+            raise
+        finally:
+            # Also reached when a consumer abandons a stream: the host answered
+            self.record(host, ok)
+
+
+class HedgePolicy:
+    """
+    When to hedge a call: once it has waited longer for its first token
+    than ``percentile`` of recent calls to the same model, a duplicate goes
+    to a second host and whichever answers first is used.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        window: int = 200,
+        delay_ms: Optional[float] = None,
+    ):
+        """
+        Args:
+            percentile (float): Time-to-first-token percentile to hedge at
+            min_samples (int): Calls to observe before hedging at all
+            window (int): Recent calls per model the percentile is taken over
+            delay_ms (float | None): Fixed hedge delay instead of the percentile
+        """
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.delay_ms = delay_ms
+        self._samples = {}  # model -> deque of TTFT in ms
+        self._lock = threading.Lock()
+
+    def observe(self, model: str, first_token_ms: float):
+        with self._lock:
+            samples = self._samples.get(model)
+            if samples is None:
+                samples = self._samples[model] = deque(maxlen=self.window)
+            samples.append(first_token_ms)
+
+    def delay(self, model: str) -> Optional[float]:
+        """Seconds to wait for the first token before hedging; None = don't hedge yet."""
+        if self.delay_ms is not None:
+            return self.delay_ms / 1000
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(len(samples) - 1, int(len(samples) * self.percentile / 100))
+        return samples[index] / 1000
+
+
+def count_hedge(model: str):
+    METRICS.inc("llm_hedged_requests_total", labels={"model": model}, help_text="Duplicate requests sent to a second host")
+
+
+def count_hedge_win(model: str):
+    METRICS.inc("llm_hedge_wins_total", labels={"model": model}, help_text="Hedged requests that answered first")
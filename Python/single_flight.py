@@ -0,0 +1,118 @@
+# Python/single_flight.py
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: while a call for a key is in
+    flight, callers with the same key wait for it and share its result (or
+    its exception) instead of starting their own. Nothing is kept once the
+    call finishes, so unlike ResponseCache this also holds for sampled
+    (temperature > 0) completions: only callers that overlap share output.
+
+    Thread-safe; see AsyncSingleFlight for coroutines.
+    """
+
+    def __init__(self):
+        self.coalesced = 0  # calls that shared another caller's result
+        self._calls = {}    # key -> Future of the in-flight call
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], object]) -> tuple:
+        """
+        Run ``fn`` unless a call for ``key`` is already in flight.
+
+        Args:
+            key (hashable): Identity of the call
+            fn (callable): Makes the call; only run by the first caller
+
+        Returns:
+            tuple: (result, shared); ``shared`` is True if another caller's
+                in-flight call supplied the result
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """
+    asyncio counterpart of SingleFlight. Calls only coalesce within one
+    event loop, so one instance can be shared by clients used from several
+    loops (e.g. asyncio.run in different threads).
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}  # (loop, key) -> asyncio.Future of the in-flight call
+        self._lock = threading.Lock()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]) -> tuple:
+        """
+        Await ``fn()`` unless a call for ``key`` is already in flight.
+
+        Args:
+            key (hashable): Identity of the call
+            fn (callable): Returns the awaitable making the call
+
+        Returns:
+            tuple: (result, shared), as in SingleFlight.do
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        while True:
+            with self._lock:
+                future = self._calls.get(flight_key)
+                if future is None:
+                    future = self._calls[flight_key] = loop.create_future()
+                    break
+                self.coalesced += 1
+            try:
+                # shield: a cancelled follower must not cancel the leader's call
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The leader was cancelled, not us: make the call ourselves
+                with self._lock:
+                    self.coalesced -= 1
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Followers (if any) re-raise it; don't warn that nobody retrieved it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self._lock:
+                del self._calls[flight_key]
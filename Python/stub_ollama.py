@@ -0,0 +1,381 @@
+# Python/stub_ollama.py
+"""
+Deterministic local stand-in for an Ollama server, for offline tests and
+benchmarks with reproducible timings.
+
+Run standalone (e.g. to point main.py or batch runs at it):
+    python -m Python.stub_ollama --port 11434 --latency-ms 200 --tokens-per-second 30
+"""
+
+import argparse
+import json
+import random
+import re
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+_NS_PER_S = 1_000_000_000
+
+
+def _model_tag(model: str) -> str:
+    return model if ":" in model else f"{model}:latest"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep the connection alive between requests
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    @property
+    def stub(self) -> "StubOllamaServer":
+        return self.server.stub
+
+    def do_GET(self):
+        if self.path == "/api/ps":
+            # Loaded models, in the shape of Ollama's /api/ps
+            models = [{"name": _model_tag(m), "model": _model_tag(m)} for m in self.stub.loaded_models]
+            self._send_json(200, {"models": models})
+        elif self.path == "/":
+            self._send_json(200, {"status": "Ollama is running"})
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.path != "/api/generate":
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+
+        stub = self.stub
+        stub._record(payload)
+
+        failure = stub._next_failure()
+        if failure == "error":
+            self._send_json(stub.fail_status, {"error": "injected failure"})
+            return
+        if failure == "disconnect" and not payload.get("stream", True):
+            self._disconnect()
+            return
+
+        model = payload.get("model", "")
+        load_duration = stub._touch_model(model, payload.get("keep_alive"))
+
+        if "prompt" not in payload:
+            # Load/unload request: no generation, like Ollama's empty-prompt call
+            self._send_json(200, {
+                "model": model, "response": "", "done": True,
+                "done_reason": "unload" if payload.get("keep_alive") == 0 else "load",
+                "load_duration": load_duration,
+            })
+            return
+
+        text = stub._response_for(payload)
+        tokens = re.findall(r"\s*\S+", text)
+        prompt_eval_s = stub.latency_ms / 1000
+        token_s = 1 / stub.tokens_per_second if stub.tokens_per_second else 0.0
+        # Same counters Ollama sends with its final response (durations in ns)
+        stats = {
+            "prompt_eval_count": len(payload.get("prompt", "").split()),
+            "eval_count": len(tokens),
+            "load_duration": load_duration,
+            "prompt_eval_duration": int(prompt_eval_s * _NS_PER_S),
+            "eval_duration": int(token_s * len(tokens) * _NS_PER_S),
+        }
+        stats["total_duration"] = load_duration + stats["prompt_eval_duration"] + stats["eval_duration"]
+
+        # Prompt evaluation happens before the first token
+        time.sleep(prompt_eval_s)
+        if payload.get("stream", True):
+            self._send_stream(model, tokens, stats, token_s, drop_midway=failure == "disconnect")
+        else:
+            time.sleep(token_s * len(tokens))
+            self._send_json(200, {"model": model, "response": text, "done": True, **stats})
+
+    def _send_stream(self, model: str, tokens: list, stats: dict, token_s: float, drop_midway: bool = False):
+        # Ollama streams NDJSON over chunked transfer encoding, one token per line
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        for index, token in enumerate(tokens):
+            if drop_midway and index >= len(tokens) // 2:
+                self._disconnect()
+                return
+            if token_s:
+                time.sleep(token_s)
+            self._write_chunk({"model": model, "response": token, "done": False})
+        self._write_chunk({"model": model, "response": "", "done": True, **stats})
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, body: dict):
+        line = json.dumps(body).encode() + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _disconnect(self):
+        # Drop the connection without finishing the response
+        self.close_connection = True
+        self.wfile.flush()
+        self.connection.shutdown(socket.SHUT_RDWR)
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Default backlog of 5 drops connections under concurrent benchmarks
+    request_queue_size = 256
+
+    def __init__(self, address, handler, stub: "StubOllamaServer"):
+        super().__init__(address, handler)
+        self.stub = stub
+        self.connections = set()
+        self.accepted = 0  # TCP connections accepted so far
+
+    def process_request(self, request, client_address):
+        self.accepted += 1
+        self.connections.add(request)
+        super().process_request(request, client_address)
+
+    def shutdown_request(self, request):
+        self.connections.discard(request)
+        super().shutdown_request(request)
+
+    def close_connections(self):
+        # Keep-alive handler threads would otherwise keep answering after stop()
+        for conn in list(self.connections):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class StubOllamaServer:
+    """
+    Local stand-in for the Ollama ``/api/generate`` endpoint.
+
+    Runs in a background thread and answers with a fixed response (or one
+    computed by ``responder``), streamed as NDJSON or returned whole, so
+    pipeline overhead can be measured and tested without a real model.
+    All settings are plain attributes and may be changed while it runs.
+
+    * Timing: ``latency_ms`` before the first token (prompt evaluation) and
+      ``tokens_per_second`` between tokens, reported back in Ollama's
+      duration fields.
+    * Model residency: a request for a model that is not loaded waits
+      ``load_ms`` and reports it as ``load_duration``; at most
+      ``max_loaded_models`` stay loaded (least recently used is evicted),
+      like Ollama on a memory-constrained box.
+    * Failures: each request fails with probability ``fail_rate`` (from a
+      seeded RNG, so runs are reproducible), or the next N requests fail
+      after ``fail_next(n)``. ``failure_mode`` "error" answers
+      ``fail_status`` with an Ollama-style error body; "disconnect" drops
+      the connection (half-way through the stream when streaming).
+    * Structured output: a request with Ollama's ``format`` gets a JSON
+      object instead, with ``response_text`` in every schema property.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        response_text: str = "stub response",
+        load_ms: float = 0.0,
+        max_loaded_models: int = 3,
+        latency_ms: float = 0.0,
+        tokens_per_second: Optional[float] = None,
+        fail_rate: float = 0.0,
+        fail_status: int = 500,
+        failure_mode: str = "error",
+        seed: int = 0,
+        responder: Optional[Callable[[dict], str]] = None,
+    ):
+        """
+        Args:
+            host (str): Interface to bind
+            port (int): Port to bind (0 picks a free one, see ``url``)
+            response_text (str): Completion returned for every prompt
+            load_ms (float): Simulated model load time
+            max_loaded_models (int): Models that fit in memory at once
+            latency_ms (float): Delay before the first token
+            tokens_per_second (float | None): Generation speed (None = instant)
+            fail_rate (float): Probability that a request fails
+            fail_status (int): HTTP status of "error" failures
+            failure_mode (str): "error" or "disconnect"
+            seed (int): Seed of the failure RNG
+            responder (callable | None): Maps the request payload to the
+                completion text, overriding ``response_text``
+        """
+        if failure_mode not in ("error", "disconnect"):
+            raise ValueError(f"unknown failure_mode {failure_mode!r}")
+
+        self.response_text = response_text
+        self.responder = responder
+        self.load_ms = load_ms
+        self.max_loaded_models = max_loaded_models
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.fail_rate = fail_rate
+        self.fail_status = fail_status
+        self.failure_mode = failure_mode
+
+        self.load_count = 0        # how many times a model had to be loaded
+        self.request_count = 0
+        self.failure_count = 0
+        self._loaded = OrderedDict()  # model -> None, least recently used first
+        self._payloads = deque(maxlen=1024)
+        self._fail_next = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._models_lock = threading.Lock()
+
+        self._server = _StubHTTPServer((host, port), _StubHandler, self)
+        self._thread = None
+
+    def fail_next(self, count: int = 1):
+        """Make the next ``count`` requests fail (in ``failure_mode``)."""
+        with self._lock:
+            self._fail_next += count
+
+    def _record(self, payload: dict):
+        with self._lock:
+            self.request_count += 1
+            self._payloads.append(payload)
+
+    def _next_failure(self) -> Optional[str]:
+        with self._lock:
+            if self._fail_next > 0:
+                self._fail_next -= 1
+            elif not (self.fail_rate and self._rng.random() < self.fail_rate):
+                return None
+            self.failure_count += 1
+            return self.failure_mode
+
+    def _response_for(self, payload: dict) -> str:
+        if self.responder is not None:
+            return self.responder(payload)
+        fmt = payload.get("format")
+        if isinstance(fmt, dict):
+            # Structured output: every string property gets the fixed text
+            return json.dumps({name: self.response_text for name in fmt.get("properties", {})})
+        if fmt == "json":
+            return json.dumps({"response": self.response_text})
+        return self.response_text
+
+    def _touch_model(self, model: str, keep_alive) -> int:
+        """
+        Mark ``model`` as used, loading it (and evicting the least recently
+        used model when memory is full) if it is not resident.
+
+        Returns:
+            int: Simulated load_duration in ns (0 if it was already loaded)
+        """
+        with self._models_lock:
+            if keep_alive == 0:
+                self._loaded.pop(model, None)
+                return 0
+            if model in self._loaded:
+                self._loaded.move_to_end(model)
+                return 0
+
+            while len(self._loaded) >= self.max_loaded_models:
+                self._loaded.popitem(last=False)
+            self._loaded[model] = None
+            self.load_count += 1
+            # Ollama loads one model at a time, so loads serialize too
+            time.sleep(self.load_ms / 1000)
+            return int(self.load_ms * 1_000_000)
+
+    @property
+    def loaded_models(self) -> list:
+        """Models currently resident, least recently used first."""
+        with self._models_lock:
+            return list(self._loaded)
+
+    @property
+    def payloads(self) -> list:
+        """Most recent request bodies received (up to 1024)."""
+        with self._lock:
+            return list(self._payloads)
+
+    @property
+    def connection_count(self) -> int:
+        """TCP connections accepted so far; keep-alive clients reuse theirs."""
+        return self._server.accepted
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubOllamaServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._server.close_connections()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main(argv: Optional[list] = None):
+    parser = argparse.ArgumentParser(description="Run a stub Ollama server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--response", default="stub response", help="Completion text for every prompt")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float)
+    parser.add_argument("--load-ms", type=float, default=0.0)
+    parser.add_argument("--max-loaded-models", type=int, default=3)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--failure-mode", choices=["error", "disconnect"], default="error")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = StubOllamaServer(
+        host=args.host,
+        port=args.port,
+        response_text=args.response,
+        load_ms=args.load_ms,
+        max_loaded_models=args.max_loaded_models,
+        latency_ms=args.latency_ms,
+        tokens_per_second=args.tokens_per_second,
+        fail_rate=args.fail_rate,
+        failure_mode=args.failure_mode,
+        seed=args.seed,
+    )
+    print(f"Stub Ollama listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
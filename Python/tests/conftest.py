@@ -0,0 +1,74 @@
+import json
+from typing import Optional
+
+import pytest
+
+from Python.langgraph.registry import AgentRegistry
+from Python.stub_ollama import StubOllamaServer
+
+WORKLOG = """
+Completed feature engineering for sales data,
+fixed pipeline bugs,
+met with stakeholders,
+and prepared slides for tomorrow.
+"""
+
+
+def echo_responder(payload: dict) -> str:
+    """Deterministic reply naming the model and prompt size, so tests can trace what went where."""
+    reply = f"{payload['model']} reply to {len(payload['prompt'].split())} words"
+    if isinstance(payload.get("format"), dict):
+        # Structured output: the same reply, tagged with each schema field
+        return json.dumps({name: f"{name}: {reply}" for name in payload["format"]["properties"]})
+    return reply
+
+
+def scoring_responder(score: float, draft_score: Optional[float] = None):
+    """Echo replies, except evaluations score the email ``score``/10.
+
+    With ``draft_score``, emails written by the phi3 draft model score that instead.
+    """
+    def responder(payload: dict) -> str:
+        if "evaluating written communication" in payload.get("system", ""):
+            drafted = draft_score is not None and "phi3 reply" in payload["prompt"]
+            return f"Professionalism score: {draft_score if drafted else score}/10"
+        return echo_responder(payload)
+    return responder
+
+
+@pytest.fixture
+def stub_server():
+    with StubOllamaServer(responder=echo_responder) as server:
+        yield server
+
+
+@pytest.fixture
+def registry(stub_server, tmp_path):
+    registry = AgentRegistry(host=stub_server.url, db_path=str(tmp_path / "logs.db"))
+    yield registry
+    registry.close()
+
+
+@pytest.fixture
+def initial_state():
+    """Factory for a fresh report state: ``initial_state(run_id, user_input=WORKLOG)``."""
+    def make(run_id: str, user_input: str = WORKLOG) -> dict:
+        return {
+            "run_id": run_id,
+            "user_input": user_input,
+            "summary": "",
+            "email_text": "",
+            "evaluation": "",
+            "logs": [],
+            "reflection": ""
+        }
+    return make
+
+
+@pytest.fixture
+def scripted_llm(stub_server):
+    """Install a ``scoring_responder`` on the stub server and return it."""
+    def script(score: float, draft_score: Optional[float] = None):
+        stub_server.responder = scoring_responder(score, draft_score)
+        return stub_server.responder
+    return script
@@ -0,0 +1,130 @@
+import asyncio
+import json
+import threading
+import time
+
+from Python.batch import completed_ids, load_worklogs, percentile, run_batch, run_batch_staged
+from Python.langgraph.graph import build_graph
+from Python.langgraph.registry import AgentRegistry
+from Python.stub_ollama import StubOllamaServer
+from Python.tests.conftest import echo_responder
+
+
+def test_load_worklogs_jsonl_and_csv(tmp_path):
+    jsonl = tmp_path / "logs.jsonl"
+    jsonl.write_text(
+        json.dumps({"id": "eng-1", "user_input": "fixed bugs"}) + "\n\n"
+        + json.dumps({"user_input": "wrote docs"}) + "\n"
+    )
+    csv_file = tmp_path / "logs.csv"
+    csv_file.write_text("id,user_input\neng-7,\"met stakeholders, prepared slides\"\n")
+
+    assert list(load_worklogs(str(jsonl))) == [
+        {"id": "eng-1", "user_input": "fixed bugs"},
+        {"id": "2", "user_input": "wrote docs"},
+    ]
+    assert list(load_worklogs(str(csv_file))) == [
+        {"id": "eng-7", "user_input": "met stakeholders, prepared slides"},
+    ]
+
+
+def test_completed_ids_ignores_truncated_line(tmp_path):
+    out = tmp_path / "reports.jsonl"
+    out.write_text(json.dumps({"id": "eng-1", "summary": "ok"}) + "\n" + '{"id": "eng-2", "summ')
+
+    assert completed_ids(str(out)) == {"eng-1"}
+    assert completed_ids(str(tmp_path / "missing.jsonl")) == set()
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile([3.0], 95) == 3.0
+
+
+def test_staged_batch_swaps_models_once_per_stage(tmp_path):
+    records = [{"id": f"r{i}", "user_input": f"worked on task {i}"} for i in range(6)]
+    output = tmp_path / "reports.jsonl"
+
+    # One model fits in memory and each load takes 120ms
+    with StubOllamaServer(load_ms=120, max_loaded_models=1) as server:
+        registry = AgentRegistry(host=server.url, db_path=str(tmp_path / "logs.db"))
+        try:
+            stats = asyncio.run(run_batch_staged(records, str(output), registry=registry, wave_size=3))
+        finally:
+            registry.close()
+        load_count = server.load_count
+
+    # llama3.1 -> phi3 per wave, two waves
+    assert load_count == 4
+    assert stats.completed == 6
+    assert stats.swap_report["staged_switches"] == 4
+    assert stats.swap_report["per_report_switches"] == 12
+    assert stats.swap_report["saved_ms"] >= 8 * 120
+
+    reports = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["id"] for r in reports] == [r["id"] for r in records]
+    assert reports[0]["reflection"] == "stub response"
+    assert [agent for agent, _, _ in reports[0]["logs"]] == ["SummarizerNode", "EmailNode", "EvaluatorNode"]
+
+
+def _records(count: int) -> list:
+    return [{"id": f"r{i}", "user_input": f"worked on task {i}"} for i in range(count)]
+
+
+def test_run_batch_bounds_reports_in_flight(registry, stub_server, tmp_path):
+    # The sequential graph makes one call at a time per report, so calls in
+    # flight at the stub are reports in flight
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def responder(payload):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return echo_responder(payload)
+
+    stub_server.responder = responder
+    output = tmp_path / "reports.jsonl"
+    stats = asyncio.run(run_batch(_records(6), str(output), concurrency=2, graph=build_graph(registry)))
+
+    assert stats.completed == 6
+    assert peak[0] == 2
+
+
+def test_run_batch_skips_completed_ids(registry, stub_server, tmp_path):
+    graph = build_graph(registry)
+    output = tmp_path / "reports.jsonl"
+    asyncio.run(run_batch(_records(3), str(output), graph=graph))
+    requests_before = stub_server.request_count
+
+    # Restarted with a longer input: only the new report runs
+    stats = asyncio.run(run_batch(_records(4), str(output), graph=graph))
+
+    assert (stats.completed, stats.skipped) == (1, 3)
+    assert stub_server.request_count == requests_before + 4
+    # Rows land in completion order; the new report comes after the old ones
+    ids = [json.loads(line)["id"] for line in output.read_text().splitlines()]
+    assert sorted(ids[:3]) == ["r0", "r1", "r2"] and ids[3] == "r3"
+
+
+def test_run_batch_output_rows(registry, tmp_path):
+    output = tmp_path / "reports.jsonl"
+    stats = asyncio.run(run_batch(_records(2), str(output), graph=build_graph(registry)))
+
+    rows = {row["id"]: row for row in map(json.loads, output.read_text().splitlines())}
+    assert set(rows) == {"r0", "r1"}
+    row = rows["r1"]
+    assert row["run_id"] == "r1"
+    assert row["user_input"] == "worked on task 1"
+    assert row["summary"].startswith("llama3.1 reply")
+    assert row["email_text"].startswith("llama3.1 reply")
+    assert row["evaluation"].startswith("phi3 reply")
+    assert row["reflection"].startswith("phi3 reply")
+    assert [agent for agent, _, _ in row["logs"]] == ["SummarizerNode", "EmailNode", "EvaluatorNode"]
+    assert 0 < row["latency_s"] <= max(stats.report_latencies) + 0.001
+    assert set(stats.node_latencies) == {"summarize", "email", "evaluate", "reflection"}
@@ -0,0 +1,21 @@
+from Python.benchmarks.suite import compare
+
+
+def _run(**values):
+    better = {"rows_per_s": "higher"}
+    return {"results": {
+        name: {"value": value, "unit": "", "better": better.get(name, "lower")}
+        for name, value in values.items()
+    }}
+
+
+def test_compare_flags_regressions_in_the_right_direction():
+    base = _run(invoke_ms=10.0, rows_per_s=1000.0, only_in_base=1.0)
+    new = _run(invoke_ms=12.0, rows_per_s=1200.0)
+
+    rows = {name: (change, regressed) for name, _, _, change, regressed in compare(base, new, 0.10)}
+
+    assert rows["invoke_ms"] == (0.2, True)          # slower latency is a regression
+    assert rows["rows_per_s"][1] is False            # higher throughput is an improvement
+    assert rows["rows_per_s"][0] < 0
+    assert "only_in_base" not in rows
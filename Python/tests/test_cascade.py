@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+
+from Python.batch import run_batch_staged
+from Python.langgraph.graph import build_graph, resolve_logs
+from Python.metrics import METRICS
+
+
+def _counters() -> tuple:
+    return METRICS.get("cascade_drafts_total"), METRICS.get("cascade_escalations_total")
+
+
+def test_cascade_ships_good_draft(registry, stub_server, scripted_llm, initial_state):
+    scripted_llm(9, draft_score=8)
+    drafts, escalations = _counters()
+
+    result = build_graph(registry, cascade=True).invoke(initial_state("cascade-1"))
+
+    assert result["email_text"].startswith("phi3 reply")
+    assert result["evaluation_score"] == 8
+    assert result["escalated"] is False
+    # Draft summary, draft email, evaluation, reflection: no llama3.1 call
+    assert [p["model"] for p in stub_server.payloads] == ["phi3"] * 4
+    assert _counters() == (drafts + 1, escalations)
+
+
+def test_cascade_escalates_weak_draft(registry, stub_server, scripted_llm, initial_state):
+    scripted_llm(9, draft_score=4)
+    drafts, escalations = _counters()
+
+    result = asyncio.run(build_graph(registry, cascade=True).ainvoke(initial_state("cascade-2")))
+
+    assert result["summary"].startswith("llama3.1 reply")
+    assert result["email_text"].startswith("llama3.1 reply")
+    assert result["escalated"] is True
+    assert result["evaluation_score"] == 9
+    assert [p["model"] for p in stub_server.payloads] == [
+        "phi3", "phi3", "phi3", "llama3.1", "llama3.1", "phi3", "phi3"
+    ]
+    assert [entry.agent for entry in result["logs"]] == [
+        "DraftSummarizerNode", "DraftEmailNode", "EvaluatorNode",
+        "SummarizerNode", "EmailNode", "EvaluatorNode",
+    ]
+    # The draft entries still show the draft, not the rewrite that replaced it
+    logged = resolve_logs(result)
+    assert [entry["output"].split(" reply")[0] for entry in logged[:2]] == ["phi3", "phi3"]
+    assert logged[1]["input"] == logged[0]["output"] == result["draft_summary"]
+    assert logged[2] == {"agent": "EvaluatorNode", "input": result["draft_email"], "output": "Professionalism score: 4/10"}
+    assert logged[5] == {"agent": "EvaluatorNode", "input": result["email_text"], "output": "Professionalism score: 9/10"}
+    # Reflection read both evaluations
+    assert "score: 4/10" in stub_server.payloads[-1]["prompt"]
+    assert "score: 9/10" in stub_server.payloads[-1]["prompt"]
+    assert _counters() == (drafts + 1, escalations + 1)
+
+
+def test_cascade_threshold_is_configurable(registry, scripted_llm, initial_state):
+    scripted_llm(9, draft_score=6)
+
+    result = build_graph(registry, cascade=True, escalation_threshold=5).invoke(initial_state("cascade-3"))
+
+    assert result["escalated"] is False
+
+
+def test_cascade_rejects_other_topologies(registry):
+    with pytest.raises(ValueError):
+        build_graph(registry, cascade=True, fused=True)
+
+
+def test_staged_cascade_escalates_only_weak_drafts(registry, stub_server, scripted_llm, tmp_path):
+    scored = scripted_llm(9)
+
+    # Drafts of even-numbered work logs score 4/10
+    def responder(payload):
+        if "evaluating written communication" in payload.get("system", "") and "phi3 reply" in payload["prompt"]:
+            return "Score: 4/10" if "weak" in payload["prompt"] else "Score: 9/10"
+        if payload["model"] == "phi3" and "weak" in payload["prompt"]:
+            return "phi3 reply, weak"
+        return scored(payload)
+    stub_server.responder = responder
+    records = [{"id": f"r{i}", "user_input": "weak log" if i % 2 == 0 else "good log"} for i in range(4)]
+    output = tmp_path / "reports.jsonl"
+
+    stats = asyncio.run(run_batch_staged(records, str(output), registry=registry, cascade=True))
+
+    reports = {r["id"]: r for r in map(json.loads, output.read_text().splitlines())}
+    assert stats.completed == 4
+    assert [reports[f"r{i}"]["escalated"] for i in range(4)] == [True, False, True, False]
+    assert reports["r0"]["email_text"].startswith("llama3.1 reply")
+    assert reports["r0"]["evaluation_score"] == 9
+    assert reports["r1"]["email_text"].startswith("phi3 reply")
@@ -0,0 +1,159 @@
+import asyncio
+import json
+
+import pytest
+import requests
+
+from Python.batch import run_batch
+from Python.langgraph.checkpointer import (
+    SqliteCheckpointSaver,
+    aresume_input,
+    report_config,
+    resume_input,
+)
+from Python.langgraph.graph import LogEntry, build_graph
+from Python.tests.conftest import WORKLOG
+
+
+def _fail_reflection_once(monkeypatch, registry):
+    agent = registry.reflection_agent()
+    reflect, areflect = agent.reflect, agent.areflect
+
+    def failing(*args, **kwargs):
+        monkeypatch.setattr(agent, "reflect", reflect)
+        monkeypatch.setattr(agent, "areflect", areflect)
+        raise requests.ConnectionError("reflection host went away")
+
+    async def afailing(*args, **kwargs):
+        failing()
+
+    monkeypatch.setattr(agent, "reflect", failing)
+    monkeypatch.setattr(agent, "areflect", afailing)
+
+
+@pytest.fixture
+def saver(tmp_path):
+    saver = SqliteCheckpointSaver(str(tmp_path / "checkpoints.db"))
+    yield saver
+    saver.close()
+
+
+def test_resumes_after_failed_node(registry, stub_server, saver, monkeypatch, initial_state):
+    graph = build_graph(registry, checkpointer=saver)
+    config = report_config("ckpt-1")
+    _fail_reflection_once(monkeypatch, registry)
+
+    with pytest.raises(requests.ConnectionError):
+        graph.invoke(initial_state("ckpt-1"), config=config)
+
+    snapshot = graph.get_state(config)
+    assert snapshot.next == ("reflection",)
+    assert snapshot.values["summary"].startswith("llama3.1 reply")
+    # LogEntry survives the round trip through the serializer
+    assert snapshot.values["logs"][0] == LogEntry("SummarizerNode", "user_input", "summary")
+    assert type(snapshot.values["logs"][0]) is LogEntry
+
+    requests_before = stub_server.request_count
+    assert resume_input(graph, initial_state("ckpt-1")) is None
+    result = graph.invoke(None, config=config)
+
+    # Only reflection ran again
+    assert stub_server.request_count == requests_before + 1
+    assert result["reflection"].startswith("phi3 reply")
+    assert len(result["logs"]) == 3
+
+
+def test_async_resume(registry, stub_server, saver, monkeypatch, initial_state):
+    graph = build_graph(registry, checkpointer=saver)
+    config = report_config("ckpt-2")
+    _fail_reflection_once(monkeypatch, registry)
+
+    async def main():
+        with pytest.raises(requests.ConnectionError):
+            await graph.ainvoke(initial_state("ckpt-2"), config=config)
+        requests_before = stub_server.request_count
+        graph_input = await aresume_input(graph, initial_state("ckpt-2"))
+        result = await graph.ainvoke(graph_input, config=config)
+        return result, stub_server.request_count - requests_before
+
+    result, calls = asyncio.run(main())
+    assert calls == 1
+    assert result["reflection"].startswith("phi3 reply")
+
+
+def test_finished_report_starts_over(registry, saver, initial_state):
+    graph = build_graph(registry, checkpointer=saver)
+    config = report_config("ckpt-3")
+    graph.invoke(initial_state("ckpt-3"), config=config)
+
+    # Same report ID again: fresh run, logs are not appended to the old ones
+    graph_input = resume_input(graph, initial_state("ckpt-3"))
+    assert graph_input is not None
+    assert len(graph.invoke(graph_input, config=config)["logs"]) == 3
+
+
+def test_keeps_only_latest_checkpoint_and_prunes_stale(registry, saver, initial_state):
+    graph = build_graph(registry, checkpointer=saver)
+    graph.invoke(initial_state("ckpt-4"), config=report_config("ckpt-4"))
+
+    assert len(list(saver.list(report_config("ckpt-4")))) == 1
+    assert saver.prune_stale(max_age_seconds=3600) == 0
+    assert saver.prune_stale(max_age_seconds=0) == 1
+    assert saver.get_tuple(report_config("ckpt-4")) is None
+
+
+def test_batch_resumes_failed_report(registry, stub_server, saver, monkeypatch, tmp_path):
+    graph = build_graph(registry, checkpointer=saver)
+    output = tmp_path / "reports.jsonl"
+    records = [{"id": "batch-1", "user_input": WORKLOG}]
+    _fail_reflection_once(monkeypatch, registry)
+
+    stats = asyncio.run(run_batch(records, str(output), graph=graph))
+    assert stats.failed == 1
+    assert saver.get_tuple(report_config("batch-1")) is not None
+
+    requests_before = stub_server.request_count
+    stats = asyncio.run(run_batch(records, str(output), graph=graph))
+    assert stats.completed == 1
+    assert stub_server.request_count == requests_before + 1
+    assert json.loads(output.read_text())["reflection"].startswith("phi3 reply")
+    # Finished reports leave no checkpoint behind
+    assert saver.get_tuple(report_config("batch-1")) is None
+
+
+def test_default_graph_is_not_checkpointed(monkeypatch, tmp_path):
+    import Python.langgraph.graph as graph_module
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(graph_module, "_compiled_graphs", {})
+
+    assert graph_module.get_compiled_graph().checkpointer is None
+    assert not (tmp_path / "db").exists()
+    saver = graph_module.get_compiled_graph(checkpointed=True).checkpointer
+    assert isinstance(saver, SqliteCheckpointSaver)
+    saver.close()
+
+
+def test_cli_rerun_resumes_failed_report(registry, stub_server, saver, monkeypatch, capsys):
+    import Python.langgraph.graph as graph_module
+    import Python.main as main_module
+
+    monkeypatch.setattr(graph_module, "_compiled_graphs", {True: build_graph(registry, checkpointer=saver)})
+    monkeypatch.setattr(main_module, "_warm_up", lambda: None)
+    monkeypatch.setattr("builtins.input", lambda prompt: WORKLOG)
+    run_id = main_module.default_run_id(WORKLOG)
+    _fail_reflection_once(monkeypatch, registry)
+
+    with pytest.raises(requests.ConnectionError):
+        main_module.main([])
+    assert f"--run-id {run_id}" in capsys.readouterr().err
+    # A failed run keeps its checkpoint
+    assert saver.get_tuple(report_config(run_id)) is not None
+
+    # Same update again: only reflection runs, the restored sections are shown
+    requests_before = stub_server.request_count
+    final_state = main_module.main([])
+    assert stub_server.request_count == requests_before + 1
+    assert final_state["reflection"].startswith("phi3 reply")
+    assert final_state["summary"] in capsys.readouterr().out
+    assert saver.get_tuple(report_config(run_id)) is None
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from Python.concurrency_limiter import AdaptiveLimiter
+from Python.llm_client import OllamaClient
+from Python.metrics import METRICS
+from Python.stub_ollama import StubOllamaServer
+
+HOST = "http://ollama:11434"
+
+
+def _window(limiter: AdaptiveLimiter, first_token_ms: float, ok: bool = True, model: str = "phi3"):
+    """Complete one window of calls, every slot in use at the start."""
+    entries = [e for e in limiter.snapshot() if e["model"] == model]
+    limit = entries[0]["limit"] if entries else limiter.initial_limit
+    done = 0
+    while done < limiter.window:
+        batch = min(limit, limiter.window - done)
+        for _ in range(batch):
+            limiter.acquire(HOST, model)
+        for _ in range(batch):
+            limiter.release(HOST, model, first_token_ms, ok)
+        done += batch
+
+
+def _limit(limiter: AdaptiveLimiter, model: str = "phi3") -> int:
+    return next(e["limit"] for e in limiter.snapshot() if e["model"] == model)
+
+
+def test_limit_caps_threads_in_flight():
+    limiter = AdaptiveLimiter(initial_limit=2, window=1000)
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def call(_):
+        with limiter.slot(HOST, "phi3"):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.05)
+            with lock:
+                in_flight[0] -= 1
+
+    with ThreadPoolExecutor(6) as pool:
+        futures = [pool.submit(call, i) for i in range(6)]
+        time.sleep(0.02)
+        queued = METRICS.get("llm_concurrency_queue_depth", {"host": HOST, "model": "phi3"})
+        for future in futures:
+            future.result()
+
+    assert peak[0] == 2
+    assert queued == 4
+    assert METRICS.get("llm_concurrency_queue_depth", {"host": HOST, "model": "phi3"}) == 0
+
+
+def test_limit_grows_while_latency_stays_flat():
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=4, window=5)
+
+    for _ in range(4):
+        _window(limiter, first_token_ms=100)
+
+    assert _limit(limiter) == 4  # capped at max_limit
+    assert METRICS.get("llm_concurrency_limit", {"host": HOST, "model": "phi3"}) == 4
+
+
+def test_limit_backs_off_on_latency_and_errors():
+    limiter = AdaptiveLimiter(initial_limit=8, window=10, backoff=0.5)
+    _window(limiter, first_token_ms=100)  # sets the baseline, limit 9
+    assert _limit(limiter) == 9
+
+    _window(limiter, first_token_ms=400)  # 4x baseline
+    assert _limit(limiter) == 4
+
+    _window(limiter, first_token_ms=100, ok=False)
+    assert _limit(limiter) == 2
+
+
+def test_limits_are_per_model():
+    limiter = AdaptiveLimiter(initial_limit=2, window=5, backoff=0.5)
+    _window(limiter, first_token_ms=100, ok=False, model="llama3.1")
+    limiter.acquire(HOST, "phi3")
+    limiter.release(HOST, "phi3", 100)
+
+    assert _limit(limiter, "llama3.1") == 1
+    assert _limit(limiter, "phi3") == 2
+
+
+def test_async_callers_wait_for_slots():
+    limiter = AdaptiveLimiter(initial_limit=2, window=1000)
+    in_flight, peak = [0], [0]
+
+    async def call():
+        async with limiter.aslot(HOST, "phi3"):
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.02)
+            in_flight[0] -= 1
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(5)))
+
+    asyncio.run(main())
+    assert peak[0] == 2
+
+
+def test_client_calls_go_through_the_limiter():
+    limiter = AdaptiveLimiter(initial_limit=1, window=1000)
+    with StubOllamaServer(latency_ms=100) as server:
+        client = OllamaClient(model="phi3", host=server.url, limiter=limiter)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(3) as pool:
+            texts = list(pool.map(lambda i: client.generate(f"log {i}", on_token=lambda t: None), range(3)))
+        elapsed = time.perf_counter() - start
+        client.close()
+
+    assert texts == ["stub response"] * 3
+    # One at a time
+    assert elapsed >= 0.3
+    assert limiter.snapshot()[0]["in_flight"] == 0
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        AdaptiveLimiter(initial_limit=64, max_limit=32)
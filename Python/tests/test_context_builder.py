@@ -0,0 +1,35 @@
+from Python.agents.context_builder import ReflectionContextBuilder, estimate_tokens
+
+
+def _logs(sizes):
+    return [
+        {"agent": f"Node{i}", "input": "i" * size, "output": "o" * size}
+        for i, size in enumerate(sizes)
+    ]
+
+
+def test_small_logs_are_kept_verbatim():
+    logs = _logs([10, 20])
+    prompt = ReflectionContextBuilder(num_ctx=4096).build(logs)
+    assert "i" * 20 in prompt and "o" * 10 in prompt
+    assert "omitted" not in prompt
+
+
+def test_largest_fields_truncated_first():
+    builder = ReflectionContextBuilder(num_ctx=2048, max_tokens=512)
+    prompt = builder.build(_logs([50, 100_000]))
+
+    assert estimate_tokens(prompt) <= builder.num_ctx - builder.max_tokens
+    # The small entry survives whole; only the huge one is cut
+    assert "i" * 50 in prompt and "o" * 50 in prompt
+    assert "chars omitted" in prompt
+
+
+def test_oldest_entries_dropped_when_still_over_budget():
+    builder = ReflectionContextBuilder(num_ctx=700, max_tokens=512, min_field_tokens=16)
+    prompt = builder.build(_logs([5_000] * 20))
+
+    assert estimate_tokens(prompt) <= builder.num_ctx - builder.max_tokens
+    assert "earlier log entries omitted" in prompt
+    assert "Agent: Node0\n" not in prompt
+    assert "Agent: Node19\nInput: " in prompt
@@ -1,24 +1,23 @@
-# Python/test_email_agent.py
-from Python.agents.summarizer import SummarizerAgent
-from Python.agents.email_agent import EmailAgent
-
-# Step 1: Sample work log
-worklog = """
-Completed feature engineering for sales data,
-fixed pipeline bugs,
-met with stakeholders,
-and prepared slides for tomorrow.
-"""
-
-# Step 2: Summarize
-summarizer = SummarizerAgent()
-summary = summarizer.run(worklog)
-
-# Step 3: Generate Email
-email_agent = EmailAgent()
-email_text = email_agent.run(summary)
-
-print("=== SUMMARY ===")
-print(summary)
-print("\n=== EMAIL ===")
-print(email_text)
\ No newline at end of file
+import asyncio
+
+from Python.tests.conftest import WORKLOG
+
+
+def test_email_is_written_from_summary(registry, stub_server):
+    summary = registry.summarizer().run(WORKLOG)
+    email_text = registry.email_agent().run(summary, recipient_name="Dana")
+
+    payload = stub_server.payloads[-1]
+    assert email_text.startswith("llama3.1 reply to")
+    assert summary in payload["prompt"]
+    assert "Recipient: Dana" in payload["prompt"]
+    assert "corporate communication assistant" in payload["system"]
+
+
+def test_email_async_matches_sync(registry):
+    summary = registry.summarizer().run(WORKLOG)
+
+    sync_email = registry.email_agent().run(summary)
+    async_email = asyncio.run(registry.email_agent().arun(summary))
+
+    assert async_email == sync_email
@@ -1,28 +1,48 @@
-# Python/tests/test_evaluator_agent.py
-from Python.agents.summarizer import SummarizerAgent
-from Python.agents.email_agent import EmailAgent
-from Python.agents.evaluator import EvaluatorAgent
-
-worklog = """
-Completed feature engineering for sales data,
-fixed pipeline bugs,
-met with stakeholders,
-and prepared slides for tomorrow.
-"""
-
-# Summarize
-summarizer = SummarizerAgent()
-summary = summarizer.run(worklog)
-
-# Generate Email
-email_agent = EmailAgent()
-email_text = email_agent.run(summary)
-
-# Evaluate Email
-evaluator = EvaluatorAgent()
-evaluation = evaluator.run(email_text)
-
-print("=== EMAIL ===")
-print(email_text)
-print("\n=== EVALUATION ===")
-print(evaluation)
+import pytest
+import requests
+
+from Python.agents.evaluator import parse_score
+from Python.tests.conftest import WORKLOG
+
+
+def test_evaluator_uses_phi3_on_email(registry, stub_server):
+    summary = registry.summarizer().run(WORKLOG)
+    email_text = registry.email_agent().run(summary)
+    evaluation = registry.evaluator().run(email_text)
+
+    payload = stub_server.payloads[-1]
+    assert payload["model"] == "phi3"
+    assert evaluation.startswith("phi3 reply to")
+    assert email_text in payload["prompt"]
+    assert "professionalism score" in payload["system"]
+
+
+def test_evaluator_surfaces_server_errors(registry, stub_server):
+    stub_server.fail_next(1)
+
+    with pytest.raises(requests.HTTPError):
+        registry.evaluator().run("Subject: Update")
+
+    # The next request goes through
+    assert registry.evaluator().run("Subject: Update").startswith("phi3 reply to")
+
+
+@pytest.mark.parametrize("text, score", [
+    ("Score: 8/10", 8.0),
+    ("- **Overall professionalism score (1-10):** 7", 7.0),
+    ("I would rate this email 9 out of 10.", 9.0),
+    ("1. Overall professionalism score: 8.5\n2. Strengths: clear", 8.5),
+    ("Clear and polite, but no rating given.", None),
+    ("Score: 42", None),
+])
+def test_parse_score(text, score):
+    assert parse_score(text) == score
+
+
+def test_evaluate_returns_text_and_score(registry, stub_server):
+    stub_server.responder = lambda payload: "- Professionalism score: 9/10\n- Clear subject line"
+
+    evaluation = registry.evaluator().evaluate("Subject: Update")
+
+    assert evaluation.text.startswith("- Professionalism score")
+    assert evaluation.score == 9
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+import pytest
+
+from Python.host_pool import AsyncPooledOllamaClient, HostPool, NoHealthyHostError, PooledOllamaClient
+from Python.stub_ollama import StubOllamaServer
+
+
+def test_routes_to_warm_host_with_fewest_in_flight():
+    with StubOllamaServer() as a, StubOllamaServer() as b:
+        pool = HostPool([a.url, b.url], max_in_flight=2, health_interval=None)
+        client = PooledOllamaClient("phi3", pool)
+        client.generate("hello")
+        warm = a.url if a.payloads else b.url
+
+        # Idle warm host wins over idle cold host
+        assert pool.acquire("phi3") == warm
+        # Busier warm host still wins until it hits its cap...
+        assert pool.acquire("phi3") == warm
+        # ...then the cold host takes the overflow
+        assert pool.acquire("phi3") != warm
+        assert pool.acquire("phi3") != warm
+        with pytest.raises(TimeoutError):
+            pool.acquire("phi3", timeout=0.05)
+
+
+def test_health_check_ejects_and_failover(tmp_path):
+    with StubOllamaServer(response_text="from a") as a:
+        b = StubOllamaServer(response_text="from b").start()
+        down_url = b.url
+        b.stop()
+
+        pool = HostPool([down_url, a.url], failure_threshold=1, health_interval=None)
+        client = PooledOllamaClient("phi3", pool)
+
+        # The first request may hit the dead host; it is ejected and retried elsewhere
+        assert client.generate("hello") == "from a"
+        assert pool.check_health() == {down_url: False, a.url: True}
+        assert pool.live_hosts() == [a.url]
+        assert "phi3:latest" in pool.snapshot()[1]["loaded"]
+
+    pool.check_health()
+    with pytest.raises(NoHealthyHostError):
+        pool.acquire("phi3")
+
+
+def test_per_host_cap_under_concurrency():
+    with StubOllamaServer() as a, StubOllamaServer() as b:
+        pool = HostPool([a.url, b.url], max_in_flight=1, health_interval=None)
+        peak = []
+        lock = threading.Lock()
+        original_pick = pool._pick
+
+        def tracking_pick(model):
+            host = original_pick(model)
+            with lock:
+                peak.append(max(h.in_flight for h in pool._hosts))
+            return host
+
+        pool._pick = tracking_pick
+
+        async def run():
+            client = AsyncPooledOllamaClient("llama3.1", pool)
+            results = await asyncio.gather(*(client.generate(f"report {i}") for i in range(10)))
+            await client.aclose()
+            return results
+
+        assert asyncio.run(run()) == ["stub response"] * 10
+        assert max(peak) == 1
+        assert len(a.payloads) + len(b.payloads) == 10
+
+
+def test_failing_token_callback_releases_slot():
+    with StubOllamaServer() as a:
+        pool = HostPool([a.url], max_in_flight=1, health_interval=None)
+        client = PooledOllamaClient("phi3", pool)
+
+        def on_token(token):
+            raise ValueError("display closed")
+
+        with pytest.raises(ValueError):
+            client.generate("hello", on_token=on_token)
+        assert pool.snapshot()[0]["in_flight"] == 0
+        # The host still takes traffic
+        assert client.generate("hello") == "stub response"
+
+
+def test_cancelled_async_call_releases_slot():
+    with StubOllamaServer(latency_ms=2000) as a:
+        pool = HostPool([a.url], max_in_flight=1, health_interval=None)
+
+        async def main():
+            client = AsyncPooledOllamaClient("phi3", pool)
+            try:
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(client.generate("hello"), 0.05)
+            finally:
+                await client.aclose()
+
+        asyncio.run(main())
+        assert pool.snapshot()[0]["in_flight"] == 0
@@ -1,19 +1,112 @@
-from Python.langgraph.graph import compiled_graph
-
-def test_pipeline():
-    result = compiled_graph.invoke({
-        "user_input": "Completed feature engineering and prepared slides for the meeting.",
-        "summary": "",
-        "email_text": "",
-        "evaluation": "",
-        "logs": [],
-        "reflection": ""
-    })
-    print("Final state:", result)
-    print("Logs captured:")
-    for log in result["logs"]:
-        print(log)
-
-if __name__ == "__main__":
-    test_pipeline()
+import asyncio
 
+from Python.langgraph.graph import LogEntry, build_graph, resolve_logs
+from Python.tests.conftest import WORKLOG
+
+
+def test_pipeline(registry, stub_server, initial_state):
+    result = build_graph(registry).invoke(initial_state("run-1"))
+
+    assert result["summary"].startswith("llama3.1 reply")
+    assert result["email_text"].startswith("llama3.1 reply")
+    assert result["evaluation"].startswith("phi3 reply")
+    assert result["reflection"].startswith("phi3 reply")
+    assert result["logs"] == [
+        LogEntry("SummarizerNode", "user_input", "summary"),
+        LogEntry("EmailNode", "summary", "email_text"),
+        LogEntry("EvaluatorNode", "email_text", "evaluation"),
+    ]
+    # Entries reference the state's strings instead of copying them
+    assert resolve_logs(result)[1]["input"] is result["summary"]
+    assert [p["model"] for p in stub_server.payloads] == ["llama3.1", "llama3.1", "phi3", "phi3"]
+
+    steps = registry.logger().get_run("run-1")
+    assert [step["agent_name"] for step in steps] == [
+        "SummarizerNode", "EmailNode", "EvaluatorNode", "ReflectionNode"
+    ]
+    assert steps[0]["input_data"] == WORKLOG
+
+
+def test_pipeline_streams_custom_events(registry, initial_state):
+    graph = build_graph(registry)
+    nodes = []
+    for event in graph.stream(initial_state("run-2"), stream_mode="custom"):
+        if not nodes or nodes[-1] != event["node"]:
+            nodes.append(event["node"])
+
+    assert nodes == ["summarize", "email", "evaluate", "reflection"]
+
+
+def test_streamed_tokens_match_final_state(registry, initial_state):
+    graph = build_graph(registry)
+    streamed = {}
+    final_state = None
+    for mode, chunk in graph.stream(initial_state("run-4"), stream_mode=["custom", "values"]):
+        if mode == "values":
+            final_state = chunk
+        else:
+            streamed[chunk["node"]] = streamed.get(chunk["node"], "") + chunk["token"]
+
+    for node, key in (("summarize", "summary"), ("email", "email_text"),
+                      ("evaluate", "evaluation"), ("reflection", "reflection")):
+        assert streamed[node].strip() == final_state[key]
+
+
+def test_parallel_pipeline_async(registry, initial_state):
+    result = asyncio.run(build_graph(registry, parallel=True).ainvoke(initial_state("run-3")))
+
+    assert result["summary_evaluation"].startswith("phi3 reply")
+    assert len(result["logs"]) == 4
+    assert result["reflection"]
+
+
+def test_parallel_branches_run_in_one_step_and_merge_logs(registry, stub_server, initial_state):
+    graph = build_graph(registry, parallel=True)
+    steps = {}
+    for event in graph.stream(initial_state("run-8"), stream_mode="debug"):
+        if event["type"] == "task":
+            steps.setdefault(event["step"], []).append(event["payload"]["name"])
+
+    # email and evaluate_summary fan out from summarize in the same superstep
+    assert sorted(steps[2]) == ["email", "evaluate_summary"]
+    assert steps[4] == ["reflection"]
+
+    result = graph.invoke(initial_state("run-9"))
+    # The operator.add reducer keeps both branches' entries, none overwritten
+    assert sorted(result["logs"][1:3]) == [
+        LogEntry("EmailNode", "summary", "email_text"),
+        LogEntry("SummaryEvaluatorNode", "summary", "summary_evaluation"),
+    ]
+    assert result["logs"][0].agent == "SummarizerNode"
+    assert result["logs"][3].agent == "EvaluatorNode"
+    assert result["summary_evaluation"].startswith("phi3 reply")
+    assert result["evaluation"].startswith("phi3 reply")
+
+    steps = registry.logger().get_run("run-9")
+    assert sorted(step["agent_name"] for step in steps) == [
+        "EmailNode", "EvaluatorNode", "ReflectionNode", "SummarizerNode", "SummaryEvaluatorNode"
+    ]
+
+
+def test_async_invoke_matches_sync(registry, initial_state):
+    graph = build_graph(registry)
+    sync_result = graph.invoke(initial_state("run-5"))
+    async_result = asyncio.run(graph.ainvoke(initial_state("run-5")))
+
+    assert async_result == sync_result
+
+
+def test_invocations_share_agents_and_connections(registry, stub_server, initial_state):
+    graph = build_graph(registry)
+    graph.invoke(initial_state("run-6"))
+    agents = (registry.summarizer(), registry.email_agent(), registry.evaluator(), registry.reflection_agent())
+    connections = stub_server.connection_count
+
+    graph.invoke(initial_state("run-7"))
+
+    assert (registry.summarizer(), registry.email_agent(), registry.evaluator(), registry.reflection_agent()) == agents
+    # Same-model agents share one client
+    assert registry.summarizer().client is registry.email_agent().client
+    # The second report reused the pooled keep-alive connections
+    assert stub_server.connection_count == connections
+    assert registry.logger() is registry.logger()
@@ -0,0 +1,89 @@
+import json
+import time
+
+from Python.agents.report_agent import REPORT_SCHEMA
+from Python.llm_cache import ResponseCache
+from Python.llm_client import OllamaClient
+from Python.stub_ollama import StubOllamaServer
+from Python.tests.conftest import echo_responder
+
+
+def test_memory_lru_and_disk_fallback(tmp_path):
+    cache = ResponseCache(db_path=str(tmp_path / "cache.db"), max_memory_entries=2)
+    keys = [ResponseCache.make_key("llama3.1", None, f"prompt {i}", 0.2, 512) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.set(key, f"response {i}")
+
+    # Oldest entry fell out of memory but is still served from SQLite
+    assert keys[0] not in cache._memory
+    assert cache.get(keys[0]) == "response 0"
+    assert keys[0] in cache._memory
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_size_eviction_and_ttl(tmp_path):
+    cache = ResponseCache(db_path=str(tmp_path / "cache.db"), max_memory_entries=1, max_disk_entries=2)
+    for i in range(3):
+        cache.set(f"k{i}", f"v{i}")
+        time.sleep(0.01)
+
+    assert cache._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] == 2
+    assert cache.get("k0") is None
+
+    cache.ttl_seconds = 0.0
+    time.sleep(0.01)
+    assert cache.get("k2") is None
+
+
+def test_bypass_above_temperature():
+    cache = ResponseCache(db_path=None, bypass_above_temperature=0.5)
+    assert cache.should_bypass(0.9)
+    assert not cache.should_bypass(0.2)
+    assert cache.stats()["bypassed"] == 1
+
+
+def test_client_serves_repeat_prompts_from_cache():
+    cache = ResponseCache(db_path=None)
+    with StubOllamaServer(response_text="first") as server:
+        client = OllamaClient(host=server.url, cache=cache)
+        assert client.generate("same prompt") == "first"
+
+        server.response_text = "second"
+        assert client.generate("same prompt") == "first"
+        assert client.generate("other prompt") == "second"
+
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_format_and_num_ctx_are_part_of_the_key():
+    cache = ResponseCache(db_path=None)
+    schema = {"type": "object", "properties": {"summary": {"type": "string"}}}
+    with StubOllamaServer(response_text="free text") as server:
+        client = OllamaClient(host=server.url, cache=cache)
+        assert client.generate("same prompt") == "free text"
+
+        # Same prompt in JSON mode or with another context window is a different call
+        assert client.generate("same prompt", format=schema) == '{"summary": "free text"}'
+        client.generate("same prompt", num_ctx=8192)
+        assert client.generate("same prompt", format=schema) == '{"summary": "free text"}'
+
+    assert cache.stats()["misses"] == 3
+    assert cache.stats()["hits"] == 1
+
+
+def test_json_and_plain_calls_do_not_share_an_entry():
+    cache = ResponseCache(db_path=None)
+    with StubOllamaServer(responder=echo_responder) as server:
+        client = OllamaClient(model="llama3.1", host=server.url, cache=cache)
+        # A cached fused report must not come back for a free-text call
+        report = client.generate("same prompt", format=REPORT_SCHEMA)
+        assert set(json.loads(report)) == {"summary", "email"}
+
+        assert client.generate("same prompt") == "llama3.1 reply to 2 words"
+        assert client.generate("same prompt", format=REPORT_SCHEMA) == report
+
+    assert server.request_count == 2
+    assert cache.stats()["hits"] == 1
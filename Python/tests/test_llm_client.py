@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+from Python.llm_client import AsyncOllamaClient, OllamaClient
+
+
+def test_async_client_across_event_loops(stub_server):
+    client = AsyncOllamaClient(model="phi3", host=stub_server.url)
+
+    async def generate_and_close():
+        try:
+            return await client.generate("hello")
+        finally:
+            await client.aclose()
+
+    # Successive asyncio.run calls, the first one leaving its pool open
+    assert asyncio.run(client.generate("hello")).startswith("phi3 reply")
+    assert asyncio.run(generate_and_close()).startswith("phi3 reply")
+
+    # Loops running at the same time in several threads each get their own pool
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(asyncio.run(generate_and_close())))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 4
+    assert all(text.startswith("phi3 reply") for text in results)
+    assert len(client._clients) == 0
+
+
+def test_sync_client_reuses_keep_alive_connection(stub_server):
+    with OllamaClient(model="phi3", host=stub_server.url) as client:
+        for i in range(5):
+            client.generate(f"hello {i}")
+        list(client.generate_stream("streamed"))
+
+    assert stub_server.request_count == 6
+    assert stub_server.connection_count == 1
+
+
+def test_on_token_chunks_concatenate_to_returned_text(stub_server):
+    tokens = []
+    with OllamaClient(model="phi3", host=stub_server.url) as client:
+        text = client.generate("stream these words please", on_token=tokens.append)
+
+    assert len(tokens) > 1
+    assert "".join(tokens).strip() == text
+    assert stub_server.payloads[-1]["stream"] is True
+
+
+def test_async_client_matches_sync_client(stub_server):
+    with OllamaClient(model="phi3", host=stub_server.url) as client:
+        expected = client.generate("same prompt", system="be brief")
+
+    async def main():
+        async with AsyncOllamaClient(model="phi3", host=stub_server.url) as aclient:
+            text = await aclient.generate("same prompt", system="be brief")
+            chunks = [chunk async for chunk in aclient.generate_stream("same prompt", system="be brief")]
+            return text, "".join(chunks).strip()
+
+    assert asyncio.run(main()) == (expected, expected)
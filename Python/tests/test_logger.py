@@ -0,0 +1,101 @@
+import sqlite3
+import threading
+
+from Python.agents.logger import _MIGRATIONS, LoggingAgent
+
+
+def _count(db_path) -> int:
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM agent_logs").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_flush_commits_batched_rows(tmp_path):
+    db_path = str(tmp_path / "logs.db")
+    logger = LoggingAgent(db_path=db_path, batch_size=16, flush_interval=60)
+
+    for i in range(100):
+        logger.log_step("SummarizerNode", f"input {i}", f"output {i}")
+    logger.flush()
+
+    assert _count(db_path) == 100
+    assert logger._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    logger.close()
+
+
+def test_close_writes_pending_rows_from_many_threads(tmp_path):
+    db_path = str(tmp_path / "logs.db")
+    logger = LoggingAgent(db_path=db_path, flush_interval=60)
+
+    def worker(n):
+        for i in range(50):
+            logger.log_step(f"Node{n}", "in", f"out {i}")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    logger.close()
+
+    assert _count(db_path) == 400
+
+
+def test_get_run_returns_steps_with_payloads(tmp_path):
+    logger = LoggingAgent(db_path=str(tmp_path / "logs.db"))
+    logger.log_step("SummarizerNode", "raw log", "summary", run_id="r1", model="llama3.1", duration_ms=12.5)
+    logger.log_step("EmailNode", "summary", "email", run_id="r1", model="llama3.1")
+    logger.log_step("SummarizerNode", "other", "other summary", run_id="r2")
+
+    steps = logger.get_run("r1")
+    assert [s["agent_name"] for s in steps] == ["SummarizerNode", "EmailNode"]
+    assert steps[0]["input_data"] == "raw log"
+    assert steps[0]["duration_ms"] == 12.5
+
+    plan = logger._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM agent_logs WHERE run_id = ?", ("r1",)
+    ).fetchall()
+    assert "idx_agent_logs_run_id" in str(plan)
+    logger.close()
+
+
+def test_migrates_legacy_database(tmp_path):
+    db_path = str(tmp_path / "logs.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        CREATE TABLE agent_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            agent_name TEXT,
+            input_data TEXT,
+            output_data TEXT
+        )
+        """
+    )
+    conn.execute(
+        "INSERT INTO agent_logs (timestamp, agent_name, input_data, output_data) VALUES (?, ?, ?, ?)",
+        ("2025-01-01T00:00:00", "EmailNode", "old input", "old output"),
+    )
+    conn.commit()
+    conn.close()
+
+    logger = LoggingAgent(db_path=db_path)
+    logger.log_step("EmailNode", "new input", "new output", run_id="r1")
+    logger.flush()
+
+    rows = logger._conn.execute(
+        """
+        SELECT l.id, l.agent_name, l.run_id, p.input_data
+        FROM agent_logs AS l JOIN agent_log_payloads AS p ON p.log_id = l.id
+        ORDER BY l.id
+        """
+    ).fetchall()
+    assert rows == [(1, "EmailNode", None, "old input"), (2, "EmailNode", "r1", "new input")]
+    assert logger._conn.execute("PRAGMA user_version").fetchone()[0] == len(_MIGRATIONS)
+    logger.close()
+
+    # Reopening an up-to-date database is a no-op
+    LoggingAgent(db_path=db_path).close()
@@ -0,0 +1,50 @@
+import time
+
+from Python.llm_client import OllamaClient
+from Python.metrics import CallMetrics, MetricsRegistry, capture_calls
+from Python.stub_ollama import StubOllamaServer
+
+
+def test_finish_reads_ollama_fields():
+    metrics = CallMetrics("phi3", "http://h", streamed=False)
+    metrics.finish(time.perf_counter(), {
+        "prompt_eval_count": 12,
+        "eval_count": 40,
+        "load_duration": 2_000_000,
+        "prompt_eval_duration": 3_000_000,
+        "eval_duration": 50_000_000,
+    })
+
+    assert (metrics.prompt_tokens, metrics.completion_tokens) == (12, 40)
+    assert metrics.eval_ms == 50.0
+    # Non-streamed calls estimate TTFT as load + prompt evaluation
+    assert metrics.ttft_ms == 5.0
+
+
+def test_client_reports_calls_to_capture_and_hook():
+    seen = []
+    with StubOllamaServer(response_text="one two three") as server:
+        client = OllamaClient(host=server.url, on_metrics=seen.append)
+        with capture_calls() as calls:
+            client.generate("hello there")
+            client.generate("hello again", on_token=lambda token: None)
+        client.generate("outside the capture")
+
+    assert [c.streamed for c in calls] == [False, True]
+    assert calls[1].ttft_ms is not None and calls[1].ttft_ms <= calls[1].wall_ms
+    assert all(c.completion_tokens == 3 for c in calls)
+    assert len(seen) == 3
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.inc("reports_total", labels={"mode": "batch"}, help_text="Reports done")
+    registry.observe("node_duration_seconds", 0.5, {"node": "EmailNode"})
+    registry.observe("node_duration_seconds", 1.5, {"node": "EmailNode"})
+
+    text = registry.to_prometheus()
+    assert "# TYPE reports_total counter" in text
+    assert 'reports_total{mode="batch"} 1' in text
+    assert 'node_duration_seconds_sum{node="EmailNode"} 2.0' in text
+    assert 'node_duration_seconds_count{node="EmailNode"} 2' in text
+    assert registry.get("node_duration_seconds", {"node": "EmailNode"}) == 2
@@ -0,0 +1,67 @@
+from Python.langgraph.graph import pipeline_stages
+from Python.langgraph.model_manager import ModelManager
+from Python.langgraph.registry import AgentRegistry
+from Python.stub_ollama import StubOllamaServer
+
+
+def test_preload_and_keep_alive_on_every_request(tmp_path):
+    with StubOllamaServer(load_ms=20, max_loaded_models=2) as server:
+        registry = AgentRegistry(host=server.url, db_path=str(tmp_path / "logs.db"))
+        models = ModelManager(registry, keep_alive="15m", cold_load_ms=10)
+        try:
+            timings = models.preload()
+            assert list(timings) == ["llama3.1", "phi3"]
+            assert all(ms >= 20 for ms in timings.values())
+            assert server.loaded_models == ["llama3.1", "phi3"]
+
+            # Warm: no load time charged to the real calls
+            registry.summarizer().run("worked on the parser")
+            registry.evaluator().run("Hi team")
+            assert all(p["keep_alive"] == "15m" for p in server.payloads)
+
+            stats = models.stats()
+            assert stats["llama3.1"]["preload_ms"] >= 20
+            assert stats["llama3.1"]["cold_loads"] == 0
+            assert stats["phi3"]["calls"] == 1
+            assert "generation=" in models.report()
+        finally:
+            models.close()
+            registry.close()
+
+
+def test_pinned_restores_keep_alive(tmp_path):
+    with StubOllamaServer() as server:
+        registry = AgentRegistry(host=server.url, db_path=str(tmp_path / "logs.db"))
+        models = ModelManager(registry, keep_alive="5m")
+        try:
+            with models.pinned():
+                assert registry.client("phi3").keep_alive == -1
+                registry.evaluator().run("Hi team")
+                assert server.payloads[-1]["keep_alive"] == -1
+
+            assert registry.client("phi3").keep_alive == "5m"
+            assert server.payloads[-1] == {"model": "phi3", "keep_alive": "5m"}
+        finally:
+            models.close()
+            registry.close()
+
+
+def test_preloads_only_the_models_the_graph_uses(tmp_path):
+    with StubOllamaServer() as server:
+        registry = AgentRegistry(
+            host=server.url, db_path=str(tmp_path / "logs.db"), draft_model="qwen2.5:0.5b", report_model="mistral"
+        )
+        default = ModelManager(registry)
+        cascade = ModelManager(registry, stages=pipeline_stages(cascade=True))
+        fused = ModelManager(registry, stages=pipeline_stages(fused=True))
+        try:
+            assert default.models == ["llama3.1", "phi3"]
+            assert cascade.models == ["qwen2.5:0.5b", "phi3", "llama3.1"]
+            assert fused.models == ["mistral", "phi3"]
+
+            default.preload()
+            assert [p["model"] for p in server.payloads] == ["llama3.1", "phi3"]
+        finally:
+            for models in (default, cascade, fused):
+                models.close()
+            registry.close()
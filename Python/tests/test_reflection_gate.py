@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from Python.langgraph.graph import BRIEF_REFLECTION_TOKENS, build_graph
+from Python.metrics import METRICS
+
+
+def _reflections(mode: str) -> float:
+    return METRICS.get("reflection_runs_total", {"mode": mode})
+
+
+def test_high_score_skips_reflection(registry, stub_server, scripted_llm, initial_state):
+    scripted_llm(9)
+    skipped = _reflections("skip")
+
+    result = build_graph(registry, reflection_threshold=8).invoke(initial_state("gate-1"))
+
+    assert result["evaluation_score"] == 9
+    assert result["reflection"] == ""
+    # Summarize, email, evaluate: the reflection call is gone
+    assert stub_server.request_count == 3
+    assert _reflections("skip") == skipped + 1
+    assert [s["agent_name"] for s in registry.logger().get_run("gate-1")] == [
+        "SummarizerNode", "EmailNode", "EvaluatorNode"
+    ]
+
+
+def test_low_score_reflects_in_full(registry, stub_server, scripted_llm, initial_state):
+    scripted_llm(6)
+    full = _reflections("full")
+
+    result = build_graph(registry, reflection_threshold=8).invoke(initial_state("gate-2"))
+
+    assert result["reflection"].startswith("phi3 reply")
+    assert stub_server.payloads[-1]["options"]["num_predict"] == 512
+    assert _reflections("full") == full + 1
+
+
+def test_high_score_brief_reflection(registry, stub_server, scripted_llm, initial_state):
+    scripted_llm(9)
+    brief = _reflections("brief")
+
+    result = asyncio.run(
+        build_graph(registry, reflection_threshold=8, high_score_reflection="brief").ainvoke(initial_state("gate-3"))
+    )
+
+    payload = stub_server.payloads[-1]
+    assert result["reflection"].startswith("phi3 reply")
+    assert payload["options"]["num_predict"] == BRIEF_REFLECTION_TOKENS
+    assert payload["prompt"].endswith(registry.reflection_agent().BRIEF_INSTRUCTION)
+    assert _reflections("brief") == brief + 1
+
+
+def test_parallel_join_skips_reflection_in_node(registry, stub_server, scripted_llm, initial_state):
+    scripted_llm(10)
+
+    result = build_graph(registry, parallel=True, reflection_threshold=8).invoke(initial_state("gate-4"))
+
+    assert result["reflection"] == ""
+    assert all("reflection agent" not in p["prompt"] for p in stub_server.payloads)
+    assert stub_server.request_count == 4
+
+
+def test_unknown_reflection_mode(registry):
+    with pytest.raises(ValueError):
+        build_graph(registry, reflection_threshold=8, high_score_reflection="short")
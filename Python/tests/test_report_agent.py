@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+import requests
+
+from Python.agents.report_agent import REPORT_SCHEMA, ReportAgent, ReportFormatError, parse_report
+from Python.langgraph.graph import LogEntry, build_graph, pipeline_stages
+from Python.llm_client import OllamaClient
+from Python.metrics import METRICS
+from Python.tests.conftest import WORKLOG
+
+
+def test_report_agent_requests_both_parts_in_one_call(stub_server):
+    agent = ReportAgent(client=OllamaClient(model="llama3.1", host=stub_server.url))
+
+    report = agent.run(WORKLOG, recipient_name="Dana")
+
+    payload = stub_server.payloads[-1]
+    assert stub_server.request_count == 1
+    assert payload["format"] == REPORT_SCHEMA
+    assert "Recipient: Dana" in payload["prompt"]
+    assert "fixed pipeline bugs" in payload["prompt"]
+    assert report["summary"].startswith("summary: llama3.1 reply")
+    assert report["email_text"].startswith("email: llama3.1 reply")
+
+
+@pytest.mark.parametrize("text", ["not json", "[1, 2]", '{"summary": "only a summary"}', '{"summary": "", "email": "x"}'])
+def test_parse_report_rejects_incomplete_output(text):
+    with pytest.raises(ReportFormatError):
+        parse_report(text)
+
+
+def test_fused_pipeline_replaces_summarize_and_email(registry, stub_server, initial_state):
+    result = build_graph(registry, fused=True).invoke(initial_state("fused-1"))
+
+    assert result["summary"].startswith("summary: llama3.1 reply")
+    assert result["email_text"].startswith("email: llama3.1 reply")
+    assert result["evaluation"].startswith("phi3 reply")
+    assert result["logs"] == [
+        LogEntry("ReportNode", "user_input", "summary"),
+        LogEntry("ReportNode", "user_input", "email_text"),
+        LogEntry("EvaluatorNode", "email_text", "evaluation"),
+    ]
+    # One llama3.1 call instead of two
+    assert [p["model"] for p in stub_server.payloads] == ["llama3.1", "phi3", "phi3"]
+    steps = registry.logger().get_run("fused-1")
+    assert [step["agent_name"] for step in steps] == ["ReportNode", "EvaluatorNode", "ReflectionNode"]
+
+
+def test_fused_pipeline_streams_both_parts(registry, initial_state):
+    events = list(build_graph(registry, fused=True).stream(initial_state("fused-2"), stream_mode="custom"))
+
+    assert [e["node"] for e in events[:2]] == ["summarize", "email"]
+
+
+def test_fused_falls_back_to_two_calls_on_bad_json(registry, stub_server, initial_state):
+    stub_server.responder = lambda payload: "not json" if "format" in payload else "plain reply"
+    before = METRICS.get("fused_report_fallbacks_total")
+
+    result = asyncio.run(build_graph(registry, fused=True, parallel=True).ainvoke(initial_state("fused-3")))
+
+    assert result["summary"] == result["email_text"] == "plain reply"
+    assert result["summary_evaluation"] == "plain reply"
+    assert [entry.agent for entry in result["logs"]][:2] == ["SummarizerNode", "EmailNode"]
+    assert METRICS.get("fused_report_fallbacks_total") == before + 1
+
+
+def test_fused_does_not_fall_back_on_transport_errors(registry, initial_state, monkeypatch):
+    def garbled(**kwargs):
+        raise requests.exceptions.JSONDecodeError("Expecting value", "<html>", 0)
+
+    monkeypatch.setattr(registry.report_agent().client, "generate", garbled)
+    before = METRICS.get("fused_report_fallbacks_total")
+
+    # A decode error is a ValueError too, but not the model's output being off-schema
+    with pytest.raises(requests.exceptions.JSONDecodeError):
+        build_graph(registry, fused=True).invoke(initial_state("fused-4"))
+    assert METRICS.get("fused_report_fallbacks_total") == before
+
+
+def test_fused_pipeline_stages():
+    assert [name for name, _, _ in pipeline_stages(parallel=True, fused=True)] == [
+        "report", "evaluate_summary", "evaluate", "reflection"
+    ]
+    assert [name for name, _, _ in pipeline_stages(parallel=True)] == [
+        "summarize", "email", "evaluate_summary", "evaluate", "reflection"
+    ]
@@ -0,0 +1,241 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from Python.host_pool import AsyncPooledOllamaClient, HostPool, PooledOllamaClient
+from Python.langgraph.registry import AgentRegistry
+from Python.llm_client import AsyncOllamaClient, OllamaClient
+from Python.metrics import METRICS
+from Python.resilience import CircuitBreaker, CircuitOpenError, HedgePolicy, RetryPolicy
+from Python.stub_ollama import StubOllamaServer
+
+
+def test_retries_transient_failures(stub_server):
+    stub_server.fail_next(2)
+    client = OllamaClient(model="phi3", host=stub_server.url, retry=RetryPolicy(base_delay=0.01))
+    before = METRICS.get("llm_retries_total", {"host": stub_server.url, "model": "phi3"})
+
+    assert client.generate("hello").startswith("phi3 reply to")
+    assert stub_server.request_count == 3
+    assert METRICS.get("llm_retries_total", {"host": stub_server.url, "model": "phi3"}) == before + 2
+
+
+def test_does_not_retry_client_errors():
+    with StubOllamaServer(fail_status=400) as server:
+        server.fail_next(1)
+        client = OllamaClient(model="phi3", host=server.url, retry=RetryPolicy(base_delay=0.01))
+
+        with pytest.raises(requests.HTTPError):
+            client.generate("hello")
+        assert server.request_count == 1
+
+
+def test_gives_up_after_max_attempts(stub_server):
+    stub_server.fail_next(5)
+    client = OllamaClient(model="phi3", host=stub_server.url, retry=RetryPolicy(max_attempts=2, base_delay=0.01))
+
+    with pytest.raises(requests.HTTPError):
+        client.generate("hello")
+    assert stub_server.request_count == 2
+
+
+def test_async_retry(stub_server):
+    stub_server.fail_next(1)
+
+    async def main():
+        async with AsyncOllamaClient(model="phi3", host=stub_server.url, retry=RetryPolicy(base_delay=0.01)) as client:
+            return await client.generate("hello")
+
+    assert asyncio.run(main()).startswith("phi3 reply to")
+    assert stub_server.request_count == 2
+
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(base_delay=0.5, max_delay=2.0, seed=1)
+    for attempt, bound in ((1, 0.5), (2, 1.0), (3, 2.0), (6, 2.0)):
+        delays = [policy.delay(attempt) for _ in range(50)]
+        assert all(0 <= delay <= bound for delay in delays)
+        assert len(set(delays)) > 1
+
+
+def test_circuit_breaker_fails_fast_and_recovers(stub_server):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.2)
+    client = OllamaClient(model="phi3", host=stub_server.url, breaker=breaker)
+    stub_server.fail_next(2)
+
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            client.generate("hello")
+    assert breaker.state(stub_server.url) == "open"
+
+    # Open: no request reaches the server
+    with pytest.raises(CircuitOpenError):
+        client.generate("hello")
+    assert stub_server.request_count == 2
+
+    # After reset_seconds one probe goes through and closes the circuit
+    time.sleep(0.25)
+    assert client.generate("hello").startswith("phi3 reply to")
+    assert breaker.state(stub_server.url) == "closed"
+
+
+def test_failed_probe_reopens_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.0)
+    breaker.record("h", ok=False)
+    breaker.before_call("h")
+    assert breaker.state("h") == "half-open"
+
+    # Only one probe at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("h")
+    breaker.record("h", ok=False)
+    assert breaker.state("h") == "open"
+
+
+def test_pool_skips_host_with_open_circuit():
+    with StubOllamaServer(response_text="from a") as a, StubOllamaServer(response_text="from b") as b:
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+        breaker.record(b.url, ok=False)
+        pool = HostPool([a.url, b.url], health_interval=None)
+        client = PooledOllamaClient("phi3", pool, breaker=breaker)
+
+        assert {client.generate(f"hello {i}") for i in range(4)} == {"from a"}
+        assert b.request_count == 0
+
+
+def test_registry_retry_is_opt_in(stub_server, tmp_path):
+    registry = AgentRegistry(host=stub_server.url, db_path=str(tmp_path / "logs.db"))
+    client = registry.client("phi3")
+    try:
+        stub_server.fail_next(1)
+        with pytest.raises(requests.HTTPError):
+            client.generate("hello")
+
+        registry.set_resilience(RetryPolicy(base_delay=0.01), CircuitBreaker())
+        stub_server.fail_next(1)
+        assert client.generate("hello").startswith("phi3 reply to")
+        assert registry.aclient("phi3").breaker is registry.circuit_breaker
+    finally:
+        registry.close()
+
+
+def test_hedge_delay_from_percentile():
+    policy = HedgePolicy(percentile=90, min_samples=10)
+    assert policy.delay("phi3") is None
+    for ms in range(1, 11):
+        policy.observe("phi3", ms * 10)
+    assert policy.delay("phi3") == pytest.approx(0.1)
+    assert HedgePolicy(delay_ms=50).delay("phi3") == pytest.approx(0.05)
+
+
+def _slow_and_fast():
+    slow = StubOllamaServer(response_text="slow host", latency_ms=2000)
+    fast = StubOllamaServer(response_text="fast host", latency_ms=10)
+    return slow, fast
+
+
+def test_hedged_request_takes_faster_host():
+    slow, fast = _slow_and_fast()
+    with slow, fast:
+        pool = HostPool([slow.url, fast.url], health_interval=None)
+        # Make the slow host the first choice: it looks warm
+        pool.mark_loaded(slow.url, "phi3")
+        breaker = CircuitBreaker(failure_threshold=1)
+        client = PooledOllamaClient("phi3", pool, hedge=HedgePolicy(delay_ms=50), breaker=breaker)
+        wins = METRICS.get("llm_hedge_wins_total", {"model": "phi3"})
+
+        tokens = []
+        assert client.generate("hello", on_token=tokens.append) == "fast host"
+        # The loser, still waiting on the slow host, gave its slot back at once
+        assert [host["in_flight"] for host in pool.snapshot()] == [0, 0]
+        assert "".join(tokens) == "fast host"
+        assert METRICS.get("llm_hedge_wins_total", {"model": "phi3"}) == wins + 1
+
+        # ...and its connection was cut instead of waiting out the slow host
+        deadline = time.monotonic() + 1.0
+        while any(t.name == "HedgedCall" for t in threading.enumerate()) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert not any(t.name == "HedgedCall" for t in threading.enumerate())
+        # Being abandoned is not a failure of the slow host
+        assert breaker.state(slow.url) == "closed"
+        client.close()
+
+
+def test_async_hedged_request_takes_faster_host():
+    slow, fast = _slow_and_fast()
+    with slow, fast:
+        pool = HostPool([slow.url, fast.url], health_interval=None)
+        pool.mark_loaded(slow.url, "phi3")
+
+        async def main():
+            client = AsyncPooledOllamaClient("phi3", pool, hedge=HedgePolicy(delay_ms=50))
+            try:
+                text = await client.generate("hello")
+                # The cancelled loser gave its slot back before generate() returned
+                assert [host["in_flight"] for host in pool.snapshot()] == [0, 0]
+                return text
+            finally:
+                await client.aclose()
+
+        assert asyncio.run(main()) == "fast host"
+
+
+def _dead_host_url() -> str:
+    server = StubOllamaServer().start()
+    server.stop()
+    return server.url
+
+
+def test_hedged_request_fails_over_from_dead_host():
+    dead = _dead_host_url()
+    with StubOllamaServer(response_text="live host") as live:
+        pool = HostPool([dead, live.url], health_interval=None)
+        # The dead host looks warm, so every call tries it first
+        pool.mark_loaded(dead, "phi3")
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+        client = PooledOllamaClient(
+            "phi3", pool, hedge=HedgePolicy(delay_ms=5000), retry=RetryPolicy(base_delay=0.01), breaker=breaker
+        )
+        retries = METRICS.get("llm_retries_total", {"host": dead, "model": "phi3"})
+
+        start = time.perf_counter()
+        assert [client.generate(f"hello {i}") for i in range(6)] == ["live host"] * 6
+        # Replaced at once instead of after the 5s hedge delay
+        assert time.perf_counter() - start < 2
+        assert breaker.state(dead) == "open"
+        assert METRICS.get("llm_retries_total", {"host": dead, "model": "phi3"}) > retries
+
+
+def test_hedged_request_gives_up_after_retry_budget():
+    pool = HostPool([_dead_host_url(), _dead_host_url()], health_interval=None)
+    client = PooledOllamaClient("phi3", pool, hedge=HedgePolicy(delay_ms=5000), retry=RetryPolicy(max_attempts=2))
+
+    with pytest.raises(requests.ConnectionError):
+        client.generate("hello")
+    assert all(host["in_flight"] == 0 for host in pool.snapshot())
+
+
+def test_async_hedged_request_fails_over_from_dead_host():
+    dead = _dead_host_url()
+    with StubOllamaServer(response_text="live host") as live:
+        pool = HostPool([dead, live.url], health_interval=None)
+        pool.mark_loaded(dead, "phi3")
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+
+        async def main():
+            client = AsyncPooledOllamaClient(
+                "phi3", pool, hedge=HedgePolicy(delay_ms=5000), retry=RetryPolicy(base_delay=0.01), breaker=breaker
+            )
+            try:
+                return [await client.generate(f"hello {i}") for i in range(6)]
+            finally:
+                await client.aclose()
+
+        start = time.perf_counter()
+        assert asyncio.run(main()) == ["live host"] * 6
+        assert time.perf_counter() - start < 2
+        assert breaker.state(dead) == "open"
+        assert all(host["in_flight"] == 0 for host in pool.snapshot())
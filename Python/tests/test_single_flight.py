@@ -0,0 +1,125 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from Python.langgraph.registry import AgentRegistry
+from Python.llm_client import OllamaClient
+from Python.metrics import METRICS
+from Python.single_flight import AsyncSingleFlight, SingleFlight
+from Python.stub_ollama import StubOllamaServer
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "result"
+
+    def caller(_):
+        barrier.wait()
+        return flight.do("key", slow)
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(caller, range(8)))
+
+    assert len(calls) == 1
+    assert [text for text, _ in results] == ["result"] * 8
+    assert sum(shared for _, shared in results) == 7
+    assert flight.coalesced == 7
+    # Nothing is remembered once the call is done
+    assert flight.do("key", lambda: "again") == ("again", False)
+
+
+def test_followers_get_the_leaders_exception():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(flight.do, "key", failing)
+        started.wait()
+        follower = pool.submit(flight.do, "key", lambda: "unused")
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match="boom"):
+                future.result()
+
+
+def test_async_callers_share_one_call():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", slow) for _ in range(5)), flight.do("other", slow))
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 2
+    assert [shared for _, shared in results] == [False, True, True, True, True, False]
+
+
+def test_async_follower_takes_over_from_cancelled_leader():
+    flight = AsyncSingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        leader = asyncio.create_task(flight.do("key", slow))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", slow))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(main()) == ("result", False)
+
+
+def test_client_coalesces_identical_prompts():
+    with StubOllamaServer(latency_ms=200, response_text="shared reply") as server:
+        client = OllamaClient(model="phi3", host=server.url, single_flight=SingleFlight())
+        before = METRICS.get("llm_coalesced_calls_total", {"model": "phi3"})
+        streamed = [[] for _ in range(4)]
+
+        with ThreadPoolExecutor(4) as pool:
+            texts = list(pool.map(lambda i: client.generate("same log", on_token=streamed[i].append), range(4)))
+        different = client.generate("another log")
+        client.close()
+
+        assert texts == ["shared reply"] * 4
+        assert all("".join(tokens).strip() == "shared reply" for tokens in streamed)
+        assert server.request_count == 2
+        assert different == "shared reply"
+        assert METRICS.get("llm_coalesced_calls_total", {"model": "phi3"}) == before + 3
+
+
+def test_registry_coalesces_async_duplicates(tmp_path):
+    with StubOllamaServer(latency_ms=100) as server:
+        registry = AgentRegistry(host=server.url, db_path=str(tmp_path / "logs.db"), coalesce=True)
+
+        async def main():
+            summarizer = registry.summarizer()
+            return await asyncio.gather(*(summarizer.arun("duplicate work log") for _ in range(3)))
+
+        summaries = asyncio.run(main())
+        registry.close()
+
+        assert len(set(summaries)) == 1
+        assert server.request_count == 1
+        assert registry.async_single_flight.coalesced == 2
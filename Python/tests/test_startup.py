@@ -0,0 +1,38 @@
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Cumulative `python -X importtime` budget for importing the CLI entry point
+MAIN_IMPORT_BUDGET_US = 50_000
+
+HEAVY_MODULES = ("langgraph", "langchain_core", "requests", "httpx")
+
+
+def _importtime(statement: str) -> dict:
+    """Module -> cumulative import time in microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_main_import_is_light():
+    times = _importtime("import Python.main")
+
+    assert times["Python.main"] < MAIN_IMPORT_BUDGET_US
+    assert not [m for m in times if m.split(".")[0] in HEAVY_MODULES]
+
+
+def test_graph_module_compiles_lazily():
+    times = _importtime("import Python.langgraph.graph")
+
+    assert not [m for m in times if m.split(".")[0] in ("langgraph", "langchain_core")]
@@ -0,0 +1,47 @@
+import time
+
+import pytest
+import requests
+
+from Python.llm_client import OllamaClient
+from Python.stub_ollama import StubOllamaServer
+
+
+def test_latency_and_tokens_per_second_are_reported():
+    with StubOllamaServer(response_text="a b c d e", latency_ms=50, tokens_per_second=100) as server:
+        client = OllamaClient(host=server.url)
+        start = time.perf_counter()
+        tokens = list(client.generate_stream("hi"))
+        elapsed = time.perf_counter() - start
+
+    assert "".join(tokens) == "a b c d e"
+    # 50ms prefill + 5 tokens at 10ms each
+    assert elapsed >= 0.1
+
+
+def test_fail_rate_is_reproducible_with_seed():
+    outcomes = []
+    for _ in range(2):
+        with StubOllamaServer(fail_rate=0.5, seed=7) as server:
+            client = OllamaClient(host=server.url)
+            run = []
+            for _ in range(10):
+                try:
+                    client.generate("hi")
+                    run.append(True)
+                except requests.HTTPError:
+                    run.append(False)
+            outcomes.append(run)
+
+    assert outcomes[0] == outcomes[1]
+    assert True in outcomes[0] and False in outcomes[0]
+
+
+def test_disconnect_mid_stream():
+    with StubOllamaServer(response_text="one two three four", failure_mode="disconnect") as server:
+        client = OllamaClient(host=server.url)
+        server.fail_next(1)
+        with pytest.raises(requests.RequestException):
+            list(client.generate_stream("hi"))
+        assert client.generate("hi") == "one two three four"
+        assert server.failure_count == 1
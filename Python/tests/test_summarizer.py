@@ -1,18 +1,27 @@
 from Python.agents.summarizer import SummarizerAgent
+from Python.llm_client import OllamaClient
+from Python.tests.conftest import WORKLOG, echo_responder
 
-def main():
-    s = SummarizerAgent()
 
-    text = """
-    Large language models are neural networks trained on vast corpora of text.
-    They are capable of reasoning, summarization, and generation tasks.
-    """
+def test_summarizer_sends_worklog_with_system_prompt(stub_server):
+    summarizer = SummarizerAgent(client=OllamaClient(model="llama3.1", host=stub_server.url))
 
-    # CALL the correct method
-    summary = s.run(text)
-    print("\nSUMMARY:\n", summary)
+    summary = summarizer.run(WORKLOG)
 
-if __name__ == "__main__":
-    main()
+    payload = stub_server.payloads[-1]
+    assert summary == echo_responder(payload)
+    assert payload["model"] == "llama3.1"
+    assert "fixed pipeline bugs" in payload["prompt"]
+    assert "professional workplace assistant" in payload["system"]
+    assert payload["options"]["temperature"] == 0.2
 
 
+def test_summarizer_streams_tokens(stub_server):
+    summarizer = SummarizerAgent(client=OllamaClient(model="llama3.1", host=stub_server.url))
+    tokens = []
+
+    summary = summarizer.run(WORKLOG, on_token=tokens.append)
+
+    assert "".join(tokens).strip() == summary
+    assert len(tokens) > 1
+    assert stub_server.payloads[-1]["stream"] is True